@@ -24,7 +24,8 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import array
-import functools
+import hashlib
+import os
 
 
 def bytesToCppArray(code, symbol, data):
@@ -36,7 +37,64 @@ def bytesToCppArray(code, symbol, data):
     step = 16
     for i in range(0, len(data), step):
         x = array.array("B", data[i : i + step])
-        strs = map(lambda i: f"{i},", x)
-        code(functools.reduce(lambda x, y: x + y, strs))
+        code("".join(f"{i}," for i in x))
     code.dedent()
     code("};")
+
+
+def _quote(s):
+    """
+    Quote a string for use in a C string literal or an assembler directive.
+    """
+    s = s.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "".join(c if c.isprintable() else f"\\{ord(c):03o}" for c in s)
+
+
+def bytesToIncbin(code, symbol, data, data_file, asm_name, is_global=False):
+    """
+    Output an array of bytes to a code formatter as a c++ array declaration,
+    with the bytes themselves written to data_file and pulled in by the
+    assembler with .incbin. This is much faster to generate and compile than
+    a huge array initializer. The array is given the assembler level name
+    asm_name, which must be unique, and is only visible outside of its
+    object file if is_global is set.
+    """
+    # Leave the data file alone if it wouldn't change.
+    old_data = None
+    if os.path.isfile(data_file):
+        with open(data_file, "rb") as f:
+            old_data = f.read()
+    if old_data != data:
+        with open(data_file, "wb") as f:
+            f.write(data)
+
+    # The hash makes the generated code change whenever the data does, so
+    # that it's recompiled.
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.abspath(data_file)
+    code(
+        """\
+#ifndef GEM5_INCBIN_SECTION
+#if defined(__APPLE__)
+#define GEM5_INCBIN_SECTION "__DATA,__const"
+#else
+#define GEM5_INCBIN_SECTION ".rodata"
+#endif
+#endif
+
+// Included from ${{_quote(path)}} (sha256 ${digest})
+extern const std::uint8_t ${symbol}[] asm("${asm_name}");"""
+    )
+    code("__asm__(")
+    code.indent()
+    code('".pushsection " GEM5_INCBIN_SECTION "\\n"')
+    if is_global:
+        code('".globl ${asm_name}\\n"')
+    code('".balign 16\\n"')
+    code('"${asm_name}:\\n"')
+    # The path is quoted once for the assembler, and again for the C++
+    # string literal the directive is in.
+    directive = f'.incbin "{_quote(path)}"\n'
+    code('"${{_quote(directive)}}"')
+    code('".popsection\\n");')
+    code.dedent()
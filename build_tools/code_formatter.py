@@ -42,6 +42,7 @@ except ImportError:
     # Python 2 fallback
     import __builtin__ as builtins
 import inspect
+import io
 import os
 import re
 
@@ -171,8 +172,9 @@ class code_formatter(metaclass=code_formatter_meta):
         self._data = []
 
     def write(self, *args):
-        f = open(os.path.join(*args), "w")
-        name, extension = os.path.splitext(f.name)
+        path = os.path.join(*args)
+        name, extension = os.path.splitext(path)
+        f = io.StringIO()
 
         # Add a comment to inform which file generated the generated file
         # to make it easier to backtrack and modify generated code
@@ -210,7 +212,16 @@ class code_formatter(metaclass=code_formatter_meta):
 
         for data in self._data:
             f.write(data)
-        f.close()
+
+        # Leave the file alone if it wouldn't change, so that its timestamp
+        # doesn't suggest anything that depends on it needs to be rebuilt.
+        contents = f.getvalue()
+        if os.path.isfile(path):
+            with open(path) as old:
+                if old.read() == contents:
+                    return
+        with open(path, "w") as new:
+            new.write(contents)
 
     def __str__(self):
         data = "".join(self._data)
@@ -24,11 +24,52 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import hashlib
 import os
 
 import ply.lex
 import ply.yacc
 
+# The directory to keep the parse tables PLY generates in, if any. See
+# build_parser().
+table_dir = None
+
+
+def build_parser(module, name, **kwargs):
+    """Build a PLY parser for the grammar defined by module.
+
+    If table_dir is set, the parse tables are kept there, in a file named
+    after a hash of the grammar, and reused by later processes using the
+    same grammar instead of being regenerated. PLY checks the full grammar
+    signature stored with the tables before it uses them, and regenerates
+    them if they don't match."""
+    if table_dir is None or "picklefile" in kwargs:
+        return ply.yacc.yacc(module=module, **kwargs)
+
+    pdict = {k: getattr(module, k) for k in dir(module)}
+    pinfo = ply.yacc.ParserReflect(pdict, log=ply.yacc.NullLogger())
+    pinfo.get_all()
+    if pinfo.error:
+        # Let PLY report what's wrong with the grammar.
+        return ply.yacc.yacc(module=module, **kwargs)
+
+    digest = hashlib.sha256(pinfo.signature().encode()).hexdigest()[:16]
+    os.makedirs(table_dir, exist_ok=True)
+    picklefile = os.path.join(table_dir, f"{name}-{digest}.pickle")
+    kwargs.setdefault("outputdir", table_dir)
+    kwargs.setdefault("debugfile", f"{name}-{digest}.out")
+
+    if os.path.exists(picklefile):
+        return ply.yacc.yacc(module=module, picklefile=picklefile, **kwargs)
+
+    # Generate the tables into a file of our own and then move it into
+    # place, so that other processes never see a partially written file.
+    tmpfile = f"{picklefile}.{os.getpid()}"
+    parser = ply.yacc.yacc(module=module, picklefile=tmpfile, **kwargs)
+    if os.path.exists(tmpfile):
+        os.replace(tmpfile, picklefile)
+    return parser
+
 
 class ParseError(Exception):
     def __init__(self, message, token=None):
@@ -73,7 +114,9 @@ class Grammar:
             return self.lex
 
         if attr == "yacc":
-            self.yacc = ply.yacc.yacc(module=self, **self.yacc_kwargs)
+            self.yacc = build_parser(
+                self, type(self).__name__, **self.yacc_kwargs
+            )
             return self.yacc
 
         if attr == "current_lexer":
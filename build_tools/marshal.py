@@ -51,10 +51,14 @@ this script, and to read in and execute the marshalled code later.
 import locale
 import marshal
 import os
+import re
 import sys
 import zlib
 
-from blob import bytesToCppArray
+from blob import (
+    bytesToCppArray,
+    bytesToIncbin,
+)
 from code_formatter import code_formatter
 
 # Embed python files.  All .py files that have been indicated by a
@@ -63,8 +67,11 @@ from code_formatter import code_formatter
 # byte code, compress it, and then generate a c++ file that
 # inserts the result into an array.
 
-if len(sys.argv) < 4:
-    print(f"Usage: {sys.argv[0]} CPP PY MODPATH ABSPATH", file=sys.stderr)
+if len(sys.argv) < 5:
+    print(
+        f"Usage: {sys.argv[0]} CPP PY MODPATH ABSPATH [--incbin]",
+        file=sys.stderr,
+    )
     sys.exit(1)
 
 # Set the Python's locale settings manually based on the `LC_CTYPE`
@@ -72,7 +79,10 @@ if len(sys.argv) < 4:
 if "LC_CTYPE" in os.environ:
     locale.setlocale(locale.LC_CTYPE, os.environ["LC_CTYPE"])
 
-_, cpp, python, modpath, abspath = sys.argv
+_, cpp, python, modpath, abspath, *options = sys.argv
+# With --incbin, the data is included by the assembler from a file of its
+# own rather than written out as a C++ array.
+incbin = "--incbin" in options
 
 with open(python) as f:
     src = f.read()
@@ -95,7 +105,16 @@ namespace
 """
 )
 
-bytesToCppArray(code, "embedded_module_data", compressed)
+if incbin:
+    bytesToIncbin(
+        code,
+        "embedded_module_data",
+        compressed,
+        os.path.splitext(cpp)[0] + ".bin",
+        "gem5_embedded_python_" + re.sub(r"\W", "_", modpath),
+    )
+else:
+    bytesToCppArray(code, "embedded_module_data", compressed)
 
 # The name of the EmbeddedPython object doesn't matter since it's in an
 # anonymous namespace, and it's constructor takes care of installing it into a
@@ -0,0 +1,131 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Marshal a set of python modules into a single archive.
+
+This script compiles and marshals each of the given modules like
+marshal.py does, but instead of generating a compressed array per module
+it concatenates the uncompressed marshalled code of all of them into one
+array, and registers every module as an EmbeddedPython entry pointing at
+its offset within that array.  The importer can then unmarshal a module
+straight out of the (read only, demand paged) data of the binary the
+first time it is imported, without having to inflate it first.
+
+As with marshal.py, the exact same interpreter should be used both to run
+this script and to read in and execute the marshalled code later.
+"""
+
+import argparse
+import locale
+import marshal
+import os
+import re
+
+from blob import (
+    bytesToCppArray,
+    bytesToIncbin,
+)
+from code_formatter import code_formatter
+
+parser = argparse.ArgumentParser()
+parser.add_argument("cpp", help="c++ file to generate")
+parser.add_argument(
+    "modules",
+    nargs="*",
+    help="modules to embed, as MODPATH=ABSPATH",
+)
+parser.add_argument(
+    "--incbin",
+    action="store_true",
+    help="include the archive with the assembler rather than as a C++ array",
+)
+
+args = parser.parse_args()
+
+# Set the locale for the source files in the same way as marshal.py does
+if "LC_CTYPE" in os.environ:
+    locale.setlocale(locale.LC_CTYPE, os.environ["LC_CTYPE"])
+
+data = bytearray()
+entries = []
+for module in args.modules:
+    modpath, abspath = module.split("=", 1)
+    with open(abspath) as f:
+        src = f.read()
+
+    marshalled = marshal.dumps(compile(src, abspath, "exec"))
+    entries.append((abspath, modpath, len(data), len(marshalled)))
+    data += marshalled
+
+code = code_formatter()
+code(
+    """\
+#include "python/embedded.hh"
+
+namespace gem5
+{
+namespace
+{
+
+"""
+)
+
+if args.incbin:
+    name = os.path.splitext(os.path.basename(args.cpp))[0]
+    bytesToIncbin(
+        code,
+        "embedded_archive_data",
+        bytes(data),
+        os.path.splitext(args.cpp)[0] + ".bin",
+        "gem5_" + re.sub(r"\W", "_", name),
+    )
+else:
+    bytesToCppArray(code, "embedded_archive_data", data)
+
+# Each of these registers itself in the global list of embedded modules. A
+# compressed length of zero marks the code as uncompressed.
+code()
+for i, (abspath, modpath, offset, length) in enumerate(entries):
+    code(
+        """
+EmbeddedPython embedded_module_info_${i}(
+    "${abspath}",
+    "${modpath}",
+    embedded_archive_data + ${offset},
+    0,
+    ${length});"""
+    )
+
+code(
+    """
+
+} // anonymous namespace
+} // namespace gem5
+"""
+)
+
+code.write(args.cpp)
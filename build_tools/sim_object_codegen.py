@@ -0,0 +1,112 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Generate all of the C++ files for the SimObjects and enums of a module.
+
+Rather than starting a separate gem5py process for each generated file,
+which would import m5 and the module all over again every time, this
+script runs each of the individual generator scripts (for instance
+sim_object_param_struct_hh.py) in turn within a single process.  Each of
+them is run exactly as if it had been started on its own, so the files
+they generate are identical.
+"""
+
+import argparse
+import os.path
+import sys
+
+parser = argparse.ArgumentParser()
+parser.add_argument("modpath", help="module the simobjects belong to")
+parser.add_argument(
+    "use_python", help="whether python is enabled in gem5 (True or False)"
+)
+parser.add_argument(
+    "--params-hh",
+    action="append",
+    default=[],
+    help="parameter header file to generate",
+)
+parser.add_argument(
+    "--params-cc",
+    action="append",
+    default=[],
+    help="parameter cc file to generate",
+)
+parser.add_argument(
+    "--cxx-config-hh",
+    action="append",
+    default=[],
+    help="cxx config header file to generate",
+)
+parser.add_argument(
+    "--cxx-config-cc",
+    action="append",
+    default=[],
+    help="cxx config cc file to generate",
+)
+parser.add_argument(
+    "--enum-hh",
+    action="append",
+    default=[],
+    help="enum header file to generate",
+)
+parser.add_argument(
+    "--enum-cc", action="append", default=[], help="enum cc file to generate"
+)
+
+args = parser.parse_args()
+
+build_tools = os.path.dirname(os.path.abspath(__file__))
+
+# The generator script for each kind of file, and whether it also needs to
+# be told if python is enabled.
+generators = [
+    (args.params_hh, "sim_object_param_struct_hh.py", False),
+    (args.params_cc, "sim_object_param_struct_cc.py", True),
+    (args.cxx_config_hh, "cxx_config_hh.py", False),
+    (args.cxx_config_cc, "cxx_config_cc.py", False),
+    (args.enum_hh, "enum_hh.py", False),
+    (args.enum_cc, "enum_cc.py", True),
+]
+
+for targets, script, needs_use_python in generators:
+    if not targets:
+        continue
+
+    script = os.path.join(build_tools, script)
+    with open(script) as f:
+        script_code = compile(f.read(), script, "exec")
+
+    for target in targets:
+        sys.argv = [script, args.modpath, target]
+        if needs_use_python:
+            sys.argv.append(args.use_python)
+        try:
+            exec(script_code, {"__name__": "__main__", "__file__": script})
+        except:
+            print(f"Error generating {target}", file=sys.stderr)
+            raise
@@ -0,0 +1,105 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Index the names defined by the m5.objects modules.
+
+This script scans the top level of each SimObject python module, without
+importing it, and writes a python module with a dict that maps each name
+defined there (classes, functions and variables) to the modules defining
+it. m5.objects uses this index to import modules only when one of their
+names is first used.
+"""
+
+import argparse
+import ast
+
+from code_formatter import code_formatter
+
+parser = argparse.ArgumentParser()
+parser.add_argument("index_py", help="index module to generate")
+parser.add_argument(
+    "modules",
+    nargs="*",
+    help="modules to index, as MODPATH=FILE",
+)
+
+args = parser.parse_args()
+
+
+def target_names(target):
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for elt in target.elts:
+            yield from target_names(elt)
+
+
+def defined_names(body):
+    for node in body:
+        if isinstance(
+            node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+        ):
+            yield node.name
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                yield from target_names(target)
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            yield from target_names(node.target)
+        elif isinstance(node, ast.If):
+            yield from defined_names(node.body)
+            yield from defined_names(node.orelse)
+        elif isinstance(node, ast.Try):
+            yield from defined_names(node.body)
+            yield from defined_names(node.orelse)
+            yield from defined_names(node.finalbody)
+            for handler in node.handlers:
+                yield from defined_names(handler.body)
+        elif isinstance(node, ast.With):
+            yield from defined_names(node.body)
+
+
+index = {}
+for module in args.modules:
+    modpath, filename = module.split("=", 1)
+    with open(filename) as f:
+        tree = ast.parse(f.read(), filename)
+    for name in defined_names(tree.body):
+        # Private names are not exported by "from module import *"
+        if name.startswith("_"):
+            continue
+        modules = index.setdefault(name, [])
+        if modpath not in modules:
+            modules.append(modpath)
+
+code = code_formatter()
+code("index = {")
+code.indent()
+for name in sorted(index):
+    code("${{repr(name)}}: ${{repr(sorted(index[name]))}},")
+code.dedent()
+code("}")
+code.write(args.index_py)
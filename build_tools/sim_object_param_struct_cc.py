@@ -71,6 +71,8 @@ module = importlib.import_module(args.modpath)
 sim_object = getattr(module, sim_object_name)
 
 from m5.objects.SimObject import PyBindProperty
+from m5.params import VectorParamDesc
+from m5.util.pybind import PyBindVectorProperty
 
 code = code_formatter()
 
@@ -154,7 +156,10 @@ py::module_ m = m_internal.def_submodule("param_${sim_object}");
     param_exports = (
         sim_object.cxx_param_exports
         + [
-            PyBindProperty(k)
+            # Compact numeric vectors can be assigned from a buffer
+            PyBindVectorProperty(k)
+            if isinstance(v, VectorParamDesc) and v.array_typecode()
+            else PyBindProperty(k)
             for k, v in sorted(sim_object._params.local.items())
         ]
         + [
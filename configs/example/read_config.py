@@ -55,6 +55,7 @@ import sys
 import m5
 import m5.ticks as ticks
 
+m5.objects.import_all()
 sim_object_classes_by_name = {
     cls.__name__: cls
     for cls in list(m5.objects.__dict__.values())
@@ -40,7 +40,10 @@
 import os.path
 
 import SCons.Node.Python
-from blob import bytesToCppArray
+from blob import (
+    bytesToCppArray,
+    bytesToIncbin,
+)
 from code_formatter import code_formatter
 from gem5_scons import (
     MakeAction,
@@ -57,7 +60,14 @@ def build_blob(target, source, env):
     with open(str(source[0]), "rb") as f:
         data = f.read()
     symbol = str(source[1])
-    cc, hh = target
+    cc, hh = target[:2]
+
+    # With USE_INCBIN, the blob is included by the assembler from a file of
+    # its own, under a fixed assembler level name, rather than written out
+    # as a C++ array.
+    incbin = env.get("USE_INCBIN", False)
+    asm_name = f"gem5_blob_{symbol}"
+    asm_label = f' asm("{asm_name}")' if incbin else ""
 
     hh_code = code_formatter()
     hh_code(
@@ -71,7 +81,7 @@ namespace Blobs
 {
 
 extern const std::size_t ${symbol}_len;
-extern const std::uint8_t ${symbol}[];
+extern const std::uint8_t ${symbol}[]${asm_label};
 
 } // namespace Blobs
 } // namespace gem5
@@ -94,7 +104,12 @@ namespace Blobs
 const std::size_t ${symbol}_len = ${{len(data)}};
 """
     )
-    bytesToCppArray(cc_code, symbol, data)
+    if incbin:
+        bytesToIncbin(
+            cc_code, symbol, data, target[2].abspath, asm_name, is_global=True
+        )
+    else:
+        bytesToCppArray(cc_code, symbol, data)
     cc_code(
         """
 } // namespace Blobs
@@ -104,14 +119,20 @@ const std::size_t ${symbol}_len = ${{len(data)}};
     cc_code.write(str(cc))
 
 
-blob_action = MakeAction(build_blob, Transform("EMBED BLOB"))
+blob_action = MakeAction(
+    build_blob, Transform("EMBED BLOB"), varlist=["USE_INCBIN"]
+)
 
 
 def blob_emitter(target, source, env):
     symbol = str(target[0])
     cc_file = env.File(symbol + ".cc")
     hh_file = env.File(symbol + ".hh")
-    return [cc_file, hh_file], [source, SCons.Node.Python.Value(symbol)]
+    targets = [cc_file, hh_file]
+    # With USE_INCBIN the data is written to a file of its own as well.
+    if env.get("USE_INCBIN", False):
+        targets.append(env.File(symbol + ".bin"))
+    return targets, [source, SCons.Node.Python.Value(symbol)]
 
 
 def Blob(env):
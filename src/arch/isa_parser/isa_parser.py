@@ -37,6 +37,10 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import collections
+import hashlib
+import io
+import json
 import os
 import re
 import sys
@@ -45,6 +49,7 @@ import traceback
 # get type names
 from types import *
 
+import grammar
 from grammar import Grammar
 
 from .operand_list import *
@@ -67,17 +72,23 @@ class Template:
         self.parser = parser
         self.template = t
 
-    def subst(self, d):
-        myDict = None
+        # Templates are substituted many times over, so do the work that
+        # only depends on the template itself once, up front.
 
         # Protect non-Python-dict substitutions (e.g. if there's a printf
         # in the templated C++ code)
-        template = protectNonSubstPercents(self.template)
+        self.protected = protectNonSubstPercents(t)
+        # The labels substituted into the template, in order and without
+        # duplicates.
+        self.labels = list(dict.fromkeys(labelRE.findall(self.protected)))
+
+    def subst(self, d):
+        template = self.protected
 
         # Build a dict ('myDict') to use for the template substitution.
-        # Start with the template namespace.  Make a copy since we're
-        # going to modify it.
-        myDict = self.parser.templateMap.copy()
+        # The template namespace is layered underneath it rather than
+        # copied into it, since it's large and we only need to read it.
+        myDict = {}
 
         if isinstance(d, InstObjParams):
             # If we're dealing with an InstObjParams object, we need
@@ -86,15 +97,15 @@ class Template:
             # are only function wide still need to be generated.
             compositeCode = ""
 
-            myDict.update(d.__dict__)
             # The "operands" and "snippets" attributes of the InstObjParams
             # objects are for internal use and not substitution.
-            del myDict["operands"]
-            del myDict["snippets"]
+            myDict.update(
+                (k, v)
+                for k, v in d.__dict__.items()
+                if k not in ("operands", "snippets")
+            )
 
-            snippetLabels = [
-                l for l in labelRE.findall(template) if l in d.snippets
-            ]
+            snippetLabels = [l for l in self.labels if l in d.snippets]
 
             snippets = {
                 s: self.parser.mungeSnippet(d.snippets[s])
@@ -183,7 +194,7 @@ class Template:
             myDict.update(d.__dict__)
         else:
             raise TypeError("Template.subst() arg must be or have dictionary")
-        return template % myDict
+        return template % collections.ChainMap(myDict, self.parser.templateMap)
 
     # Convert to string.
     def __str__(self):
@@ -511,12 +522,37 @@ class InstObjParams:
 #
 
 
+# An output file of the ISA parser. It's accumulated in memory and only
+# written out when it's closed, and then only if its contents have changed,
+# so that anything built from it isn't rebuilt unnecessarily.
+class OutputFile(io.StringIO):
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+
+    def close(self):
+        if not self.closed:
+            contents = self.getvalue()
+            try:
+                with open(self.filename) as f:
+                    unchanged = f.read() == contents
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                with open(self.filename, "w") as f:
+                    f.write(contents)
+        super().close()
+
+
 class ISAParser(Grammar):
     def __init__(self, output_dir, decoder_name="Decoder"):
         super().__init__()
         self.lex_kwargs["reflags"] = int(re.MULTILINE)
         self.output_dir = output_dir
 
+        # The names of all the files generated in output_dir.
+        self.outputs = []
+
         self.filename = None  # for output file watermarking/scaremongering
 
         # variable to hold templates
@@ -529,6 +565,11 @@ class ISAParser(Grammar):
         self._operandsRE = None
         self._operandsWithExtRE = None
 
+        # Code snippets are substituted into many templates, so remember
+        # what they were munged into and which operands they use.
+        self._mungedSnippets = {}
+        self._operandScans = {}
+
         # This dictionary maps format name strings to Format objects.
         self.formatMap = {}
 
@@ -1595,22 +1636,52 @@ StaticInstPtr
     def mungeSnippet(self, s):
         """Fix up code snippets for final substitution in templates."""
         if isinstance(s, str):
-            return self.substMungedOpNames(substBitOps(s))
+            munged = self._mungedSnippets.get(s)
+            if munged is None:
+                munged = self.substMungedOpNames(substBitOps(s))
+                self._mungedSnippets[s] = munged
+            return munged
         else:
             return s
 
+    def scanOperands(self, code):
+        """Find the (base) names of the operands used in a code block, in
+        the order they appear."""
+        names = self._operandScans.get(code)
+        if names is None:
+            names = []
+            # delete strings and comments so we don't match on operands
+            # inside
+            stripped = code
+            for regEx in (stringRE, commentRE):
+                stripped = regEx.sub("", stripped)
+
+            # search for operands
+            for match in self.operandsRE().finditer(stripped):
+                # regexp groups are operand full name, base, and extension
+                (op_full, op_base, op_ext) = match.groups()
+                # If is a elem operand, use the corresponding vector
+                # operand
+                if op_base in self.elemToVector:
+                    op_base = self.elemToVector[op_base]
+                names.append(op_base)
+            names = tuple(names)
+            self._operandScans[code] = names
+        return names
+
     def open(self, name, bare=False):
         """Open the output file for writing and include scary warning."""
         filename = os.path.join(self.output_dir, name)
-        f = open(filename, "w")
+        f = OutputFile(filename)
+        self.outputs.append(name)
         if f:
             if not bare:
                 f.write(ISAParser.scaremonger_template % self)
         return f
 
     def update(self, file, contents):
-        """Update the output file only.  Scons should handle the case when
-        the new contents are unchanged using its built-in hash feature."""
+        """Update the output file only.  The file is left untouched when
+        the new contents are unchanged."""
         f = self.open(file)
         f.write(contents)
         f.close()
@@ -1657,6 +1728,82 @@ StaticInstPtr
 
     AlreadyGenerated = {}
 
+    # The file in the output directory which records what the generated
+    # files were last generated from.
+    cache_file = ".isa_parser_cache.json"
+
+    @staticmethod
+    def hash_file(filename):
+        with open(filename, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def cache_key(self, isa_desc):
+        """Hash the flattened ISA description together with the sources of
+        the parser itself."""
+        parser_dir = os.path.dirname(os.path.abspath(__file__))
+        parser_files = [
+            os.path.join(parser_dir, name)
+            for name in sorted(os.listdir(parser_dir))
+            if name.endswith(".py")
+        ]
+        parser_files.append(grammar.__file__)
+
+        key = hashlib.sha256()
+        for filename in parser_files:
+            key.update(self.hash_file(filename).encode())
+        key.update(isa_desc.encode())
+        return key.hexdigest()
+
+    def python_deps(self):
+        """Find the python files in the arch directory (like micro_asm.py
+        or the x86 microcode) which the ISA description may have
+        imported. Those aren't part of the flattened description, so they
+        have to be checked separately."""
+        arch_dir = os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))
+        )
+        deps = {}
+        for module in list(sys.modules.values()):
+            filename = getattr(module, "__file__", None)
+            if not filename:
+                continue
+            filename = os.path.abspath(filename)
+            if filename.startswith(arch_dir + os.sep) and os.path.isfile(
+                filename
+            ):
+                deps[filename] = self.hash_file(filename)
+        return deps
+
+    def cache_valid(self, key):
+        """Check whether the generated files are already up to date."""
+        try:
+            with open(os.path.join(self.output_dir, self.cache_file)) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if cache.get("key") != key:
+            return False
+        for name in cache.get("outputs", []):
+            if not os.path.isfile(os.path.join(self.output_dir, name)):
+                return False
+        for filename, digest in cache.get("deps", {}).items():
+            try:
+                if self.hash_file(filename) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def write_cache(self, key):
+        cache = {
+            "key": key,
+            "outputs": sorted(set(self.outputs)),
+            "deps": self.python_deps(),
+        }
+        with open(os.path.join(self.output_dir, self.cache_file), "w") as f:
+            json.dump(cache, f, indent=4, sort_keys=True)
+
     def _parse_isa_desc(self, isa_desc_file):
         """Read in and parse the ISA description."""
 
@@ -1679,12 +1826,25 @@ StaticInstPtr
         # do this up front.
         isa_desc = self.read_and_flatten(isa_desc_file)
 
+        # If neither the description nor the parser have changed since the
+        # files were last generated, there's nothing to do.
+        key = self.cache_key(isa_desc)
+        if self.cache_valid(key):
+            ISAParser.AlreadyGenerated[isa_desc_file] = None
+            return
+
+        cache_file = os.path.join(self.output_dir, self.cache_file)
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
         # Initialize lineno tracker
         self.lex.lineno = LineTracker(isa_desc_file)
 
         # Parse.
         self.parse_string(isa_desc)
 
+        self.write_cache(key)
+
         ISAParser.AlreadyGenerated[isa_desc_file] = None
 
     def parse_isa_desc(self, *args, **kwargs):
@@ -191,20 +191,9 @@ class SubOperandList(OperandList):
     def __init__(self, parser, code, requestor_list):
         self.items = []
         self.bases = {}
-        # delete strings and comments so we don't match on operands inside
-        for regEx in (stringRE, commentRE):
-            code = regEx.sub("", code)
-
-        # search for operands
-        for match in parser.operandsRE().finditer(code):
-            op = match.groups()
-            # regexp groups are operand full name, base, and extension
-            (op_full, op_base, op_ext) = op
-            # If is a elem operand, define or update the corresponding
-            # vector operand
-            if op_base in parser.elemToVector:
-                elem_op = op_base
-                op_base = parser.elemToVector[elem_op]
+        # search for operands (elem operands are mapped to their vector
+        # operands)
+        for op_base in parser.scanOperands(code):
             # find this op in the requestor list
             op_desc = requestor_list.find_base(op_base)
             if not op_desc:
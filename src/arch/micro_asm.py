@@ -32,10 +32,9 @@ import traceback
 # get type names
 from types import *
 
-from ply import (
-    lex,
-    yacc,
-)
+from ply import lex
+
+import grammar
 
 ##########################################################################
 #
@@ -575,7 +574,9 @@ def p_error(t):
 class MicroAssembler:
     def __init__(self, macro_type, microops, rom=None, rom_macroop_type=None):
         self.lexer = lex.lex()
-        self.parser = yacc.yacc(write_tables=False)
+        self.parser = grammar.build_parser(
+            sys.modules[__name__], "micro_asm", write_tables=False
+        )
         self.parser.macro_type = macro_type
         self.parser.macroops = {}
         self.parser.microops = microops
@@ -39,22 +39,32 @@
 
 #include <fcntl.h>
 #include <sys/mman.h>
+#include <sys/stat.h>
 #include <sys/types.h>
 #include <sys/user.h>
 #include <unistd.h>
 #include <zlib.h>
 
+#include <algorithm>
+#include <cassert>
 #include <cerrno>
 #include <climits>
 #include <cstdio>
+#include <cstring>
+#include <fstream>
 #include <iostream>
+#include <map>
 #include <string>
+#include <thread>
+#include <vector>
 
+#include "base/cprintf.hh"
 #include "base/intmath.hh"
 #include "base/trace.hh"
 #include "debug/AddrRanges.hh"
 #include "debug/Checkpoint.hh"
 #include "mem/abstract_mem.hh"
+#include "sim/byteswap.hh"
 #include "sim/serialize.hh"
 #include "sim/sim_exit.hh"
 
@@ -80,9 +90,13 @@ PhysicalMemory::PhysicalMemory(const std::string& _name,
                                const std::vector<AbstractMemory*>& _memories,
                                bool mmap_using_noreserve,
                                const std::string& shared_backstore,
-                               bool auto_unlink_shared_backstore) :
+                               bool auto_unlink_shared_backstore,
+                               bool raw_checkpoint,
+                               unsigned compress_threads) :
     _name(_name), size(0), mmapUsingNoReserve(mmap_using_noreserve),
     sharedBackstore(shared_backstore), sharedBackstoreSize(0),
+    rawCheckpoint(raw_checkpoint),
+    compressThreads(std::max(compress_threads, 1U)),
     pageSize(sysconf(_SC_PAGE_SIZE))
 {
     // Register cleanup callback if requested.
@@ -365,8 +379,9 @@ PhysicalMemory::serializeStore(CheckpointOut &cp, unsigned int store_id,
 {
     // we cannot use the address range for the name as the
     // memories that are not part of the address map can overlap
-    std::string filename =
-        name() + ".store" + std::to_string(store_id) + ".pmem";
+    std::string format = rawCheckpoint ? "raw" : "gzip";
+    std::string filename = name() + ".store" + std::to_string(store_id) +
+        (rawCheckpoint ? ".raw" : ".pmem");
     long range_size = range.size();
 
     DPRINTF(Checkpoint, "Serializing physical memory %s with size %d\n",
@@ -375,6 +390,18 @@ PhysicalMemory::serializeStore(CheckpointOut &cp, unsigned int store_id,
     SERIALIZE_SCALAR(store_id);
     SERIALIZE_SCALAR(filename);
     SERIALIZE_SCALAR(range_size);
+    SERIALIZE_SCALAR(format);
+
+    if (rawCheckpoint) {
+        serializeRawStore(CheckpointIn::dir() + "/" + filename, range, pmem);
+        return;
+    }
+
+    if (compressThreads > 1) {
+        serializeCompressedStore(CheckpointIn::dir() + "/" + filename, range,
+                                 pmem);
+        return;
+    }
 
     // write memory file
     std::string filepath = CheckpointIn::dir() + "/" + filename.c_str();
@@ -443,11 +470,6 @@ PhysicalMemory::unserializeStore(CheckpointIn &cp)
     UNSERIALIZE_SCALAR(filename);
     std::string filepath = cp.getCptDir() + "/" + filename;
 
-    // mmap memoryfile
-    gzFile compressed_mem = gzopen(filepath.c_str(), "rb");
-    if (compressed_mem == NULL)
-        fatal("Can't open physical memory checkpoint file '%s'", filename);
-
     // we've already got the actual backing store mapped
     uint8_t* pmem = backingStore[store_id].pmem;
     AddrRange range = backingStore[store_id].range;
@@ -455,13 +477,49 @@ PhysicalMemory::unserializeStore(CheckpointIn &cp)
     long range_size;
     UNSERIALIZE_SCALAR(range_size);
 
-    DPRINTF(Checkpoint, "Unserializing physical memory %s with size %d\n",
-            filename, range_size);
-
     if (range_size != range.size())
         fatal("Memory range size has changed! Saw %lld, expected %lld\n",
               range_size, range.size());
 
+    // checkpoints processed by util/cpt_page_store.py keep the pages
+    // of the store in a shared page store rather than in a file
+    std::string page_index;
+    if (optParamIn(cp, "page_index", page_index, false)) {
+        std::string page_store;
+        paramIn(cp, "page_store", page_store);
+        if (page_store.empty() || page_store[0] != '/')
+            page_store = cp.getCptDir() + "/" + page_store;
+
+        DPRINTF(Checkpoint, "Unserializing physical memory %s with size %d "
+                "from page store %s\n", page_index, range_size, page_store);
+
+        unserializePages(cp.getCptDir() + "/" + page_index, page_store,
+                         pmem, range.size());
+        return;
+    }
+
+    // raw images are mapped rather than read, see serializeRawStore
+    std::string format;
+    if (optParamIn(cp, "format", format, false) && format != "gzip") {
+        if (format != "raw")
+            fatal("Unknown physical memory checkpoint format '%s'\n",
+                  format);
+
+        DPRINTF(Checkpoint, "Unserializing raw physical memory %s with "
+                "size %d\n", filename, range_size);
+
+        unserializeRawStore(filepath, store_id);
+        return;
+    }
+
+    // mmap memoryfile
+    gzFile compressed_mem = gzopen(filepath.c_str(), "rb");
+    if (compressed_mem == NULL)
+        fatal("Can't open physical memory checkpoint file '%s'", filename);
+
+    DPRINTF(Checkpoint, "Unserializing physical memory %s with size %d\n",
+            filename, range_size);
+
     uint64_t curr_size = 0;
     long* temp_page = new long[chunk_size];
     long* pmem_current;
@@ -491,5 +549,266 @@ PhysicalMemory::unserializeStore(CheckpointIn &cp)
               filename);
 }
 
+void
+PhysicalMemory::serializeRawStore(const std::string &filepath,
+                                  AddrRange range, uint8_t* pmem) const
+{
+    // write to a new file and move it in place at the end, as a store
+    // restored from the old one may still have it mapped
+    std::string temp_path = filepath + ".tmp";
+    int fd = open(temp_path.c_str(), O_CREAT | O_WRONLY | O_TRUNC, 0666);
+    if (fd == -1)
+        fatal("Can't open physical memory checkpoint file '%s'\n",
+              temp_path);
+
+    const std::vector<uint8_t> zero_page(pageSize, 0);
+    uint64_t size = range.size();
+    for (uint64_t offset = 0; offset < size; offset += pageSize) {
+        uint64_t len = std::min<uint64_t>(pageSize, size - offset);
+
+        // leave holes for zero pages, they read back as zeros
+        if (memcmp(pmem + offset, zero_page.data(), len) == 0)
+            continue;
+
+        for (uint64_t done = 0; done < len; ) {
+            ssize_t written = pwrite(fd, pmem + offset + done, len - done,
+                                     offset + done);
+            if (written <= 0)
+                fatal("Write failed on physical memory checkpoint file "
+                      "'%s'\n", temp_path);
+            done += written;
+        }
+    }
+
+    // pad the image to a whole number of pages so it can be mapped
+    if (ftruncate(fd, roundUp(size, pageSize)) != 0 || close(fd) != 0)
+        fatal("Close failed on physical memory checkpoint file '%s'\n",
+              temp_path);
+
+    if (rename(temp_path.c_str(), filepath.c_str()) != 0)
+        fatal("Can't rename physical memory checkpoint file '%s'\n",
+              temp_path);
+}
+
+void
+PhysicalMemory::serializeCompressedStore(const std::string &filepath,
+                                         AddrRange range, uint8_t* pmem) const
+{
+    const uint64_t block_size = 16 << 20;
+
+    int fd = open(filepath.c_str(), O_CREAT | O_WRONLY | O_TRUNC, 0666);
+    if (fd == -1)
+        fatal("Can't open physical memory checkpoint file '%s'\n",
+              filepath);
+
+    auto compress_block = [](const uint8_t *data, uint64_t len,
+                             std::vector<Bytef> &out) {
+        z_stream zs = {};
+        // the same settings as gzopen(..., "wb")
+        if (deflateInit2(&zs, Z_DEFAULT_COMPRESSION, Z_DEFLATED, 15 + 16,
+                         8, Z_DEFAULT_STRATEGY) != Z_OK)
+            return false;
+        out.resize(deflateBound(&zs, len));
+        zs.next_in = const_cast<Bytef *>(data);
+        zs.avail_in = len;
+        zs.next_out = out.data();
+        zs.avail_out = out.size();
+        bool done = deflate(&zs, Z_FINISH) == Z_STREAM_END;
+        out.resize(zs.total_out);
+        return deflateEnd(&zs) == Z_OK && done;
+    };
+
+    uint64_t size = range.size();
+    uint64_t num_blocks = divCeil(size, block_size);
+    std::vector<std::vector<Bytef>> compressed(compressThreads);
+    std::vector<char> ok(compressThreads);
+
+    // compress a block per thread, then write the blocks out in order
+    for (uint64_t first = 0; first < num_blocks; first += compressThreads) {
+        uint64_t count = std::min<uint64_t>(compressThreads,
+                                            num_blocks - first);
+        std::vector<std::thread> workers;
+        for (uint64_t i = 0; i < count; ++i) {
+            uint64_t offset = (first + i) * block_size;
+            uint64_t len = std::min(block_size, size - offset);
+            workers.emplace_back([&, i, offset, len]() {
+                ok[i] = compress_block(pmem + offset, len, compressed[i]);
+            });
+        }
+        for (auto &worker : workers)
+            worker.join();
+
+        for (uint64_t i = 0; i < count; ++i) {
+            if (!ok[i])
+                fatal("Compression failed on physical memory checkpoint "
+                      "file '%s'\n", filepath);
+            const Bytef *data = compressed[i].data();
+            size_t left = compressed[i].size();
+            while (left > 0) {
+                ssize_t written = write(fd, data, left);
+                if (written <= 0)
+                    fatal("Write failed on physical memory checkpoint "
+                          "file '%s'\n", filepath);
+                data += written;
+                left -= written;
+            }
+        }
+    }
+
+    if (close(fd) != 0)
+        fatal("Close failed on physical memory checkpoint file '%s'\n",
+              filepath);
+}
+
+void
+PhysicalMemory::unserializeRawStore(const std::string &filepath,
+                                    unsigned int store_id)
+{
+    BackingStoreEntry &store = backingStore[store_id];
+    uint64_t size = store.range.size();
+
+    int fd = open(filepath.c_str(), O_RDONLY);
+    if (fd == -1)
+        fatal("Can't open physical memory checkpoint file '%s'\n",
+              filepath);
+
+    struct stat st;
+    if (fstat(fd, &st) != 0 || (uint64_t)st.st_size < size)
+        fatal("Physical memory checkpoint file '%s' is too small\n",
+              filepath);
+
+    if (store.shmFd == -1) {
+        // replace the anonymous mapping of the store with a private
+        // mapping of the image, the memories keep using the same
+        // address and pages are only read from the image when they
+        // are touched
+        int map_flags = MAP_PRIVATE | MAP_FIXED;
+        if (mmapUsingNoReserve)
+            map_flags |= MAP_NORESERVE;
+
+        void *pmem = mmap(store.pmem, size, PROT_READ | PROT_WRITE,
+                          map_flags, fd, 0);
+        if (pmem == MAP_FAILED) {
+            perror("mmap");
+            fatal("Could not mmap physical memory checkpoint file '%s'\n",
+                  filepath);
+        }
+        assert(pmem == store.pmem);
+    } else {
+        // the shared backing store may be used by other processes, so
+        // it has to be filled in, skipping the holes of the image
+        off_t offset = 0;
+        while ((uint64_t)offset < size) {
+#ifdef SEEK_DATA
+            off_t data = lseek(fd, offset, SEEK_DATA);
+            if (data == -1)
+                break;
+            off_t hole = lseek(fd, data, SEEK_HOLE);
+            if (hole == -1)
+                hole = st.st_size;
+#else
+            off_t data = offset;
+            off_t hole = st.st_size;
+#endif
+            uint64_t end = std::min<uint64_t>(hole, size);
+            for (uint64_t pos = data; pos < end; ) {
+                ssize_t bytes_read = pread(fd, store.pmem + pos, end - pos,
+                                           pos);
+                if (bytes_read <= 0)
+                    fatal("Read failed on physical memory checkpoint file "
+                          "'%s'\n", filepath);
+                pos += bytes_read;
+            }
+            offset = hole;
+        }
+    }
+
+    // the mapping stays valid once the file is closed
+    close(fd);
+}
+
+void
+PhysicalMemory::unserializePages(const std::string &index_path,
+                                 const std::string &store_path,
+                                 uint8_t* pmem, uint64_t size) const
+{
+    // the index format is described in util/cpt_page_store.py
+    struct
+    {
+        char magic[8];
+        uint32_t version;
+        uint32_t pageSize;
+        uint64_t numPages;
+    } header;
+    struct
+    {
+        uint32_t pack;
+        uint32_t length;
+        uint64_t offset;
+    } entry;
+    static_assert(sizeof(header) == 24 && sizeof(entry) == 16,
+                  "Unexpected padding in the page index records");
+
+    std::ifstream index(index_path, std::ios::binary);
+    if (!index.read((char *)&header, sizeof(header)))
+        fatal("Can't read physical memory page index '%s'\n", index_path);
+
+    // the index is little endian regardless of the host
+    header.version = letoh(header.version);
+    header.pageSize = letoh(header.pageSize);
+    header.numPages = letoh(header.numPages);
+
+    if (memcmp(header.magic, "gem5pidx", sizeof(header.magic)) != 0 ||
+        header.version != 1 || header.pageSize == 0)
+        fatal("'%s' is not a physical memory page index\n", index_path);
+
+    if (header.numPages != divCeil(size, header.pageSize))
+        fatal("Page index '%s' has %d pages, expected %d\n", index_path,
+              header.numPages, divCeil(size, header.pageSize));
+
+    std::map<uint32_t, std::ifstream> packs;
+    std::vector<Bytef> compressed;
+    std::vector<Bytef> page(header.pageSize);
+
+    for (uint64_t i = 0; i < header.numPages; ++i) {
+        if (!index.read((char *)&entry, sizeof(entry)))
+            fatal("Page index '%s' is truncated\n", index_path);
+        entry.pack = letoh(entry.pack);
+        entry.length = letoh(entry.length);
+        entry.offset = letoh(entry.offset);
+
+        // zero pages aren't stored, and the backing store is already
+        // zeroed, so don't give the VM system hell
+        if (entry.length == 0)
+            continue;
+
+        auto pack = packs.find(entry.pack);
+        if (pack == packs.end()) {
+            std::string pack_path =
+                csprintf("%s/pack%06d", store_path, entry.pack);
+            pack = packs.emplace(entry.pack,
+                std::ifstream(pack_path, std::ios::binary)).first;
+            if (!pack->second)
+                fatal("Can't open page store pack '%s'\n", pack_path);
+        }
+
+        compressed.resize(entry.length);
+        pack->second.seekg(entry.offset);
+        if (!pack->second.read((char *)compressed.data(), entry.length))
+            fatal("Can't read page %d from page store '%s'\n", i,
+                  store_path);
+
+        uLongf page_size = header.pageSize;
+        if (uncompress(page.data(), &page_size, compressed.data(),
+                       entry.length) != Z_OK ||
+            page_size != header.pageSize)
+            fatal("Page %d in page store '%s' is corrupt\n", i, store_path);
+
+        uint64_t addr = i * header.pageSize;
+        memcpy(pmem + addr, page.data(),
+               std::min<uint64_t>(header.pageSize, size - addr));
+    }
+}
+
 } // namespace memory
 } // namespace gem5
@@ -156,6 +156,12 @@ class PhysicalMemory : public Serializable
     const std::string sharedBackstore;
     uint64_t sharedBackstoreSize;
 
+    // Checkpoint the stores as raw images rather than gzipped ones
+    const bool rawCheckpoint;
+
+    // Number of threads compressing the stores when checkpointing
+    const unsigned compressThreads;
+
     long pageSize;
 
     // The physical memory used to provide the memory in the simulated
@@ -191,7 +197,9 @@ class PhysicalMemory : public Serializable
                    const std::vector<AbstractMemory*>& _memories,
                    bool mmap_using_noreserve,
                    const std::string& shared_backstore,
-                   bool auto_unlink_shared_backstore);
+                   bool auto_unlink_shared_backstore,
+                   bool raw_checkpoint=false,
+                   unsigned compress_threads=1);
 
     /**
      * Unmap all the backing store we have used.
@@ -284,6 +292,17 @@ class PhysicalMemory : public Serializable
     void serializeStore(CheckpointOut &cp, unsigned int store_id,
                         AddrRange range, uint8_t* pmem) const;
 
+    /**
+     * Write a backing store as a raw, page-aligned image. Zero pages
+     * are left as holes in the file.
+     *
+     * @param filepath The image to write
+     * @param range The address range of this backing store
+     * @param pmem The host pointer to this backing store
+     */
+    void serializeRawStore(const std::string &filepath, AddrRange range,
+                           uint8_t* pmem) const;
+
     /**
      * Unserialize the memories in the system. As with the
      * serialization, this action is independent of how the address
@@ -296,6 +315,41 @@ class PhysicalMemory : public Serializable
      */
     void unserializeStore(CheckpointIn &cp);
 
+    /**
+     * Write a backing store as a gzipped image, compressing blocks of
+     * it on compressThreads threads. Each block is a gzip member of
+     * its own, which gzread reads back as a single stream.
+     *
+     * @param filepath The image to write
+     * @param range The address range of this backing store
+     * @param pmem The host pointer to this backing store
+     */
+    void serializeCompressedStore(const std::string &filepath,
+                                  AddrRange range, uint8_t* pmem) const;
+
+    /**
+     * Restore a backing store from a raw image. Private backing
+     * stores map the image copy-on-write so that pages are only read
+     * when they are touched, while shared ones copy its contents.
+     *
+     * @param filepath The image to restore from
+     * @param store_id Unique identifier of this backing store
+     */
+    void unserializeRawStore(const std::string &filepath,
+                             unsigned int store_id);
+
+    /**
+     * Restore a backing store from the pages of a shared page store.
+     *
+     * @param index_path Page index listing the pages of the store
+     * @param store_path Directory of the page store
+     * @param pmem The host pointer to this backing store
+     * @param size The size of this backing store
+     */
+    void unserializePages(const std::string &index_path,
+                          const std::string &store_path,
+                          uint8_t* pmem, uint64_t size) const;
+
 };
 
 } // namespace memory
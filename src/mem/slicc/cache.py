@@ -0,0 +1,122 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Remember what SLICC generated a protocol's files from.
+
+Running SLICC means parsing the whole protocol, building its symbol table
+and generating the code for every state machine and type, even when none
+of its inputs changed. The cache kept here records the content hashes of
+all of the files a protocol was read from, along with the SLICC sources
+themselves and the options it was run with, so that it only needs to be
+run again when one of those has changed.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+cache_name = ".slicc_cache.json"
+
+
+def hash_file(filename):
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def sources_hash():
+    """Hash the sources of SLICC itself, and the code formatter it
+    generates code with."""
+    slicc_dir = os.path.dirname(os.path.abspath(__file__))
+    files = []
+    for root, dirs, names in os.walk(slicc_dir):
+        dirs.sort()
+        files.extend(
+            os.path.join(root, name)
+            for name in sorted(names)
+            if name.endswith(".py")
+        )
+    files.append(sys.modules["code_formatter"].__file__)
+
+    digest = hashlib.sha256()
+    for filename in files:
+        digest.update(hash_file(filename).encode())
+    return digest.hexdigest()
+
+
+def lookup(code_path, slicc_file, options):
+    """Return the names of the files generated in code_path from
+    slicc_file, or None if they need to be generated (again)."""
+    try:
+        with open(os.path.join(code_path, cache_name)) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        cache.get("slicc_file") != slicc_file
+        or cache.get("options") != options
+        or cache.get("sources") != sources_hash()
+    ):
+        return None
+
+    for filename, digest in cache.get("inputs", {}).items():
+        try:
+            if hash_file(filename) != digest:
+                return None
+        except OSError:
+            return None
+
+    files = cache.get("files", [])
+    for name in files:
+        if not os.path.isfile(os.path.join(code_path, name)):
+            return None
+    return files
+
+
+def store(code_path, slicc_file, options, slicc):
+    """Record what the files generated by slicc were generated from."""
+    cache = {
+        "slicc_file": slicc_file,
+        "options": options,
+        "sources": sources_hash(),
+        "inputs": {
+            filename: hash_file(filename) for filename in slicc.input_files
+        },
+        "files": sorted(slicc.files()),
+    }
+    with open(os.path.join(code_path, cache_name), "w") as f:
+        json.dump(cache, f, indent=4, sort_keys=True)
+
+
+def invalidate(code_path):
+    """Forget what the files in code_path were generated from, for
+    instance because they're about to be regenerated."""
+    try:
+        os.remove(os.path.join(code_path, cache_name))
+    except FileNotFoundError:
+        pass
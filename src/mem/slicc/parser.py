@@ -61,6 +61,8 @@ class SLICC(Grammar):
         self.verbose = verbose
         self.symtab = SymbolTable(self)
         self.base_dir = base_dir
+        # All the files the protocol is read from.
+        self.input_files = [filename]
 
         try:
             self.decl_list = self.parse_file(filename, **kwargs)
@@ -302,6 +304,7 @@ class SLICC(Grammar):
             filename = os.path.join(dirname, p[2])
         else:
             filename = os.path.join(self.base_dir, p[2])
+        self.input_files.append(filename)
         p[0] = self.parse_file(filename)
 
     def p_decl__machine0(self, p):
@@ -45,6 +45,7 @@
 
 #include <zlib.h>
 
+#include <chrono>
 #include <cstdlib>
 #include <iostream>
 #include <list>
@@ -69,12 +70,16 @@ EmbeddedPython::getList()
 }
 
 /*
- * Uncompress and unmarshal the code object stored in the
+ * Uncompress (if needed) and unmarshal the code object stored in the
  * EmbeddedPython
  */
 py::object
 EmbeddedPython::getCode() const
 {
+    auto marshal = py::module_::import("marshal");
+    if (!compressed())
+        return marshal.attr("loads")(py::bytes((const char *)code, len));
+
     Bytef marshalled[len];
     uLongf unzlen = len;
     int ret = uncompress(marshalled, &unzlen, (const Bytef *)code, zlen);
@@ -84,7 +89,6 @@ EmbeddedPython::getCode() const
     }
     assert(unzlen == (uLongf)len);
 
-    auto marshal = py::module_::import("marshal");
     return marshal.attr("loads")(py::bytes((char *)marshalled, len));
 }
 
@@ -92,7 +96,24 @@ bool
 EmbeddedPython::addModule() const
 {
     auto importer = py::module_::import("importer");
-    importer.attr("add_module")(abspath, modpath, getCode());
+
+    // Modules in an uncompressed archive are handed over as a view of
+    // their marshalled code, which the importer only unmarshals when the
+    // module is first imported.
+    if (!compressed()) {
+        importer.attr("add_module")(abspath, modpath,
+                py::memoryview::from_memory(code, len));
+        return true;
+    }
+
+    // Keep track of the time spent decompressing and unmarshalling each
+    // module, so it can be reported by --profile-startup.
+    auto start = std::chrono::steady_clock::now();
+    py::object code = getCode();
+    std::chrono::duration<double> load_time =
+        std::chrono::steady_clock::now() - start;
+
+    importer.attr("add_module")(abspath, modpath, code, load_time.count());
     return true;
 }
 
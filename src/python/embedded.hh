@@ -51,7 +51,10 @@ namespace gem5
 {
 
 /*
- * Data structure describing an embedded python file.
+ * Data structure describing an embedded python file. The code is the
+ * zlib compressed marshalled code object of the file, or, if zlen is
+ * zero, the uncompressed marshalled code within a python archive (see
+ * build_tools/marshal_archive.py).
  */
 struct EmbeddedPython
 {
@@ -64,6 +67,8 @@ struct EmbeddedPython
     EmbeddedPython(const char *abspath, const char *modpath,
             const uint8_t *code, int zlen, int len);
 
+    bool compressed() const { return zlen != 0; }
+
     pybind11::object getCode() const;
     bool addModule() const;
 
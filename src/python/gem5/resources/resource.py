@@ -52,6 +52,7 @@ from ..isas import (
     ISA,
     get_isa_from_str,
 )
+from ..utils.checkpoint_memory import materialize_raw_memory
 from .client import get_resource_json_obj
 from .downloader import get_resource
 from .looppoint import (
@@ -415,8 +416,16 @@ class CheckpointResource(DirectoryResource):
         description: Optional[str] = None,
         source: Optional[str] = None,
         downloader: Optional[partial] = None,
+        mmap_memory: bool = False,
         **kwargs,
     ):
+        """
+        :param mmap_memory: If set, the local path is a copy of the
+                            checkpoint with raw memory images, made the first
+                            time it is needed. gem5 maps these copy-on-write
+                            when restoring, so only the pages used by the
+                            simulation are read. By default is ``False``.
+        """
         super().__init__(
             local_path=local_path,
             id=id,
@@ -425,10 +434,27 @@ class CheckpointResource(DirectoryResource):
             resource_version=resource_version,
             downloader=downloader,
         )
+        self._mmap_memory = mmap_memory
 
     def get_category_name(cls) -> str:
         return "CheckpointResource"
 
+    def get_local_path(self) -> Optional[str]:
+        dir_path = super().get_local_path()
+        if self._mmap_memory:
+            return str(self.materialize_raw_memory())
+        return dir_path
+
+    def materialize_raw_memory(self) -> Path:
+        """
+        Make a copy of the checkpoint with raw memory images, which can be
+        mapped when restoring, next to the checkpoint.
+
+        :returns: The path of the copy.
+        """
+        dir_path = super().get_local_path()
+        return materialize_raw_memory(dir_path, f"{dir_path}.raw")
+
 
 class SimpointResource(AbstractResource):
     """A SimPoint resource. This resource stores all information required to
@@ -96,20 +96,28 @@ def dump_reset_generator():
         yield False
 
 
-def save_checkpoint_generator(checkpoint_dir: Optional[Path] = None):
+def save_checkpoint_generator(
+    checkpoint_dir: Optional[Path] = None, background: bool = False
+):
     """
     A generator for taking a checkpoint. It will take a checkpoint with the
     input path and the current simulation ``Ticks``.
 
     The Simulation run loop will continue after executing the behavior of the
     generator.
+
+    :param background: If ``True``, checkpoints are written in the background
+                       while the simulation carries on.
     """
     if not checkpoint_dir:
         from m5 import options
 
         checkpoint_dir = Path(options.outdir)
     while True:
-        m5.checkpoint((checkpoint_dir / f"cpt.{str(m5.curTick())}").as_posix())
+        m5.checkpoint(
+            (checkpoint_dir / f"cpt.{str(m5.curTick())}").as_posix(),
+            background=background,
+        )
         yield False
 
 
@@ -143,7 +151,7 @@ def skip_generator():
 
 
 def simpoints_save_checkpoint_generator(
-    checkpoint_dir: Path, simpoint: SimpointResource
+    checkpoint_dir: Path, simpoint: SimpointResource, background: bool = False
 ):
     """
     A generator for taking multiple checkpoints for SimPoints. It will save the
@@ -151,12 +159,18 @@ def simpoints_save_checkpoint_generator(
     The Simulation run loop will continue after executing the behavior of the
     generator until all the SimPoints in the ``simpoint_list`` has taken a
     checkpoint.
+
+    :param background: If ``True``, checkpoints are written in the background
+                       while the simulation carries on.
     """
     simpoint_list = simpoint.get_simpoint_start_insts()
     count = 0
     last_start = -1
     while True:
-        m5.checkpoint((checkpoint_dir / f"cpt.SimPoint{count}").as_posix())
+        m5.checkpoint(
+            (checkpoint_dir / f"cpt.SimPoint{count}").as_posix(),
+            background=background,
+        )
         last_start = simpoint_list[count]
         count += 1
         # When the next SimPoint starting instruction is the same as the last
@@ -167,7 +181,10 @@ def simpoints_save_checkpoint_generator(
         while (
             count < len(simpoint_list) and last_start == simpoint_list[count]
         ):
-            m5.checkpoint((checkpoint_dir / f"cpt.SimPoint{count}").as_posix())
+            m5.checkpoint(
+                (checkpoint_dir / f"cpt.SimPoint{count}").as_posix(),
+                background=background,
+            )
             last_start = simpoint_list[count]
             count += 1
         # When there are remaining SimPoints in the list, let the Simulation
@@ -183,6 +200,7 @@ def looppoint_save_checkpoint_generator(
     looppoint: Looppoint,
     update_relatives: bool = True,
     exit_when_empty: bool = True,
+    background: bool = False,
 ):
     """
     A generator for taking a checkpoint for LoopPoint. It will save the
@@ -200,6 +218,9 @@ def looppoint_save_checkpoint_generator(
     :param exit_when_empty: If the generator should exit the simulation loop if
                             all PC paris have been discovered, then it should be
                             ``True``. It is default as ``True``.
+    :param background: If checkpoints should be written in the background
+                       while the simulation carries on, then it should be
+                       ``True``. It is default as ``False``.
     """
     if exit_when_empty:
         total_pairs = len(looppoint.get_targets())
@@ -216,7 +237,10 @@ def looppoint_save_checkpoint_generator(
         if region:
             if update_relatives:
                 looppoint.update_relatives_counts()
-            m5.checkpoint((checkpoint_dir / f"cpt.Region{region}").as_posix())
+            m5.checkpoint(
+                (checkpoint_dir / f"cpt.Region{region}").as_posix(),
+                background=background,
+            )
         total_pairs -= 1
         yield False
 
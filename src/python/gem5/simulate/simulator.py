@@ -634,11 +634,27 @@ class Simulator:
             if exit_on_completion:
                 return
 
-    def save_checkpoint(self, checkpoint_dir: Path) -> None:
+    def save_checkpoint(
+        self, checkpoint_dir: Path, background: bool = False
+    ) -> None:
         """
         This function will save the checkpoint to the specified directory.
 
         :param checkpoint_dir: The path to the directory where the checkpoint
                                will be saved.
+        :param background: If ``True``, the checkpoint is written by a forked
+                           copy of the simulator while the simulation
+                           carries on. See ``wait_for_checkpoints``. By
+                           default is ``False``.
+        """
+        m5.checkpoint(str(checkpoint_dir), background=background)
+
+    def wait_for_checkpoints(self) -> List[str]:
+        """
+        Wait for the checkpoints being written in the background to be
+        complete. These are also waited for when gem5 exits.
+
+        :returns: The directories of the checkpoints that could not be
+                  written.
         """
-        m5.checkpoint(str(checkpoint_dir))
+        return m5.waitForCheckpoints()
@@ -0,0 +1,178 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Conversion of checkpoints to raw memory images.
+
+Checkpoints normally hold gzipped memory images, which have to be
+decompressed in full when a checkpoint is restored. Raw images
+(``format=raw`` in the store's section of ``m5.cpt``) are uncompressed,
+page-aligned and sparse. gem5 maps them copy-on-write when restoring, so
+only the pages a simulation touches are ever read. New checkpoints can be
+written in this format by setting ``System.raw_checkpoint_memory``.
+"""
+
+import gzip
+import mmap
+import os
+import shutil
+from pathlib import Path
+from typing import Union
+
+from .filelock import FileLock
+
+_CHUNK_SIZE = 1 << 20
+
+
+def _write_raw_image(src: Path, dst: Path, size: int) -> None:
+    """Decompress a gzipped memory image into a sparse, page-aligned
+    raw image of ``size`` bytes."""
+    zero_chunk = bytes(_CHUNK_SIZE)
+    zero_page = bytes(mmap.PAGESIZE)
+    with gzip.open(src, "rb") as f_in, open(dst, "wb") as f_out:
+        offset = 0
+        while offset < size:
+            chunk = f_in.read(min(_CHUNK_SIZE, size - offset))
+            if not chunk:
+                break
+            # Leave holes in the file for zero pages
+            if chunk != zero_chunk[: len(chunk)]:
+                view = memoryview(chunk)
+                for start in range(0, len(chunk), mmap.PAGESIZE):
+                    page = view[start : start + mmap.PAGESIZE]
+                    if page != zero_page[: len(page)]:
+                        f_out.seek(offset + start)
+                        f_out.write(page)
+            offset += len(chunk)
+        f_out.truncate(-(-size // mmap.PAGESIZE) * mmap.PAGESIZE)
+
+
+def _convert_stores(lines, checkpoint_dir: Path, output_dir: Path):
+    """Write raw images of the gzipped memory stores of a checkpoint and
+    return the updated lines of its ``m5.cpt`` along with the names of
+    the converted images."""
+    # Find the sections of the backing stores, and their entries
+    sections = []
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            sections.append({"header": i})
+        elif sections and "=" in stripped:
+            key, value = stripped.split("=", 1)
+            sections[-1][key.strip()] = (i, value.strip())
+
+    converted = []
+    for entries in sections:
+        if (
+            "store_id" not in entries
+            or "filename" not in entries
+            or "page_index" in entries
+            or entries.get("format", (None, "gzip"))[1] != "gzip"
+        ):
+            continue
+
+        line_no, filename = entries["filename"]
+        size = int(entries["range_size"][1])
+        stem = filename
+        if stem.endswith(".pmem"):
+            stem = stem[: -len(".pmem")]
+        raw_name = stem + ".raw"
+        _write_raw_image(
+            checkpoint_dir / filename, output_dir / raw_name, size
+        )
+        converted.append(filename)
+
+        lines[line_no] = f"filename={raw_name}\n"
+        if "format" in entries:
+            lines[entries["format"][0]] = "format=raw\n"
+        else:
+            lines[line_no] += "format=raw\n"
+    return lines, converted
+
+
+def _checkpoint_stamp(checkpoint_dir: Path) -> str:
+    """Describe the files of a checkpoint, including its memory images,
+    by their names, sizes and modification times."""
+    stamp = []
+    for entry in sorted(checkpoint_dir.iterdir()):
+        if entry.is_file():
+            st = entry.stat()
+            stamp.append(f"{entry.name} {st.st_size} {st.st_mtime_ns}\n")
+    return "".join(stamp)
+
+
+def materialize_raw_memory(
+    checkpoint_dir: Union[str, Path], output_dir: Union[str, Path]
+) -> Path:
+    """
+    Make a copy of a checkpoint with raw memory images, which gem5 maps
+    rather than reads when restoring.
+
+    The copy is only made if it does not exist yet or any of the files of
+    the checkpoint, e.g. a memory image, changed in size or modification
+    time since it was made. Other files of the checkpoint are copied as
+    they are.
+
+    :param checkpoint_dir: The checkpoint to convert.
+    :param output_dir: Where to put the converted checkpoint.
+
+    :returns: The path of the converted checkpoint.
+    """
+    checkpoint_dir = Path(checkpoint_dir)
+    output_dir = Path(output_dir)
+    cpt_file = checkpoint_dir / "m5.cpt"
+    stamp = _checkpoint_stamp(checkpoint_dir)
+
+    with FileLock(f"{output_dir}.lock", timeout=900):
+        stamp_file = output_dir / ".materialized"
+        if stamp_file.exists() and stamp_file.read_text() == stamp:
+            return output_dir
+
+        # Build the copy next to its final place and move it there once
+        #   it is complete
+        temp_dir = Path(f"{output_dir}.tmp")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        temp_dir.mkdir(parents=True)
+
+        with open(cpt_file) as f:
+            lines = f.readlines()
+        lines, converted = _convert_stores(lines, checkpoint_dir, temp_dir)
+        with open(temp_dir / "m5.cpt", "w") as f:
+            f.writelines(lines)
+
+        for entry in checkpoint_dir.iterdir():
+            if entry.name == "m5.cpt" or entry.name in converted:
+                continue
+            if entry.is_dir():
+                shutil.copytree(entry, temp_dir / entry.name)
+            else:
+                shutil.copy2(entry, temp_dir / entry.name)
+
+        (temp_dir / ".materialized").write_text(stamp)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.rename(temp_dir, output_dir)
+
+    return output_dir
@@ -27,16 +27,33 @@
 import importlib
 import importlib.abc
 import importlib.util
+import marshal
 import os
+import time
+
+
+class ImportRecord:
+    """Time spent executing one embedded module, and the embedded modules
+    it imported while doing so."""
+
+    def __init__(self, modpath, start):
+        self.modpath = modpath
+        self.start = start
+        self.time = 0.0
+        self.children = []
+
+    def self_time(self):
+        return self.time - sum(child.time for child in self.children)
 
 
 class ByteCodeLoader(importlib.abc.Loader):
-    def __init__(self, code):
+    def __init__(self, code, importer):
         super().__init__()
         self.code = code
+        self.importer = importer
 
     def exec_module(self, module):
-        exec(self.code, module.__dict__)
+        self.importer.exec_code(module, self.code)
 
     def get_code(self, _):
         return self.code
@@ -51,25 +68,64 @@ class CodeImporter:
         override_var = os.environ.get("M5_OVERRIDE_PY_SOURCE", "false")
         self.override = override_var.lower() in ("true", "yes")
 
-    def add_module(self, abspath, modpath, code):
+        # Startup profiling information: when the importer was created,
+        # how long it took to decompress and unmarshal each embedded
+        # module, and the tree of embedded module imports.
+        self.created = time.perf_counter()
+        self.load_times = {}
+        self.imports = []
+        self._import_stack = []
+
+    # The code is either a code object, or the marshalled code object of
+    # a module from an uncompressed archive, which is unmarshalled when
+    # the module is first imported.
+    def add_module(self, abspath, modpath, code, load_time=0.0):
         if modpath in self.modules:
             raise AttributeError(f"{modpath} already found in importer")
 
         self.modules[modpath] = (abspath, code)
+        self.load_times[modpath] = load_time
+
+    def get_code(self, modpath):
+        abspath, code = self.modules[modpath]
+        if isinstance(code, memoryview):
+            start = time.perf_counter()
+            code = marshal.loads(code)
+            self.load_times[modpath] = time.perf_counter() - start
+            self.modules[modpath] = (abspath, code)
+        return code
+
+    def exec_code(self, module, code):
+        record = ImportRecord(module.__name__, time.perf_counter())
+        if self._import_stack:
+            self._import_stack[-1].children.append(record)
+        else:
+            self.imports.append(record)
+
+        self._import_stack.append(record)
+        try:
+            exec(code, module.__dict__)
+        finally:
+            record.time = time.perf_counter() - record.start
+            self._import_stack.pop()
 
     def find_spec(self, fullname, path, target=None):
         if fullname not in self.modules:
             return None
 
-        abspath, code = self.modules[fullname]
+        abspath, _ = self.modules[fullname]
 
         if self.override and os.path.exists(abspath):
             src = open(abspath).read()
             code = compile(src, abspath, "exec")
+        else:
+            code = self.get_code(fullname)
 
         is_package = os.path.basename(abspath) == "__init__.py"
         spec = importlib.util.spec_from_loader(
-            name=fullname, loader=ByteCodeLoader(code), is_package=is_package
+            name=fullname,
+            loader=ByteCodeLoader(code, self),
+            is_package=is_package,
         )
 
         spec.loader_state = self.modules.keys()
@@ -77,16 +133,24 @@ class CodeImporter:
         return spec
 
 
+# The CodeImporter installed by install()
+code_importer = None
+
+
 # Create an importer and add it to the meta_path so future imports can
 # use it.  There's currently nothing in the importer, but calls to
-# add_module can be used to add code.
+# add_module can be used to add code. Installing it again (for instance by
+# a script run by gem5py, which has already installed it) does nothing.
 def install():
-    importer = CodeImporter()
+    global code_importer
+    if code_importer is not None:
+        return
+    code_importer = CodeImporter()
     global add_module
-    add_module = importer.add_module
+    add_module = code_importer.add_module
     import sys
 
-    sys.meta_path.insert(0, importer)
+    sys.meta_path.insert(0, code_importer)
 
     # Injected into this module's namespace by the c++ code that loads it.
     _init_all_embedded()
@@ -38,8 +38,10 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import array
 import inspect
 import sys
+from contextlib import contextmanager
 from functools import wraps
 from types import (
     FunctionType,
@@ -121,6 +123,13 @@ instanceDict = {}
 # Did any of the SimObjects lack a header file?
 noCxxHeader = False
 
+# Per-object indices of the candidates found by find_any() and the
+# results of find_all(), keyed by the searched type.  They are only
+# maintained inside a proxyIndex() block, while the same ancestors are
+# searched for the same types over and over again.
+_find_any_index = None
+_find_all_index = None
+
 
 def public_value(key, value):
     return key.startswith("_") or isinstance(
@@ -896,6 +905,8 @@ class SimObject(metaclass=MetaSimObject):
             # implicitly parent unparented objects assigned as params
             if isSimObjectOrVector(value) and not value.has_parent():
                 self.add_child(attr, value)
+            # the value may now be found by a Parent.all proxy
+            self._invalidate_find_index(param.ptype)
             # set the human-readable value dict if this is a param
             # with a literal value and is not being set as an object
             # or proxy.
@@ -960,6 +971,7 @@ class SimObject(metaclass=MetaSimObject):
         child = self._children[name]
         child.clear_parent(self)
         del self._children[name]
+        self._invalidate_find_index()
 
     # Add a new child to this object.
     def add_child(self, name, child):
@@ -980,6 +992,7 @@ class SimObject(metaclass=MetaSimObject):
         if not isNullPointer(child):
             child.set_parent(self, name)
             self._children[name] = child
+            self._invalidate_find_index()
 
     # Take SimObject-valued parameters that haven't been explicitly
     # assigned as children and make them children of the object that
@@ -1024,17 +1037,58 @@ class SimObject(metaclass=MetaSimObject):
     def ini_str(self):
         return self.path()
 
+    # Look up (or compute and record) an entry of one of the proxy
+    # resolution indices for this object.  Outside of a proxyIndex()
+    # block the indices are disabled and the value is always computed.
+    def _find_index_get(self, index, key, compute):
+        if index is None:
+            return compute()
+        entries = index.setdefault(self, {})
+        if key not in entries:
+            entries[key] = compute()
+        return entries[key]
+
+    # Drop the index entries that depend on this object.  The children
+    # of an object only affect its own find_any() candidates, but any
+    # change below an object may affect the find_all() results of all of
+    # its ancestors.  If ptype is given, only the find_all() entries
+    # for types that a param of that type can match are dropped.
+    def _invalidate_find_index(self, ptype=None):
+        if _find_any_index is None:
+            return
+        if ptype is None:
+            _find_any_index.pop(self, None)
+        obj = self
+        while isSimObject(obj):
+            entries = _find_all_index.get(obj)
+            if entries:
+                if ptype is None:
+                    entries.clear()
+                else:
+                    for key in [k for k in entries if issubclass(ptype, k)]:
+                        del entries[key]
+            obj = obj._parent
+
     def find_any(self, ptype):
         if isinstance(self, ptype):
             return self, True
 
         found_obj = None
-        for child in self._children.values():
+        children = self._find_index_get(
+            _find_any_index,
+            ("children", ptype),
+            lambda: [
+                child
+                for child in self._children.values()
+                if isinstance(child, ptype)
+            ],
+        )
+        for child in children:
             visited = False
             if hasattr(child, "_visited"):
                 visited = getattr(child, "_visited")
 
-            if isinstance(child, ptype) and not visited:
+            if not visited:
                 if found_obj != None and child != found_obj:
                     raise AttributeError(
                         "parent.any matched more than one: %s %s"
@@ -1042,18 +1096,32 @@ class SimObject(metaclass=MetaSimObject):
                     )
                 found_obj = child
         # search param space
-        for pname, pdesc in self._params.items():
-            if issubclass(pdesc.ptype, ptype):
-                match_obj = self._values[pname]
-                if found_obj != None and found_obj != match_obj:
-                    raise AttributeError(
-                        "parent.any matched more than one: %s and %s"
-                        % (found_obj.path, match_obj.path)
-                    )
-                found_obj = match_obj
+        pnames = self._find_index_get(
+            _find_any_index,
+            ("params", ptype),
+            lambda: [
+                pname
+                for pname, pdesc in self._params.items()
+                if issubclass(pdesc.ptype, ptype)
+            ],
+        )
+        for pname in pnames:
+            match_obj = self._values[pname]
+            if found_obj != None and found_obj != match_obj:
+                raise AttributeError(
+                    "parent.any matched more than one: %s and %s"
+                    % (found_obj.path, match_obj.path)
+                )
+            found_obj = match_obj
         return found_obj, found_obj != None
 
     def find_all(self, ptype):
+        all = self._find_index_get(
+            _find_all_index, ptype, lambda: self._find_all(ptype)
+        )
+        return list(all), True
+
+    def _find_all(self, ptype):
         all = {}
         # search children
         for child in self._children.values():
@@ -1082,7 +1150,7 @@ class SimObject(metaclass=MetaSimObject):
                     all[match_obj] = True
         # Also make sure to sort the keys based on the objects' path to
         # ensure that the order is the same on all hosts
-        return sorted(all.keys(), key=lambda o: o.path()), True
+        return sorted(all.keys(), key=lambda o: o.path())
 
     def unproxy(self, base):
         return self
@@ -1201,13 +1269,16 @@ class SimObject(metaclass=MetaSimObject):
 
             value = value.getValue()
             if isinstance(self._params[param], VectorParamDesc):
-                assert isinstance(value, list)
+                assert isinstance(value, (list, array.array))
                 vec = getattr(cc_params, param)
                 assert not len(vec)
                 # Some types are exposed as opaque types. They support
                 # the append operation unlike the automatically
                 # wrapped types.
-                if isinstance(vec, list):
+                if isinstance(value, array.array):
+                    # Compact numeric vectors are copied in one block
+                    setattr(cc_params, param, value)
+                elif isinstance(vec, list):
                     setattr(cc_params, param, list(value))
                 else:
                     for v in value:
@@ -1385,6 +1456,23 @@ def coerceSimObjectOrVector(value):
     return value
 
 
+@contextmanager
+def proxyIndex():
+    """
+    Memoize the Parent.any/Parent.all searches done while resolving
+    proxies.  Changes to the configuration hierarchy made inside the
+    block invalidate the affected index entries, so the results are
+    the same as for an unindexed search.
+    """
+    global _find_any_index, _find_all_index
+
+    _find_any_index, _find_all_index = {}, {}
+    try:
+        yield
+    finally:
+        _find_any_index, _find_all_index = None, None
+
+
 baseClasses = allClasses.copy()
 baseInstances = instanceDict.copy()
 
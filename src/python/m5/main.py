@@ -36,6 +36,7 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import atexit
 import code
 import datetime
 import os
@@ -264,6 +265,14 @@ def parse_options():
 
     # Debugging options
     group("Debugging Options")
+    option(
+        "--profile-startup",
+        metavar="FILE",
+        default=None,
+        help="Write a report of the time spent loading and importing the "
+        "embedded python modules to FILE in the output directory "
+        "[Default: %default]",
+    )
     option(
         "--debug-break",
         metavar="TICK[,TICK]",
@@ -366,6 +375,62 @@ def interact(scope):
         code.InteractiveConsole(scope).interact(banner)
 
 
+def _write_startup_profile(filename):
+    import importer
+
+    code_importer = importer.code_importer
+    load_times = code_importer.load_times
+
+    # Flatten the import tree, keeping track of the depth of each import
+    def walk(records, depth):
+        for record in records:
+            yield record, depth
+            yield from walk(record.children, depth + 1)
+
+    imports = list(walk(code_importer.imports, 0))
+
+    with open(filename, "w") as f:
+        print("Embedded python startup profile", file=f)
+        print(file=f)
+        print(f"Embedded modules:         {len(load_times):>10}", file=f)
+        print(
+            f"Decompress + unmarshal:   {sum(load_times.values()):>10.6f} s",
+            file=f,
+        )
+        print(f"Imported modules:         {len(imports):>10}", file=f)
+        print(
+            "Import time:              "
+            f"{sum(r.time for r in code_importer.imports):>10.6f} s",
+            file=f,
+        )
+        print(file=f)
+
+        print("Slowest imports (self time, total time):", file=f)
+        slowest = sorted(imports, key=lambda i: i[0].self_time(), reverse=True)
+        for record, _ in slowest[:20]:
+            print(
+                f"    {record.self_time():10.6f} {record.time:10.6f}  "
+                f"{record.modpath}",
+                file=f,
+            )
+        print(file=f)
+
+        print("Slowest modules to decompress and unmarshal:", file=f)
+        slowest = sorted(load_times.items(), key=lambda i: i[1], reverse=True)
+        for modpath, load_time in slowest[:20]:
+            print(f"    {load_time:10.6f}  {modpath}", file=f)
+        print(file=f)
+
+        print("Import tree (start since install, total, self time):", file=f)
+        for record, depth in imports:
+            start = record.start - code_importer.created
+            print(
+                f"    {start:10.6f} {record.time:10.6f} "
+                f"{record.self_time():10.6f}  {'  ' * depth}{record.modpath}",
+                file=f,
+            )
+
+
 def _check_tracing():
     import _m5.core
 
@@ -468,9 +533,13 @@ def main():
         debug.help()
 
     if options.list_sim_objects:
-        from . import SimObject
+        from . import (
+            SimObject,
+            objects,
+        )
 
         done = True
+        objects.import_all()
         print("SimObjects:")
         objects = list(SimObject.allClasses.keys())
         objects.sort()
@@ -553,6 +622,14 @@ def main():
     # tell C++ about output directory
     core.setOutputDir(options.outdir)
 
+    # The report includes the modules imported by the script, so write
+    # it on exit
+    if options.profile_startup:
+        atexit.register(
+            _write_startup_profile,
+            os.path.join(options.outdir, options.profile_startup),
+        )
+
     # update the system path with elements from the -p option
     sys.path[0:0] = options.path
 
@@ -24,6 +24,89 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-for module in __spec__.loader_state:
-    if module.startswith("m5.objects."):
-        exec(f"from {module} import *")
+# The names defined by the embedded m5.objects.* modules are resolved
+# on demand: the first access to one of them imports the module that
+# defines it, using the index generated at build time.  Names that are
+# not in the index (e.g. the params and proxies that modules re-export)
+# fall back to importing all modules, which is also what happens on
+# "from m5.objects import *".
+
+import importlib as _importlib
+import sys as _sys
+from types import ModuleType as _ModuleType
+
+from m5.object_index import index as _object_index
+
+_modules = [
+    module
+    for module in __spec__.loader_state
+    if module.startswith("m5.objects.")
+]
+
+# Only names defined by exactly one of the embedded modules can be
+# resolved without importing everything.
+_embedded = set(_modules)
+_index = {}
+for _name, _defining in _object_index.items():
+    _defining = [module for module in _defining if module in _embedded]
+    if len(_defining) == 1:
+        _index[_name] = _defining[0]
+del _name, _defining
+
+_all_imported = False
+
+
+class _ObjectsModule(_ModuleType):
+    def __setattr__(self, name, value):
+        # Importing m5.objects.Foo binds the module to the name Foo in
+        # this package, which would hide the SimObject Foo it defines.
+        if (
+            name in _index
+            and isinstance(value, _ModuleType)
+            and value.__name__ == f"{__name__}.{name}"
+        ):
+            return
+        super().__setattr__(name, value)
+
+
+_sys.modules[__name__].__class__ = _ObjectsModule
+
+
+def import_all():
+    """Import all of the embedded m5.objects modules, for users that need
+    to see every SimObject class (e.g. to list them)."""
+    global _all_imported
+
+    if _all_imported:
+        return
+    _all_imported = True
+    for module in _modules:
+        exec(f"from {module} import *", globals())
+
+
+def __getattr__(name):
+    if name in _index:
+        module = _importlib.import_module(_index[name])
+        # The name may only be defined conditionally
+        if hasattr(module, name):
+            globals()[name] = getattr(module, name)
+            return globals()[name]
+
+    if name == "__all__":
+        import_all()
+        return [
+            name
+            for name in globals()
+            if not name.startswith("_") and name != "import_all"
+        ]
+
+    if not name.startswith("__") and not _all_imported:
+        import_all()
+        if name in globals():
+            return globals()[name]
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_index))
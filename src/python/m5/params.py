@@ -54,6 +54,7 @@
 #
 #####################################################################
 
+import array
 import copy
 import datetime
 import math
@@ -187,6 +188,12 @@ class ParamDesc:
         if attr == "ptype":
             from . import SimObject
 
+            if self.ptype_str not in SimObject.allClasses:
+                # The module defining the class may not have been
+                # imported yet, m5.objects imports it on demand.
+                from . import objects
+
+                getattr(objects, self.ptype_str, None)
             ptype = SimObject.allClasses[self.ptype_str]
             assert isSimObjectClass(ptype)
             self.ptype = ptype
@@ -344,10 +351,158 @@ class SimObjectVector(VectorParamValue):
         return flags_dict
 
 
+# Compact vector of plain numbers, used for vector params of numeric
+# types with an array_typecode (see VectorParamDesc.convert).  The list
+# holds plain Python numbers instead of one ParamValue each, and a
+# packed array.array of them is cached so the whole vector can be
+# handed to the C++ params struct as a single buffer.  Indexing and
+# iterating still produce ParamValues of the element type, and values
+# stored into the vector are checked by converting them to it.
+class NumericVectorParamValue(VectorParamValue):
+    def __init__(self, ptype, values):
+        super().__init__(values.tolist())
+        object.__setattr__(self, "_ptype", ptype)
+        object.__setattr__(self, "_array", values)
+
+    def _convert(self, value):
+        return self._ptype(value).getValue()
+
+    def _invalidate(self):
+        object.__setattr__(self, "_array", None)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._ptype(v) for v in list.__getitem__(self, key)]
+        return self._ptype(list.__getitem__(self, key))
+
+    def __iter__(self):
+        for v in list.__iter__(self):
+            yield self._ptype(v)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            value = [self._convert(v) for v in value]
+        else:
+            value = self._convert(value)
+        list.__setitem__(self, key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        list.__delitem__(self, key)
+        self._invalidate()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self._invalidate()
+        return self
+
+    def append(self, value):
+        list.append(self, self._convert(value))
+        self._invalidate()
+
+    def extend(self, values):
+        list.extend(self, [self._convert(v) for v in values])
+        self._invalidate()
+
+    def insert(self, index, value):
+        list.insert(self, index, self._convert(value))
+        self._invalidate()
+
+    def pop(self, index=-1):
+        value = list.pop(self, index)
+        self._invalidate()
+        return self._ptype(value)
+
+    def remove(self, value):
+        list.remove(self, value)
+        self._invalidate()
+
+    def clear(self):
+        list.clear(self)
+        self._invalidate()
+
+    def reverse(self):
+        list.reverse(self)
+        self._invalidate()
+
+    def sort(self, **kwargs):
+        list.sort(self, **kwargs)
+        self._invalidate()
+
+    def config_value(self):
+        return list.copy(self)
+
+    def ini_str(self):
+        return " ".join([str(v) for v in list.__iter__(self)])
+
+    def getValue(self):
+        if self._array is None:
+            typecode = self._ptype.array_typecode
+            object.__setattr__(
+                self, "_array", array.array(typecode, list.copy(self))
+            )
+        return self._array
+
+    def unproxy(self, base):
+        return self
+
+
 class VectorParamDesc(ParamDesc):
+    # The array.array typecode used to store values of this param
+    # compactly, or None if they are stored as a list of ParamValues.
+    def array_typecode(self):
+        if "ptype" not in self.__dict__:
+            # deferred evaluation of SimObject type
+            return None
+        return getattr(self.ptype, "array_typecode", None)
+
+    # Try to convert a sequence or buffer of plain numbers in bulk.
+    # Returns None if the value has to be converted element by element,
+    # which is also how any conversion errors get reported.
+    def convert_compact(self, value):
+        typecode = self.array_typecode()
+        if typecode is None:
+            return None
+        if isinstance(value, NumericVectorParamValue):
+            value = value.getValue()
+        elif isinstance(value, (str, bytes, bytearray)):
+            return None
+        elif not isinstance(value, (list, tuple, array.array)):
+            try:
+                buffer = memoryview(value)
+            except TypeError:
+                return None
+            if buffer.ndim != 1:
+                return None
+            if buffer.format == typecode and buffer.c_contiguous:
+                value = buffer
+
+        try:
+            if isinstance(value, memoryview):
+                values = array.array(typecode)
+                values.frombytes(value.cast("B"))
+            else:
+                # Buffers of another element type or byte order (e.g.
+                # a big endian numpy array) are converted one by one.
+                values = array.array(typecode, list(value))
+        except (TypeError, ValueError, OverflowError):
+            return None
+        if hasattr(self.ptype, "min") and len(values):
+            if min(values) < self.ptype.min or max(values) > self.ptype.max:
+                return None
+        return NumericVectorParamValue(self.ptype, values)
+
     # Convert assigned value to appropriate type.  If the RHS is not a
     # list or tuple, it generates a single-element list.
     def convert(self, value):
+        compact = self.convert_compact(value)
+        if compact is not None:
+            return compact
+
         if isinstance(value, (list, tuple)):
             # list: coerce each element into new list
             tmp_list = [ParamDesc.convert(self, v) for v in value]
@@ -410,6 +565,8 @@ class VectorParamDesc(ParamDesc):
 
     def pybind_predecls(self, code):
         code("#include <vector>")
+        if self.array_typecode():
+            code('#include "python/pybind11/vector_buffer.hh"')
         self.ptype.pybind_predecls(code)
 
     def cxx_decl(self, code):
@@ -601,6 +758,19 @@ class CheckedIntType(MetaParamValue):
                 cls.min = -(2 ** (cls.size - 1))
                 cls.max = (2 ** (cls.size - 1)) - 1
 
+        # Vectors of fixed size integers are stored compactly, unless
+        # the type says otherwise or adds its own checks.
+        if "array_typecode" in dict:
+            return
+        cls.array_typecode = None
+        if hasattr(cls, "size") and cls._check is CheckedInt._check:
+            for typecode in "bhiql":
+                if array.array(typecode).itemsize * 8 == cls.size:
+                    if cls.unsigned:
+                        typecode = typecode.upper()
+                    cls.array_typecode = typecode
+                    break
+
 
 # Abstract superclass for bounds-checked integer parameters.  This
 # class is subclassed to generate parameter classes with specific
@@ -737,6 +907,7 @@ class Cycles(CheckedInt):
     cxx_type = "Cycles"
     size = 64
     unsigned = True
+    array_typecode = None
 
     def getValue(self):
         from _m5.core import Cycles
@@ -761,6 +932,7 @@ class Cycles(CheckedInt):
 class Float(ParamValue, float):
     cxx_type = "double"
     cmd_line_settable = True
+    array_typecode = "d"
 
     def __init__(self, value):
         if isinstance(value, (int, float, NumericParamValue, Float, str)):
@@ -1818,6 +1990,7 @@ class Clock(TickParamValue):
 
 class Voltage(Float):
     ex_str = "1V"
+    array_typecode = None
 
     def __new__(cls, value):
         value = convert.toVoltage(value)
@@ -1830,6 +2003,7 @@ class Voltage(Float):
 
 class Current(Float):
     ex_str = "1mA"
+    array_typecode = None
 
     def __new__(cls, value):
         value = convert.toCurrent(value)
@@ -1842,6 +2016,7 @@ class Current(Float):
 
 class Energy(Float):
     ex_str = "1pJ"
+    array_typecode = None
 
     def __new__(cls, value):
         value = convert.toEnergy(value)
@@ -40,6 +40,7 @@
 import atexit
 import os
 import sys
+import threading
 
 from m5.util.dot_writer import (
     do_dot,
@@ -100,8 +101,9 @@ def instantiate(ckpt_dir=None):
         obj.adoptOrphanParams()
 
     # Unproxy in sorted order for determinism
-    for obj in root.descendants():
-        obj.unproxyParams()
+    with SimObject.proxyIndex():
+        for obj in root.descendants():
+            obj.unproxyParams()
 
     if options.dump_config:
         ini_file = open(os.path.join(options.outdir, options.dump_config), "w")
@@ -321,7 +323,88 @@ def memInvalidate(root):
         obj.memInvalidate()
 
 
-def checkpoint(dir):
+# Checkpoints being written in the background, as a dict of the pid of
+# the process writing each of them to its directory
+_background_checkpoints = {}
+_wait_at_exit = False
+
+
+def _backgroundCheckpointSupported(root):
+    """A background checkpoint is written by a forked copy of the
+    simulator, which can't use KVM, doesn't get a private snapshot of a
+    shared backing store and only keeps the thread that forked it, so
+    the other event queue threads would be missing"""
+    if threading.active_count() > 1:
+        return False
+    kvm_vm = getattr(objects, "KvmVM", None)
+    eventqs = set()
+    for obj in root.descendants():
+        if kvm_vm is not None and isinstance(obj, kvm_vm):
+            return False
+        if isinstance(obj, objects.System) and obj.shared_backstore:
+            return False
+        eventqs.add(int(obj.eventq_index))
+    return len(eventqs) <= 1
+
+
+def _reapCheckpoints(block=False, dirs=None):
+    """Collect the processes that finished writing checkpoints, or wait
+    for them if block is set. Return the directories of the checkpoints
+    that could not be written."""
+    failed = []
+    for pid, dir in list(_background_checkpoints.items()):
+        if dirs is not None and dir not in dirs:
+            continue
+        done, status = os.waitpid(pid, 0 if block else os.WNOHANG)
+        if done == 0:
+            continue
+        del _background_checkpoints[pid]
+        if status != 0:
+            warn(f"Failed to write checkpoint {dir}")
+            failed.append(dir)
+    return failed
+
+
+def pendingCheckpoints():
+    """Return the directories of the checkpoints still being written in
+    the background."""
+    _reapCheckpoints()
+    return list(_background_checkpoints.values())
+
+
+def waitForCheckpoints(dirs=None):
+    """Wait for checkpoints being written in the background.
+
+    Arguments:
+      dirs -- Directories of the checkpoints to wait for, all of them if
+              None.
+
+    Return Value:
+      The directories of the checkpoints that could not be written.
+    """
+    if isinstance(dirs, str):
+        dirs = [dirs]
+    return _reapCheckpoints(block=True, dirs=dirs)
+
+
+def checkpoint(dir, background=False, max_background=4):
+    """Write a checkpoint of the simulator.
+
+    With background set, the simulator is forked and the child process,
+    which has a copy-on-write snapshot of the simulated memory, writes
+    the checkpoint while the simulation carries on. Use
+    pendingCheckpoints and waitForCheckpoints to track the checkpoints
+    being written, which are also waited for when the simulator exits.
+
+    Arguments:
+      dir -- Directory to write the checkpoint to.
+
+    Keyword Arguments:
+      background -- Write the checkpoint in the background.
+      max_background -- Maximum number of checkpoints written in the
+                        background at a time. Once reached, wait for one
+                        of them to be complete first.
+    """
     root = objects.Root.getInstance()
     if not isinstance(root, objects.Root):
         raise TypeError("Checkpoint must be called on a root object.")
@@ -332,8 +415,50 @@ def checkpoint(dir):
     # Recursively create the checkpoint directory if it does not exist.
     os.makedirs(dir, exist_ok=True)
 
-    print("Writing checkpoint")
-    _m5.core.serializeAll(dir)
+    if background and not _backgroundCheckpointSupported(root):
+        warn(
+            "Can't write checkpoints in the background with KVM, a "
+            "shared backing store or several threads or event queues. "
+            "Writing it now."
+        )
+        background = False
+
+    if not background:
+        print("Writing checkpoint")
+        _m5.core.serializeAll(dir)
+        return
+
+    global _wait_at_exit
+    if not _wait_at_exit:
+        atexit.register(waitForCheckpoints)
+        _wait_at_exit = True
+
+    # Wait for the oldest checkpoints if too many are being written
+    _reapCheckpoints()
+    while len(_background_checkpoints) >= max(max_background, 1):
+        waitForCheckpoints(next(iter(_background_checkpoints.values())))
+
+    print("Writing checkpoint in the background")
+    # Don't let the child flush output buffered by the parent
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            _m5.core.serializeAll(dir)
+            status = 0
+        except BaseException:
+            import traceback
+
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    _background_checkpoints[pid] = dir
 
 
 def _changeMemoryMode(system, mode):
@@ -53,6 +53,22 @@ class PyBindProperty(PyBindExport):
         code('.${export}("${{self.name}}", &${cname}::${{self.cxx_name}})')
 
 
+class PyBindVectorProperty(PyBindProperty):
+    """A std::vector property which, in addition to any sequence, can be
+    assigned from a Python buffer of matching element type (e.g. an
+    array.array) in a single copy."""
+
+    def export(self, code, cname):
+        if not self.writable:
+            return super().export(code, cname)
+        code(
+            '.def_property("${{self.name}}", '
+            "[](const ${cname} &self) { return self.${{self.cxx_name}}; }, "
+            "[](${cname} &self, pybind11::handle value) { "
+            "vectorFromPython(self.${{self.cxx_name}}, value); })"
+        )
+
+
 class PyBindMethod(PyBindExport):
     def __init__(
         self,
@@ -0,0 +1,75 @@
+/*
+ * Copyright (c) 2026 The gem5 Authors
+ * All Rights Reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are
+ * met: redistributions of source code must retain the above copyright
+ * notice, this list of conditions and the following disclaimer;
+ * redistributions in binary form must reproduce the above copyright
+ * notice, this list of conditions and the following disclaimer in the
+ * documentation and/or other materials provided with the distribution;
+ * neither the name of the copyright holders nor the names of its
+ * contributors may be used to endorse or promote products derived from
+ * this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+ * "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+ * LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+ * A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+ * OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+ * SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+ * LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+ * DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+ * THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+ * (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+ * OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+ *
+ */
+
+#ifndef __PYTHON_PYBIND11_VECTOR_BUFFER_HH__
+#define __PYTHON_PYBIND11_VECTOR_BUFFER_HH__
+
+#include <type_traits>
+#include <vector>
+
+#include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
+
+namespace gem5
+{
+
+/**
+ * Assign a vector of arithmetic values from a Python object. Objects
+ * exposing a contiguous, one dimensional buffer of the right element
+ * type (e.g. the array.array used for compact numeric vector params)
+ * are copied in a single block. Any other sequence is converted
+ * element by element.
+ *
+ * @param vec Vector to assign.
+ * @param value Python object to assign the vector from.
+ */
+template <typename T>
+void
+vectorFromPython(std::vector<T> &vec, pybind11::handle value)
+{
+    static_assert(std::is_arithmetic_v<T>);
+
+    if (pybind11::isinstance<pybind11::buffer>(value)) {
+        pybind11::buffer_info info =
+            pybind11::reinterpret_borrow<pybind11::buffer>(value).request();
+        if (info.ndim == 1 && info.itemsize == sizeof(T) &&
+                info.strides[0] == sizeof(T) &&
+                info.format == pybind11::format_descriptor<T>::format()) {
+            const T *data = static_cast<const T *>(info.ptr);
+            vec.assign(data, data + info.shape[0]);
+            return;
+        }
+    }
+
+    vec = value.cast<std::vector<T>>();
+}
+
+} // namespace gem5
+
+#endif // __PYTHON_PYBIND11_VECTOR_BUFFER_HH__
@@ -104,6 +104,22 @@ class System(SimObject):
         "shared_backstore is non-empty.",
     )
 
+    # Checkpoints normally hold gzipped memory images. Raw images are
+    # larger, but are mapped copy-on-write at restore so that only the
+    # pages that are used are ever read.
+    raw_checkpoint_memory = Param.Bool(
+        False,
+        "Checkpoint memory as uncompressed, page-aligned images that are "
+        "mmapped when restoring",
+    )
+
+    checkpoint_compression_threads = Param.Unsigned(
+        1,
+        "Number of threads compressing the memory of a checkpoint. With "
+        "more than one, memory is compressed in blocks written as separate "
+        "gzip members",
+    )
+
     cache_line_size = Param.Unsigned(64, "Cache line size in bytes")
 
     redirect_paths = VectorParam.RedirectPath([], "Path redirections")
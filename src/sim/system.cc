@@ -171,7 +171,8 @@ System::System(const Params &p)
       physProxy(_systemPort, p.cache_line_size),
       workload(p.workload),
       physmem(name() + ".physmem", p.memories, p.mmap_using_noreserve,
-              p.shared_backstore, p.auto_unlink_shared_backstore),
+              p.shared_backstore, p.auto_unlink_shared_backstore,
+              p.raw_checkpoint_memory, p.checkpoint_compression_threads),
       ShadowRomRanges(p.shadow_rom_ranges.begin(),
                       p.shadow_rom_ranges.end()),
       memoryMode(p.mem_mode),
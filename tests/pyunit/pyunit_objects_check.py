@@ -0,0 +1,94 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+import unittest
+from types import ModuleType
+
+import m5.objects
+from m5.SimObject import SimObject
+
+
+class LazyObjectsTestSuite(unittest.TestCase):
+    def test_index_resolves_defining_module(self):
+        for name, module in m5.objects._index.items():
+            value = getattr(m5.objects, name)
+            self.assertIn(module, sys.modules)
+            self.assertIs(value, getattr(sys.modules[module], name))
+            # Later lookups don't go through __getattr__ again
+            self.assertIs(vars(m5.objects)[name], value)
+
+    def test_imports_only_defining_module(self):
+        unimported = [
+            (name, module)
+            for name, module in m5.objects._index.items()
+            if module not in sys.modules and name not in vars(m5.objects)
+        ]
+        if not unimported or m5.objects._all_imported:
+            self.skipTest("all m5.objects modules are already imported")
+        name, module = unimported[0]
+        before = set(m5.objects._modules) & set(sys.modules)
+        getattr(m5.objects, name)
+        after = set(m5.objects._modules) & set(sys.modules)
+        self.assertIn(module, after - before)
+        # The defining module may import others for its param types,
+        # but a lookup must not fall back to importing all of them.
+        self.assertFalse(m5.objects._all_imported)
+
+    def test_module_does_not_hide_class(self):
+        for name, module in m5.objects._index.items():
+            if module == f"m5.objects.{name}":
+                value = getattr(m5.objects, name)
+                self.assertNotIsInstance(value, ModuleType)
+                self.assertIs(value, getattr(sys.modules[module], name))
+
+    def test_dir(self):
+        self.assertTrue(set(m5.objects._index) <= set(dir(m5.objects)))
+
+
+# Looking up names that are not in the index imports all modules, so
+# these tests run after the ones above (test classes run in name order).
+class ObjectsImportAllTestSuite(unittest.TestCase):
+    def test_missing_name(self):
+        with self.assertRaises(AttributeError):
+            m5.objects.NoSuchSimObjectForTesting
+        self.assertFalse(hasattr(m5.objects, "__no_such_dunder__"))
+
+    def test_import_all(self):
+        m5.objects.import_all()
+        self.assertTrue(m5.objects._all_imported)
+        for module in m5.objects._modules:
+            self.assertIn(module, sys.modules)
+        # Importing again is a no-op
+        m5.objects.import_all()
+
+        names = m5.objects.__all__
+        self.assertNotIn("import_all", names)
+        self.assertTrue(set(m5.objects._index) <= set(names))
+        for name in names:
+            self.assertFalse(name.startswith("_"))
+        self.assertTrue(issubclass(m5.objects.SimObject, SimObject))
@@ -0,0 +1,152 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import array
+import copy
+import unittest
+
+from m5.params import (
+    Float,
+    NumericVectorParamValue,
+    UInt8,
+    UInt64,
+    VectorParam,
+    VectorParamValue,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def make_param(ptype_name):
+    desc = getattr(VectorParam, ptype_name)([], "test vector")
+    desc.name = "test"
+    return desc
+
+
+class NumericVectorParamTestSuite(unittest.TestCase):
+    def test_list(self):
+        value = make_param("Float").convert([1, 2.5])
+        self.assertIsInstance(value, NumericVectorParamValue)
+        self.assertIsInstance(value, list)
+        self.assertEqual(len(value), 2)
+        self.assertIsInstance(value[0], Float)
+        self.assertEqual(list(value), [1.0, 2.5])
+
+    def test_tuple_and_array(self):
+        desc = make_param("UInt8")
+        for values in ((1, 2, 3), array.array("i", [1, 2, 3])):
+            value = desc.convert(values)
+            self.assertIsInstance(value, NumericVectorParamValue)
+            self.assertEqual(value.config_value(), [1, 2, 3])
+
+    @unittest.skipIf(numpy is None, "numpy is not available")
+    def test_numpy(self):
+        desc = make_param("Float")
+        for values in (
+            numpy.array([1.0, 2.0, 3.0]),
+            numpy.array([1.0, 2.0, 3.0], dtype=">f8"),
+            numpy.array([1, 2, 3], dtype="int32"),
+            numpy.array([1.0, 0.0, 2.0, 0.0, 3.0])[::2],
+        ):
+            value = desc.convert(values)
+            self.assertIsInstance(value, NumericVectorParamValue)
+            self.assertEqual(value.config_value(), [1.0, 2.0, 3.0])
+
+    def test_fallback(self):
+        desc = make_param("UInt64")
+        value = desc.convert(["1", 2])
+        self.assertNotIsInstance(value, NumericVectorParamValue)
+        self.assertIsInstance(value, VectorParamValue)
+        self.assertEqual(value.getValue(), [1, 2])
+
+    def test_out_of_bounds(self):
+        with self.assertRaises(TypeError):
+            make_param("UInt8").convert([1, 256])
+        value = make_param("UInt8").convert([1])
+        with self.assertRaises(TypeError):
+            value.append(-1)
+
+    def test_round_trip(self):
+        desc = make_param("UInt64")
+        value = desc.convert([0, 2**64 - 1])
+        again = desc.convert(value)
+        self.assertIsInstance(again, NumericVectorParamValue)
+        self.assertIsNot(again, value)
+        self.assertEqual(again.config_value(), [0, 2**64 - 1])
+        self.assertEqual(desc.convert(value.config_value()), value)
+
+    def test_mutation(self):
+        value = make_param("UInt64").convert([1, 2])
+        value.append(3)
+        value += [4]
+        value.extend([5])
+        value.insert(0, 0)
+        value[1:3] = [10, 20]
+        value[-1] = 50
+        self.assertEqual(value.config_value(), [0, 10, 20, 3, 4, 50])
+        self.assertEqual(value.pop().value, 50)
+        del value[0]
+        self.assertEqual(value.getValue(), array.array("Q", [10, 20, 3, 4]))
+        self.assertEqual(value + [5], [10, 20, 3, 4, 5])
+        self.assertEqual([5] + value, [5, 10, 20, 3, 4])
+
+    def test_copy(self):
+        value = make_param("UInt8").convert([1, 2])
+        clone = copy.deepcopy(value)
+        clone.append(3)
+        self.assertIsInstance(clone, NumericVectorParamValue)
+        self.assertEqual(value.config_value(), [1, 2])
+        self.assertEqual(clone.getValue(), array.array("B", [1, 2, 3]))
+
+    def test_ini_str(self):
+        self.assertEqual(
+            make_param("Float").convert([1, 0.5]).ini_str(), "1.0 0.5"
+        )
+        self.assertEqual(make_param("UInt8").convert([7, 8]).ini_str(), "7 8")
+
+    def test_pretty_print(self):
+        desc = make_param("UInt8")
+        self.assertEqual(desc.pretty_print(desc.convert([1, 2])), ["1", "2"])
+
+    def test_buffer(self):
+        # getValue() is what gets handed to vectorFromPython, which only
+        # takes the one block copy for a contiguous buffer of the C++
+        # element type.
+        for ptype, values in ((Float, [1.5]), (UInt8, [1]), (UInt64, [1])):
+            value = make_param(ptype.__name__).convert(values)
+            buffer = memoryview(value.getValue())
+            self.assertEqual(buffer.ndim, 1)
+            self.assertTrue(buffer.c_contiguous)
+            self.assertEqual(buffer.tolist(), values)
+            if ptype is Float:
+                self.assertEqual(buffer.format, "d")
+            else:
+                self.assertEqual(buffer.itemsize * 8, ptype.size)
+                self.assertEqual(buffer.format.isupper(), ptype.unsigned)
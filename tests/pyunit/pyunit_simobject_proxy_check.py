@@ -0,0 +1,137 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+
+from m5.params import (
+    NULL,
+    Param,
+)
+from m5.proxy import Parent
+from m5.SimObject import (
+    SimObject,
+    proxyIndex,
+)
+
+
+class ProxyIndexLeaf(SimObject):
+    type = "ProxyIndexLeaf"
+    cxx_header = "sim/sim_object.hh"
+    cxx_class = "gem5::SimObject"
+
+
+class ProxyIndexTop(SimObject):
+    type = "ProxyIndexTop"
+    cxx_header = "sim/sim_object.hh"
+    cxx_class = "gem5::SimObject"
+
+
+class ProxyIndexHolder(SimObject):
+    type = "ProxyIndexHolder"
+    cxx_header = "sim/sim_object.hh"
+    cxx_class = "gem5::SimObject"
+
+    leaf = Param.ProxyIndexLeaf(NULL, "A leaf held as a param")
+
+
+class ProxyIndexUser(SimObject):
+    type = "ProxyIndexUser"
+    cxx_header = "sim/sim_object.hh"
+    cxx_class = "gem5::SimObject"
+
+    leaf = Param.ProxyIndexLeaf(Parent.any, "The leaf of the parent")
+
+
+class ProxyIndexTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.top = ProxyIndexTop()
+        self.top.a = ProxyIndexLeaf()
+        self.top.holder = ProxyIndexHolder()
+        self.top.user = ProxyIndexUser()
+
+    def leaves(self, obj):
+        found, done = obj.find_all(ProxyIndexLeaf)
+        self.assertTrue(done)
+        return found
+
+    def test_same_results(self):
+        any_unindexed = self.top.user.leaf.unproxy(self.top.user)
+        all_unindexed = self.leaves(self.top)
+        with proxyIndex():
+            self.assertIs(
+                self.top.user.leaf.unproxy(self.top.user), any_unindexed
+            )
+            self.assertEqual(self.leaves(self.top), all_unindexed)
+            # The second lookups are answered from the index
+            self.assertIs(
+                self.top.user.leaf.unproxy(self.top.user), any_unindexed
+            )
+            self.assertEqual(self.leaves(self.top), all_unindexed)
+        self.assertEqual(all_unindexed, [self.top.a])
+
+    def test_add_child(self):
+        with proxyIndex():
+            self.assertEqual(self.leaves(self.top), [self.top.a])
+            self.assertEqual(self.leaves(self.top.holder), [])
+            self.top.holder.b = ProxyIndexLeaf()
+            self.assertEqual(
+                self.leaves(self.top), [self.top.a, self.top.holder.b]
+            )
+            self.assertEqual(self.leaves(self.top.holder), [self.top.holder.b])
+            # A second leaf makes Parent.any ambiguous
+            self.top.c = ProxyIndexLeaf()
+            with self.assertRaises(AttributeError):
+                self.top.user.leaf.unproxy(self.top.user)
+
+    def test_clear_child(self):
+        self.top.c = ProxyIndexLeaf()
+        with proxyIndex():
+            self.assertEqual(self.leaves(self.top), [self.top.a, self.top.c])
+            with self.assertRaises(AttributeError):
+                self.top.user.leaf.unproxy(self.top.user)
+            self.top.clear_child("c")
+            self.assertEqual(self.leaves(self.top), [self.top.a])
+            self.assertIs(
+                self.top.user.leaf.unproxy(self.top.user), self.top.a
+            )
+
+    def test_setattr(self):
+        with proxyIndex():
+            self.assertEqual(self.leaves(self.top.holder), [])
+            self.top.holder.leaf = self.top.a
+            self.assertEqual(self.leaves(self.top.holder), [self.top.a])
+            self.top.holder.leaf = NULL
+            self.assertEqual(self.leaves(self.top.holder), [])
+
+    def test_disabled_outside(self):
+        with proxyIndex():
+            self.assertEqual(self.leaves(self.top), [self.top.a])
+        # Changes made after the block are seen without invalidation
+        self.top.holder.b = ProxyIndexLeaf()
+        self.assertEqual(
+            self.leaves(self.top), [self.top.a, self.top.holder.b]
+        )
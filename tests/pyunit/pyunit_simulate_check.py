@@ -0,0 +1,124 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import importlib
+import os
+import threading
+import types
+import unittest
+from unittest import mock
+
+# m5 re-exports the simulate function under the name of its module
+simulate = importlib.import_module("m5.simulate")
+
+
+class BackgroundCheckpointsTestSuite(unittest.TestCase):
+    """Tests the bookkeeping of the checkpoints written in the background"""
+
+    def setUp(self):
+        self._saved = dict(simulate._background_checkpoints)
+        simulate._background_checkpoints.clear()
+        self._pipes = []
+
+    def tearDown(self):
+        for write in self._pipes:
+            os.close(write)
+        for pid in simulate._background_checkpoints:
+            os.waitpid(pid, 0)
+        simulate._background_checkpoints.clear()
+        simulate._background_checkpoints.update(self._saved)
+
+    def _writer(self, dir, status):
+        """Fork a stand-in for a checkpoint writer, which exits with the
+        given status once the returned file descriptor is closed"""
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(write)
+            os.read(read, 1)
+            os._exit(status)
+        os.close(read)
+        self._pipes.append(write)
+        simulate._background_checkpoints[pid] = dir
+        return write
+
+    def _finish(self, write):
+        self._pipes.remove(write)
+        os.close(write)
+
+    def test_pending(self):
+        write = self._writer("cpt.1", 0)
+        self.assertEqual(simulate.pendingCheckpoints(), ["cpt.1"])
+        self._finish(write)
+        self.assertEqual(simulate.waitForCheckpoints(), [])
+        self.assertEqual(simulate.pendingCheckpoints(), [])
+
+    def test_failed(self):
+        self._finish(self._writer("cpt.1", 0))
+        self._finish(self._writer("cpt.2", 1))
+        with mock.patch.object(simulate, "warn") as warn:
+            self.assertEqual(simulate.waitForCheckpoints(), ["cpt.2"])
+        warn.assert_called_once()
+        self.assertEqual(simulate._background_checkpoints, {})
+
+    def test_wait_for_dirs(self):
+        write = self._writer("cpt.1", 0)
+        self._finish(self._writer("cpt.2", 1))
+        with mock.patch.object(simulate, "warn"):
+            self.assertEqual(simulate.waitForCheckpoints("cpt.2"), ["cpt.2"])
+        self.assertEqual(simulate.pendingCheckpoints(), ["cpt.1"])
+        self._finish(write)
+        self.assertEqual(simulate.waitForCheckpoints(["cpt.1"]), [])
+        self.assertEqual(simulate.pendingCheckpoints(), [])
+
+
+class BackgroundCheckpointSupportedTestSuite(unittest.TestCase):
+    """Tests when checkpoints can be written by a forked simulator"""
+
+    @staticmethod
+    def _root(*eventqs):
+        objs = [types.SimpleNamespace(eventq_index=i) for i in eventqs]
+        return types.SimpleNamespace(descendants=lambda: iter(objs))
+
+    def test_single_eventq(self):
+        root = self._root(0, 0, 0)
+        self.assertTrue(simulate._backgroundCheckpointSupported(root))
+
+    def test_several_eventqs(self):
+        root = self._root(0, 1, 2)
+        self.assertFalse(simulate._backgroundCheckpointSupported(root))
+
+    def test_several_threads(self):
+        done = threading.Event()
+        thread = threading.Thread(target=done.wait)
+        thread.start()
+        try:
+            root = self._root(0, 0)
+            self.assertFalse(simulate._backgroundCheckpointSupported(root))
+        finally:
+            done.set()
+            thread.join()
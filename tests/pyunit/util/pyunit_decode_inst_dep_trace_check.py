@@ -0,0 +1,203 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+root_dir = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 3
+)
+sys.path.insert(0, os.path.join(root_dir, "util"))
+
+# Generate the proto definitions in a directory of their own rather
+# than in util as the script itself would.
+proto_dir = tempfile.mkdtemp()
+try:
+    subprocess.check_call(
+        [
+            "protoc",
+            f"--python_out={proto_dir}",
+            f"--proto_path={os.path.join(root_dir, 'src', 'proto')}",
+            "inst_dep_record.proto",
+        ]
+    )
+    sys.path.insert(0, proto_dir)
+    import decode_inst_dep_trace
+    import inst_dep_record_pb2
+    import protolib
+
+    RecordType = inst_dep_record_pb2.InstDepRecord.RecordType
+except Exception:
+    shutil.rmtree(proto_dir, ignore_errors=True)
+    decode_inst_dep_trace = None
+
+
+# (seq_num, type, comp_delay, rob_dep, reg_dep). With no memory latency,
+# the records complete at ticks 10, 15, 16, 18, 13 and 14.
+RECORDS = [
+    (1, "COMP", 10, [], []),
+    (2, "LOAD", 5, [1], []),
+    (3, "COMP", 1, [], [2]),
+    (4, "STORE", 2, [2], [3]),
+    (5, "LOAD", 3, [], [1]),
+    (6, "COMP", 1, [], [5]),
+]
+
+
+@unittest.skipIf(
+    decode_inst_dep_trace is None, "protoc or protobuf is not available"
+)
+class DecodeInstDepTraceTestSuite(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(proto_dir, ignore_errors=True)
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.trace = os.path.join(self.dir, "trace.pb")
+        with open(self.trace, "wb") as f:
+            f.write(b"gem5")
+            header = inst_dep_record_pb2.InstDepRecordHeader()
+            header.obj_id = "test"
+            header.tick_freq = 1000
+            header.window_size = 64
+            protolib.encodeMessage(f, header)
+            for seq_num, type, comp_delay, rob_dep, reg_dep in RECORDS:
+                record = inst_dep_record_pb2.InstDepRecord()
+                record.seq_num = seq_num
+                record.type = RecordType.Value(type)
+                record.comp_delay = comp_delay
+                record.rob_dep.extend(rob_dep)
+                record.reg_dep.extend(reg_dep)
+                protolib.encodeMessage(f, record)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def run_script(self, *args):
+        argv = ["decode_inst_dep_trace.py", self.trace, *args]
+        with mock.patch.object(sys, "argv", argv):
+            with contextlib.redirect_stdout(io.StringIO()):
+                decode_inst_dep_trace.main()
+
+    def read_subtrace(self, filename):
+        proto_in = protolib.openMessageReader(filename)
+        self.assertEqual(proto_in.read(4), b"gem5")
+        header = inst_dep_record_pb2.InstDepRecordHeader()
+        protolib.decodeMessage(proto_in, header)
+        self.assertEqual(header.obj_id, "test")
+        records = []
+        for record in proto_in.messages(inst_dep_record_pb2.InstDepRecord()):
+            records.append(
+                (
+                    record.seq_num,
+                    RecordType.Name(record.type),
+                    record.comp_delay,
+                    list(record.rob_dep),
+                    list(record.reg_dep),
+                )
+            )
+        proto_in.close()
+        return records
+
+    def test_seq_range(self):
+        subtrace = os.path.join(self.dir, "sub.pb")
+        stats = os.path.join(self.dir, "stats.json")
+        self.run_script(
+            "--seq-range", "2", "5", "--subtrace", subtrace, "--stats", stats
+        )
+        # The dependency of record 2 on record 1 is dropped
+        self.assertEqual(
+            self.read_subtrace(subtrace),
+            [
+                (2, "LOAD", 5, [], []),
+                (3, "COMP", 1, [], [2]),
+                (4, "STORE", 2, [2], [3]),
+            ],
+        )
+        with open(stats) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["records"], 3)
+        self.assertEqual(summary["mix"], {"LOAD": 1, "COMP": 1, "STORE": 1})
+        self.assertEqual(summary["rob_dep_distance"], {"1": 1, "2": 1})
+        self.assertEqual(summary["reg_dep_distance"], {"1": 2})
+        self.assertEqual(summary["critical_path_ticks"], 18 - 10)
+
+    def test_type(self):
+        subtrace = os.path.join(self.dir, "sub.pb.gz")
+        self.run_script(
+            "--type", "LOAD", "--type", "STORE", "--subtrace", subtrace
+        )
+        self.assertEqual(
+            self.read_subtrace(subtrace),
+            [
+                (2, "LOAD", 5, [], []),
+                (4, "STORE", 2, [2], []),
+                (5, "LOAD", 3, [], []),
+            ],
+        )
+
+    def test_tick_range(self):
+        subtrace = os.path.join(self.dir, "sub.pb")
+        stats = os.path.join(self.dir, "stats.json")
+        self.run_script(
+            "--tick-range",
+            "13",
+            "16",
+            "--subtrace",
+            subtrace,
+            "--stats",
+            stats,
+        )
+        self.assertEqual(
+            self.read_subtrace(subtrace),
+            [
+                (2, "LOAD", 5, [], []),
+                (5, "LOAD", 3, [], []),
+                (6, "COMP", 1, [], [5]),
+            ],
+        )
+        with open(stats) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["critical_path_ticks"], 15 - 10)
+
+    def test_mem_latency(self):
+        stats = os.path.join(self.dir, "stats.json")
+        self.run_script("--mem-latency", "100", "--stats", stats)
+        with open(stats) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["records"], len(RECORDS))
+        # 1 -> 2 (load) -> 3 -> 4 (store)
+        self.assertEqual(summary["critical_path_ticks"], 10 + 105 + 1 + 102)
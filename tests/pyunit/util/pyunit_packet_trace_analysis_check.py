@@ -0,0 +1,99 @@
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import random
+import sys
+import unittest
+
+util_dir = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 3, "util"
+)
+sys.path.insert(0, util_dir)
+
+try:
+    import numpy as np
+    import packet_trace_analysis
+except Exception:
+    # numpy is missing or the protobuf modules can't be generated
+    packet_trace_analysis = None
+
+
+def brute_force_distances(lines):
+    distances = []
+    for t, line in enumerate(lines):
+        prev = None
+        for k in range(t - 1, -1, -1):
+            if lines[k] == line:
+                prev = k
+                break
+        if prev is None:
+            distances.append(-1)
+        else:
+            distances.append(len(set(lines[prev + 1 : t])))
+    return distances
+
+
+@unittest.skipIf(
+    packet_trace_analysis is None, "packet_trace_analysis is not available"
+)
+class ReuseDistanceTestSuite(unittest.TestCase):
+    def check(self, lines, batch_sizes):
+        reuse = packet_trace_analysis.ReuseDistance()
+        distances = []
+        i = 0
+        for size in batch_sizes:
+            batch = np.array(lines[i : i + size], dtype=np.uint64)
+            distances += reuse.access(batch).tolist()
+            i += size
+        self.assertEqual(i, len(lines))
+        self.assertEqual(distances, brute_force_distances(lines))
+
+    def test_simple(self):
+        self.check([1, 2, 3, 1, 1, 3, 2, 4, 2], [9])
+        self.check([1, 2, 3, 1, 1, 3, 2, 4, 2], [1] * 9)
+        self.check([1, 2, 3, 1, 1, 3, 2, 4, 2], [4, 0, 5])
+
+    def test_empty(self):
+        self.check([], [0])
+
+    def test_random(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            length = rng.randrange(300)
+            num_lines = rng.randrange(1, 50)
+            lines = [rng.randrange(num_lines) for _ in range(length)]
+            batch_sizes = []
+            while sum(batch_sizes) < length:
+                batch_sizes.append(
+                    min(rng.randrange(1, 80), length - sum(batch_sizes))
+                )
+            self.check(lines, batch_sizes)
+
+    def test_large_lines(self):
+        lines = [2**64 - 1, 0, 2**63, 2**64 - 1, 2**63, 0]
+        self.check(lines, [2, 4])
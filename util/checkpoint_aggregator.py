@@ -28,10 +28,23 @@
 
 import gzip
 import os
+import queue
 import re
 import sys
+import threading
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+)
 from configparser import ConfigParser
 
+# Size of the chunks memory images are read, copied and compressed in.
+#   Large chunks keep the per-call Python overhead negligible next to the
+#   actual (de)compression and I/O.
+_CHUNK_SIZE = 1 << 20
+_BLOCK_SIZE = 4 << 20
+_PAGE_SIZE = 1 << 12
+
 
 class myCP(ConfigParser):
     def __init__(self):
@@ -41,28 +54,193 @@ class myCP(ConfigParser):
         return optionstr
 
 
-def aggregate(output_dir, cpts, no_compress, memory_size):
+class SparseWriter:
+    """Write an uncompressed memory image, leaving holes in the file
+    rather than writing out runs of zeros"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+
+    def write(self, data):
+        self.fileobj.write(data)
+
+    def write_zeros(self, size):
+        self.fileobj.seek(size, os.SEEK_CUR)
+
+    def close(self):
+        # Extend the file over any trailing hole
+        self.fileobj.truncate()
+
+
+class ParallelGzipWriter:
+    """Compress a memory image on a pool of threads. The data is split
+    into blocks which are compressed independently and written out, in
+    order, as separate gzip members. Readers, including the zlib gzread
+    gem5 restores memory with, see the concatenated members as a single
+    stream."""
+
+    def __init__(self, fileobj, jobs, compresslevel=6, block_size=_BLOCK_SIZE):
+        self.fileobj = fileobj
+        self.compresslevel = compresslevel
+        self.block_size = block_size
+        self.pool = ThreadPoolExecutor(max_workers=jobs)
+        # Bound the number of blocks in flight to bound memory use
+        self.max_pending = 2 * jobs
+        self.pending = []
+        self.buf = bytearray()
+        self.zero_member = None
+
+    def _compress(self, data):
+        return gzip.compress(data, self.compresslevel, mtime=0)
+
+    def _submit(self, future):
+        self.pending.append(future)
+        while len(self.pending) > self.max_pending:
+            self.fileobj.write(self.pending.pop(0).result())
+
+    def _submit_block(self, data):
+        self._submit(self.pool.submit(self._compress, bytes(data)))
+
+    def write(self, data):
+        self.buf += data
+        if len(self.buf) >= self.block_size:
+            view = memoryview(self.buf)
+            end = len(self.buf) - len(self.buf) % self.block_size
+            for offset in range(0, end, self.block_size):
+                self._submit_block(view[offset : offset + self.block_size])
+            view.release()
+            del self.buf[:end]
+
+    def write_zeros(self, size):
+        # Fill up the current block, then reuse a single compressed
+        #   member for all the whole blocks of zeros
+        fill = min(size, -len(self.buf) % self.block_size)
+        self.write(bytes(fill))
+        size -= fill
+        if size >= self.block_size:
+            if self.zero_member is None:
+                self.zero_member = self._compress(bytes(self.block_size))
+            while size >= self.block_size:
+                # Keep the members in order behind any pending blocks
+                future = Future()
+                future.set_result(self.zero_member)
+                self._submit(future)
+                size -= self.block_size
+        self.write(bytes(size))
+
+    def close(self):
+        if self.buf:
+            self._submit_block(self.buf)
+            self.buf = bytearray()
+        for future in self.pending:
+            self.fileobj.write(future.result())
+        self.pending = []
+        self.pool.shutdown()
+
+
+def _put(chunks, item, cancelled):
+    """Queue an item unless the consumer has given up"""
+    while not cancelled.is_set():
+        try:
+            chunks.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+
+def _read_store(path, size, image_format, chunks, cancelled):
+    """Decompress the first size bytes of a memory image into a queue of
+    chunks, ending with None, or the exception that stopped the read"""
+    try:
+        if image_format == "raw":
+            image = open(path, "rb")
+        else:
+            image = gzip.open(path, "rb")
+        with image as gf:
+            while size > 0 and not cancelled.is_set():
+                data = gf.read(min(size, _CHUNK_SIZE))
+                if not data:
+                    break
+                size -= len(data)
+                _put(chunks, data, cancelled)
+    except Exception as e:
+        _put(chunks, e, cancelled)
+    else:
+        _put(chunks, None, cancelled)
+
+
+def read_stores(stores, jobs, queue_chunks=8):
+    """Generator giving the contents of a list of (path, size, format)
+    memory images in order, as (index, chunk) pairs. Up to jobs images
+    are decompressed ahead, in parallel, each buffering at most
+    queue_chunks chunks."""
+    cancelled = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    queues = []
+    for path, size, image_format in stores:
+        chunks = queue.Queue(maxsize=queue_chunks)
+        pool.submit(_read_store, path, size, image_format, chunks, cancelled)
+        queues.append(chunks)
+
+    try:
+        for i, chunks in enumerate(queues):
+            while True:
+                data = chunks.get()
+                if data is None:
+                    break
+                if isinstance(data, Exception):
+                    raise data
+                yield i, data
+    finally:
+        cancelled.set()
+        pool.shutdown()
+
+
+def memory_image(cpt_dir, config):
+    """Find the memory image of a checkpoint and its format"""
+    path = os.path.join(cpt_dir, "system.physmem.store0.pmem")
+    image_format = "gzip"
+    store = "system.physmem.store0"
+    if config.has_section(store):
+        if config.has_option(store, "page_index"):
+            sys.exit(
+                f"{cpt_dir}: the memory image is in a page store, restore "
+                "it with cpt_page_store.py materialize first"
+            )
+        if config.has_option(store, "filename"):
+            path = os.path.join(cpt_dir, config.get(store, "filename"))
+        image_format = config.get(store, "format", fallback="gzip")
+    if image_format not in ("gzip", "raw"):
+        sys.exit(f"{cpt_dir}: unknown memory image format '{image_format}'")
+    return path, image_format
+
+
+def aggregate(
+    output_dir, cpts, no_compress, memory_size, jobs=None, compress_level=6
+):
     merged_config = None
     page_ptr = 0
 
-    output_path = output_dir
-    if not os.path.isdir(output_path):
-        os.system("mkdir -p " + output_path)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
 
-    agg_mem_file = open(output_path + "/system.physmem.store0.pmem", "wb+")
-    agg_config_file = open(output_path + "/m5.cpt", "wb+")
+    output_path = output_dir
+    os.makedirs(output_path, exist_ok=True)
 
-    if not no_compress:
-        merged_mem = gzip.GzipFile(fileobj=agg_mem_file, mode="wb")
+    agg_config_file = open(output_path + "/m5.cpt", "w")
 
     max_curtick = 0
     num_digits = len(str(len(cpts) - 1))
 
+    # Memory images to merge, as (path, bytes to take, format)
+    stores = []
+
     for i, arg in enumerate(cpts):
         print(arg)
         merged_config = myCP()
         config = myCP()
-        config.readfp(open(cpts[i] + "/m5.cpt"))
+        with open(cpts[i] + "/m5.cpt") as f:
+            config.read_file(f)
 
         for sec in config.sections():
             if re.compile("cpu").search(sec):
@@ -73,13 +251,15 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
                 for item in items:
                     if item[0] == "paddr":
                         merged_config.set(
-                            newsec, item[0], int(item[1]) + (page_ptr << 12)
+                            newsec,
+                            item[0],
+                            str(int(item[1]) + (page_ptr << 12)),
                         )
                         continue
                     merged_config.set(newsec, item[0], item[1])
 
                 if re.compile("workload.FdMap256$").search(sec):
-                    merged_config.set(newsec, "M5_pid", i)
+                    merged_config.set(newsec, "M5_pid", str(i))
 
             elif sec == "system":
                 pass
@@ -100,35 +280,45 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
         pages = int(config.get("system", "pagePtr"))
         page_ptr = page_ptr + pages
         print("pages to be read: ", pages)
+        path, image_format = memory_image(cpts[i], config)
+        stores.append((path, pages * _PAGE_SIZE, image_format))
 
-        f = open(cpts[i] + "/system.physmem.store0.pmem", "rb")
-        gf = gzip.GzipFile(fileobj=f, mode="rb")
+    # Stream the memory images into the merged one, decompressing the
+    #   inputs and compressing the output in parallel
+    agg_mem_file = open(output_path + "/system.physmem.store0.pmem", "wb+")
+    if not no_compress:
+        merged_mem = ParallelGzipWriter(agg_mem_file, jobs, compress_level)
+    else:
+        merged_mem = SparseWriter(agg_mem_file)
 
-        x = 0
-        while x < pages:
-            bytesRead = gf.read(1 << 12)
-            if not no_compress:
-                merged_mem.write(bytesRead)
-            else:
-                agg_mem_file.write(bytesRead)
-            x += 1
+    copied = [0] * len(stores)
+    for i, data in read_stores(stores, jobs):
+        merged_mem.write(data)
+        copied[i] += len(data)
 
-        gf.close()
-        f.close()
+    for (path, size, image_format), done in zip(stores, copied):
+        if done != size:
+            print(
+                "WARNING: only read",
+                done,
+                "of",
+                size,
+                "bytes of memory from",
+                path,
+            )
 
     merged_config.add_section("system")
-    merged_config.set("system", "pagePtr", page_ptr)
-    merged_config.set("system", "nextPID", len(cpts))
-
-    file_size = page_ptr * 4 * 1024
-    dummy_data = "".zfill(4096)
-    while file_size < memory_size:
-        if not no_compress:
-            merged_mem.write(dummy_data)
-        else:
-            agg_mem_file.write(dummy_data)
-        file_size += 4 * 1024
-        page_ptr += 1
+    merged_config.set("system", "pagePtr", str(page_ptr))
+    merged_config.set("system", "nextPID", str(len(cpts)))
+
+    file_size = page_ptr * _PAGE_SIZE
+    if memory_size is not None and file_size < memory_size:
+        pad_pages = -(-(memory_size - file_size) // _PAGE_SIZE)
+        merged_mem.write_zeros(pad_pages * _PAGE_SIZE)
+        page_ptr += pad_pages
+
+    merged_mem.close()
+    agg_mem_file.close()
 
     print("WARNING: ")
     print(
@@ -136,19 +326,19 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
     )
     print(page_ptr, "x 4K of memory")
     merged_config.set(
-        "system.physmem.store0", "range_size", page_ptr * 4 * 1024
+        "system.physmem.store0", "range_size", str(page_ptr * _PAGE_SIZE)
     )
+    # The merged image is always gzipped (or plain, which reads the same)
+    merged_config.set(
+        "system.physmem.store0", "filename", "system.physmem.store0.pmem"
+    )
+    merged_config.set("system.physmem.store0", "format", "gzip")
 
     merged_config.add_section("Globals")
-    merged_config.set("Globals", "curTick", max_curtick)
+    merged_config.set("Globals", "curTick", str(max_curtick))
 
     merged_config.write(agg_config_file)
-
-    if not no_compress:
-        merged_mem.close()
-        agg_mem_file.close()
-    else:
-        agg_mem_file.close()
+    agg_config_file.close()
 
 
 if __name__ == "__main__":
@@ -164,6 +354,22 @@ if __name__ == "__main__":
     parser.add_argument("-c", "--no-compress", action="store_true")
     parser.add_argument("--cpts", nargs="+")
     parser.add_argument("--memory-size", action="store", type=int)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        type=int,
+        default=None,
+        help="Number of threads used to decompress the input memory "
+        "images and to compress the output (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--compress-level",
+        action="store",
+        type=int,
+        default=6,
+        help="gzip compression level of the output memory image",
+    )
 
     # Assume x86 ISA.  Any other ISAs would need extra stuff in this script
     # to appropriately parse their page tables and understand page sizes.
@@ -180,4 +386,6 @@ if __name__ == "__main__":
         options.cpts,
         options.no_compress,
         options.memory_size,
+        options.jobs,
+        options.compress_level,
     )
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# This script moves the physical memory images of checkpoints into a
+# shared, content-addressed page store. Each image is split into
+# fixed-size pages, every unique page is stored once, compressed, and
+# the checkpoint keeps a small index of its pages instead of the image.
+# Checkpoints of the same workload, e.g. SimPoint or LoopPoint
+# checkpoints, share most of their pages and take a fraction of the
+# space. Both gzipped and raw (format=raw) images can be moved to the
+# store, and are restored in their original format.
+#
+# gem5 restores such checkpoints directly from the page store. The
+# "materialize" command turns them back into self-contained checkpoints,
+# e.g. to move them somewhere else.
+#
+# Layout of the page store directory:
+#   pack%06d   Concatenated zlib-compressed pages
+#   digests    Records of <digest, pack, length, offset> for every page
+#   lock       Serialises the processes adding to the store
+#
+# Layout of a page index, <image>.pages next to m5.cpt, little endian:
+#   "gem5pidx", u32 version, u32 page size, u64 number of pages
+#   per page: u32 pack, u32 length, u64 offset (length 0: a zero page)
+
+import argparse
+import fcntl
+import gzip
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+INDEX_MAGIC = b"gem5pidx"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<8sIIQ")
+INDEX_ENTRY = struct.Struct("<IIQ")
+DIGEST_RECORD = struct.Struct("<16sIIQ")
+
+DEFAULT_PAGE_SIZE = 1 << 12
+# Start a new pack once the current one is this big
+PACK_SIZE = 1 << 30
+# Number of pages read from a memory image in one go
+BATCH_PAGES = 256
+
+
+class PageStore:
+    """A directory of unique, compressed pages addressed by a digest of
+    their contents"""
+
+    def __init__(self, path, level=6):
+        self.path = path
+        self.level = level
+        os.makedirs(path, exist_ok=True)
+
+        # Only one process adds to a store at a time
+        self.lock = open(os.path.join(path, "lock"), "w")
+        fcntl.flock(self.lock, fcntl.LOCK_EX)
+
+        self.pages = {}
+        digests_path = os.path.join(path, "digests")
+        if os.path.exists(digests_path):
+            with open(digests_path, "rb") as f:
+                data = f.read()
+            # Drop a partial record left by an interrupted run
+            data = data[: len(data) - len(data) % DIGEST_RECORD.size]
+            for digest, pack, length, offset in DIGEST_RECORD.iter_unpack(
+                data
+            ):
+                self.pages[digest] = (pack, length, offset)
+        self.digests = open(digests_path, "ab")
+        self.digests.truncate(len(self.pages) * DIGEST_RECORD.size)
+
+        self.pack_id = max((p for p, _, _ in self.pages.values()), default=0)
+        self.pack = open(self.pack_path(self.pack_id), "ab")
+        self.new_pages = 0
+        self.new_bytes = 0
+
+    def pack_path(self, pack_id):
+        return os.path.join(self.path, "pack%06d" % pack_id)
+
+    def add(self, page):
+        """Add a page if it is not in the store yet and return its
+        (pack, length, offset) entry"""
+        digest = hashlib.blake2b(page, digest_size=16).digest()
+        entry = self.pages.get(digest, None)
+        if entry is not None:
+            return entry
+
+        if self.pack.tell() >= PACK_SIZE:
+            self.pack.close()
+            self.pack_id += 1
+            self.pack = open(self.pack_path(self.pack_id), "ab")
+
+        data = zlib.compress(page, self.level)
+        entry = (self.pack_id, len(data), self.pack.tell())
+        self.pack.write(data)
+        self.pages[digest] = entry
+        self.digests.write(DIGEST_RECORD.pack(digest, *entry))
+        self.new_pages += 1
+        self.new_bytes += len(data)
+        return entry
+
+    def flush(self):
+        # Make sure page data is on disk before the records pointing at it
+        self.pack.flush()
+        os.fsync(self.pack.fileno())
+        self.digests.flush()
+
+    def close(self):
+        self.flush()
+        self.pack.close()
+        self.digests.close()
+        self.lock.close()
+
+
+def read_pages(index_path, store_path):
+    """Generator giving the contents of the pages listed in an index"""
+    zero_page = None
+    packs = {}
+    try:
+        with open(index_path, "rb") as f:
+            magic, version, page_size, num_pages = INDEX_HEADER.unpack(
+                f.read(INDEX_HEADER.size)
+            )
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"{index_path} is not a page index")
+            zero_page = bytes(page_size)
+            for _ in range(num_pages):
+                pack, length, offset = INDEX_ENTRY.unpack(
+                    f.read(INDEX_ENTRY.size)
+                )
+                if length == 0:
+                    yield zero_page
+                    continue
+                if pack not in packs:
+                    packs[pack] = open(
+                        os.path.join(store_path, "pack%06d" % pack), "rb"
+                    )
+                packs[pack].seek(offset)
+                yield zlib.decompress(packs[pack].read(length))
+    finally:
+        for pack in packs.values():
+            pack.close()
+
+
+def read_sections(cpt_file):
+    """Return the lines of a checkpoint and a dict of section name to
+    (line number of the header, dict of entries)"""
+    with open(cpt_file) as f:
+        lines = f.readlines()
+    sections = {}
+    entries = None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            entries = {}
+            sections[stripped[1:-1]] = (i, entries)
+        elif entries is not None and "=" in stripped:
+            key, value = stripped.split("=", 1)
+            entries[key.strip()] = value.strip()
+    return lines, sections
+
+
+def memory_stores(cpt_dir, sections):
+    """Find the sections of the physical memory backing stores, and the
+    format of their images"""
+    stores = []
+    for name, (header, entries) in sections.items():
+        if not {"store_id", "range_size", "filename"} <= entries.keys():
+            continue
+        # Images are gzipped unless the store says otherwise
+        image_format = entries.get("format", "gzip")
+        if image_format not in ("gzip", "raw"):
+            sys.exit(
+                f"{cpt_dir}: {name} has a memory image of unknown format "
+                f"'{image_format}'"
+            )
+        stores.append((name, header, entries, image_format))
+    return stores
+
+
+def open_image(path, image_format, mode):
+    """Open a memory image, which is either gzipped or raw"""
+    if image_format == "raw":
+        return open(path, mode)
+    return gzip.open(path, mode)
+
+
+def dedup_checkpoint(cpt_dir, store, page_size, keep):
+    cpt_file = os.path.join(cpt_dir, "m5.cpt")
+    lines, sections = read_sections(cpt_file)
+    store_rel = os.path.relpath(store.path, cpt_dir)
+    zero_page = bytes(page_size)
+
+    added = []
+    removed = []
+    for name, header, entries, image_format in memory_stores(
+        cpt_dir, sections
+    ):
+        if "page_index" in entries:
+            print(f"{cpt_dir}: {name} is already in a page store")
+            continue
+
+        image = os.path.join(cpt_dir, entries["filename"])
+        index_name = entries["filename"] + ".pages"
+        range_size = int(entries["range_size"])
+        num_pages = -(-range_size // page_size)
+
+        index_path = os.path.join(cpt_dir, index_name)
+        with open_image(image, image_format, "rb") as src, open(
+            index_path + ".tmp", "wb"
+        ) as index:
+            index.write(
+                INDEX_HEADER.pack(
+                    INDEX_MAGIC, INDEX_VERSION, page_size, num_pages
+                )
+            )
+            left = num_pages
+            while left > 0:
+                batch = min(left, BATCH_PAGES)
+                data = src.read(batch * page_size)
+                # Pad a short image, and its last page, with zeros
+                data += bytes(batch * page_size - len(data))
+                view = memoryview(data)
+                for offset in range(0, len(data), page_size):
+                    page = view[offset : offset + page_size]
+                    if page == zero_page:
+                        index.write(INDEX_ENTRY.pack(0, 0, 0))
+                    else:
+                        index.write(INDEX_ENTRY.pack(*store.add(page)))
+                left -= batch
+        store.flush()
+        os.replace(index_path + ".tmp", index_path)
+
+        new_lines = [
+            f"page_index={index_name}\n",
+            f"page_store={store_rel}\n",
+        ]
+        added.append((header, new_lines))
+        removed.append(image)
+
+    # Insert the new entries bottom up so the header lines stay valid
+    for header, new_lines in sorted(added, reverse=True):
+        lines[header + 1 : header + 1] = new_lines
+    if added:
+        with open(cpt_file + ".tmp", "w") as f:
+            f.writelines(lines)
+        os.replace(cpt_file + ".tmp", cpt_file)
+
+    if not keep:
+        for image in removed:
+            os.remove(image)
+    return len(added)
+
+
+def materialize_checkpoint(cpt_dir, keep):
+    cpt_file = os.path.join(cpt_dir, "m5.cpt")
+    lines, sections = read_sections(cpt_file)
+
+    drop = set()
+    indices = []
+    for name, header, entries, image_format in memory_stores(
+        cpt_dir, sections
+    ):
+        if "page_index" not in entries:
+            continue
+        index_path = os.path.join(cpt_dir, entries["page_index"])
+        store_path = os.path.join(cpt_dir, entries["page_store"])
+        image = os.path.join(cpt_dir, entries["filename"])
+        range_size = int(entries["range_size"])
+
+        with open_image(image + ".tmp", image_format, "wb") as dst:
+            offset = 0
+            for page in read_pages(index_path, store_path):
+                # The last page is padded with zeros
+                page = page[: min(len(page), range_size - offset)]
+                if image_format == "gzip":
+                    dst.write(page)
+                elif page.count(0) != len(page):
+                    # Raw images leave holes for zero pages
+                    dst.seek(offset)
+                    dst.write(page)
+                offset += len(page)
+            if image_format == "raw":
+                # ... and are padded to whole host pages to be mapped
+                dst.truncate(-(-range_size // mmap.PAGESIZE) * mmap.PAGESIZE)
+        os.replace(image + ".tmp", image)
+        indices.append(index_path)
+
+        # Find the page store entries of the section
+        i = header + 1
+        while i < len(lines) and not lines[i].lstrip().startswith("["):
+            key = lines[i].split("=", 1)[0].strip()
+            if key in ("page_index", "page_store"):
+                drop.add(i)
+            i += 1
+
+    if drop:
+        with open(cpt_file + ".tmp", "w") as f:
+            f.writelines(l for i, l in enumerate(lines) if i not in drop)
+        os.replace(cpt_file + ".tmp", cpt_file)
+
+    if not keep:
+        for index_path in indices:
+            os.remove(index_path)
+    return len(indices)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deduplicate checkpoint memory images into a "
+        "shared page store"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dedup = commands.add_parser(
+        "dedup", help="Move the memory images of checkpoints into a store"
+    )
+    dedup.add_argument("store", help="Page store directory")
+    dedup.add_argument("cpts", nargs="+", help="Checkpoint directories")
+    dedup.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help="Size of the deduplicated pages (default: %(default)s)",
+    )
+    dedup.add_argument(
+        "--level", type=int, default=6, help="zlib compression level"
+    )
+    dedup.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the original memory images",
+    )
+
+    materialize = commands.add_parser(
+        "materialize",
+        help="Restore self-contained memory images from the store",
+    )
+    materialize.add_argument("cpts", nargs="+", help="Checkpoint directories")
+    materialize.add_argument(
+        "--keep", action="store_true", help="Keep the page indices"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "dedup":
+        store = PageStore(args.store, args.level)
+        known = len(store.pages)
+        for cpt_dir in args.cpts:
+            count = dedup_checkpoint(cpt_dir, store, args.page_size, args.keep)
+            print(f"{cpt_dir}: moved {count} memory image(s) to the store")
+        store.close()
+        print(
+            f"Added {store.new_pages} unique pages "
+            f"({store.new_bytes} compressed bytes), "
+            f"{known + store.new_pages} pages in the store"
+        )
+    else:
+        for cpt_dir in args.cpts:
+            count = materialize_checkpoint(cpt_dir, args.keep)
+            print(f"{cpt_dir}: restored {count} memory image(s)")
+
+
+if __name__ == "__main__":
+    main()
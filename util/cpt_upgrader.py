@@ -75,6 +75,7 @@ import os
 import os.path as osp
 import sys
 import types
+from concurrent.futures import ProcessPoolExecutor
 
 verbose_print = False
 
@@ -192,7 +193,34 @@ class Upgrader:
                     sys.exit(1)
 
 
+def pending_updates(tags):
+    """Return the tags of the migrations to apply to a checkpoint with
+    the given version tags"""
+    return (Upgrader.tag_set - tags) | (Upgrader.untag_set & tags)
+
+
+def scan_tags(path):
+    """Find the version tags of a checkpoint by scanning it for them
+    rather than parsing the whole file. Return None if the checkpoint
+    has no version tags, e.g. because it has a legacy version number"""
+    section = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("[") and line.endswith("]"):
+                section = line[1:-1]
+            elif section in ("Globals", "root.globals", "root"):
+                key, sep, value = line.partition("=")
+                key = key.strip()
+                if section == "root" and key == "cpt_ver":
+                    return None
+                elif sep and key == "version_tags":
+                    return set(value.split())
+    return None
+
+
 def process_file(path, **kwargs):
+    """Upgrade a checkpoint file. Return True if it had to be changed"""
     if not osp.isfile(path):
         import errno
 
@@ -200,11 +228,6 @@ def process_file(path, **kwargs):
 
     verboseprint(f"Processing file {path}....")
 
-    if kwargs.get("backup", True):
-        import shutil
-
-        shutil.copyfile(path, path + ".bak")
-
     cpt = configparser.ConfigParser()
 
     # gem5 is case sensitive with paramaters
@@ -254,7 +277,7 @@ def process_file(path, **kwargs):
 
     # Apply migrations for tags not in checkpoint and tags present for which
     # downgraders are present, respecting dependences
-    to_apply = (Upgrader.tag_set - tags) | (Upgrader.untag_set & tags)
+    to_apply = pending_updates(tags)
     while to_apply:
         ready = {t for t in to_apply if Upgrader.get(t).ready(tags)}
         if not ready:
@@ -270,13 +293,71 @@ def process_file(path, **kwargs):
 
     if not change:
         verboseprint("...nothing to do")
-        return
+        return False
 
     cpt.set("root.globals", "version_tags", " ".join(tags))
 
+    # Only back up checkpoints that are actually modified
+    if kwargs.get("backup", True):
+        import shutil
+
+        shutil.copyfile(path, path + ".bak")
+
     # Write the old data back
     verboseprint("...completed")
-    cpt.write(open(path, "w"))
+    with open(path, "w") as cpt_file:
+        cpt.write(cpt_file)
+    return True
+
+
+def _init_batch_worker(verbose):
+    global verbose_print
+    verbose_print = verbose
+    # Load the upgraders once per worker, unless they were inherited
+    #   from the parent process
+    if not Upgrader.by_tag:
+        Upgrader.load_all()
+
+
+def _batch_process(path, kwargs):
+    """Upgrade a checkpoint in a batch worker, returning its status
+    rather than exiting on errors"""
+    try:
+        tags = scan_tags(path)
+        if tags is not None and not pending_updates(tags):
+            return path, "current"
+        if process_file(path, **kwargs):
+            return path, "upgraded"
+        return path, "current"
+    except SystemExit:
+        return path, "failed"
+    except Exception as e:
+        print(f"error: {path}: {e}")
+        return path, "failed"
+
+
+def process_batch(paths, jobs=None, **kwargs):
+    """Upgrade many checkpoint files on a pool of processes. Checkpoints
+    which are already up to date are found by a quick scan of their
+    version tags and left untouched. Return a dict of status to the
+    number of checkpoints with that status"""
+    counts = {"current": 0, "upgraded": 0, "failed": 0}
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_batch_worker,
+        initargs=(verbose_print,),
+    ) as pool:
+        for path, status in pool.map(
+            _batch_process,
+            paths,
+            [kwargs] * len(paths),
+            chunksize=max(1, min(64, len(paths) // (4 * (jobs or 8)))),
+        ):
+            verboseprint(f"{path}: {status}")
+            if status == "failed":
+                print(f"failed to upgrade {path}")
+            counts[status] += 1
+    return counts
 
 
 if __name__ == "__main__":
@@ -285,7 +366,9 @@ if __name__ == "__main__":
         ArgumentParser,
     )
 
-    parser = ArgumentParser(usage="%(prog)s [args] <filename or directory>")
+    parser = ArgumentParser(
+        usage="%(prog)s [args] <filename or directory> [...]"
+    )
     parser.add_argument(
         "-r",
         "--recurse",
@@ -307,13 +390,22 @@ if __name__ == "__main__":
         action="store_true",
         help="Print out debugging information as",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        type=int,
+        default=None,
+        help="Upgrade many checkpoints in parallel on this many processes "
+        "(default: number of CPUs when given several checkpoints)",
+    )
     parser.add_argument(
         "--get-cc-file",
         action="store_true",
         # used during build; generate src/sim/tags.cc and exit
         help=SUPPRESS,
     )
-    parser.add_argument("checkpoint", nargs="?")
+    parser.add_argument("checkpoint", nargs="*")
 
     args = parser.parse_args()
     verbose_print = args.verbose
@@ -341,28 +433,43 @@ if __name__ == "__main__":
             "directory of checkpoints to recursively update"
         )
 
-    # Deal with shell variables and ~
-    path = osp.expandvars(osp.expanduser(args.checkpoint))
-
-    # Process a single file if we have it
-    if osp.isfile(path):
-        process_file(path, **vars(args))
-    # Process an entire directory
-    elif osp.isdir(path):
-        cpt_file = osp.join(path, "m5.cpt")
-        if args.recurse:
-            # Visit very file and see if it matches
-            for root, dirs, files in os.walk(path):
-                for name in files:
-                    if name == "m5.cpt":
-                        process_file(osp.join(root, name), **vars(args))
-                for dir in dirs:
-                    pass
-        # Maybe someone passed a cpt.XXXXXXX directory and not m5.cpt
-        elif osp.isfile(cpt_file):
-            process_file(cpt_file, **vars(args))
-        else:
-            print(f"Error: checkpoint file not found in {path} ")
-            print("and recurse not specified")
-            sys.exit(1)
+    kwargs = vars(args)
+    jobs = kwargs.pop("jobs")
+
+    # Find the checkpoint files to process
+    cpt_files = []
+    for checkpoint in args.checkpoint:
+        # Deal with shell variables and ~
+        path = osp.expandvars(osp.expanduser(checkpoint))
+
+        # Process a single file if we have it
+        if osp.isfile(path):
+            cpt_files.append(path)
+        # Process an entire directory
+        elif osp.isdir(path):
+            cpt_file = osp.join(path, "m5.cpt")
+            if args.recurse:
+                # Visit very file and see if it matches
+                for root, dirs, files in os.walk(path):
+                    for name in files:
+                        if name == "m5.cpt":
+                            cpt_files.append(osp.join(root, name))
+            # Maybe someone passed a cpt.XXXXXXX directory and not m5.cpt
+            elif osp.isfile(cpt_file):
+                cpt_files.append(cpt_file)
+            else:
+                print(f"Error: checkpoint file not found in {path} ")
+                print("and recurse not specified")
+                sys.exit(1)
+
+    if len(cpt_files) > 1 or jobs is not None:
+        counts = process_batch(cpt_files, jobs, **kwargs)
+        print(
+            "{upgraded} checkpoint(s) upgraded, {current} already current, "
+            "{failed} failed".format(**counts)
+        )
+        sys.exit(1 if counts["failed"] else 0)
+
+    for cpt_file in cpt_files:
+        process_file(cpt_file, **kwargs)
     sys.exit(0)
@@ -85,8 +85,26 @@
 # 7,35666,1,COMP,3000::,4
 # 8,35670,1,STORE,1748748,4,74,0:,6,3:,7
 # 9,35670,1,COMP,500::,7
+#
+# For large traces, the ASCII output can be left out and the records
+# filtered by sequence number, estimated tick or type instead. In the
+# same pass, the script can write a summary of the selected records
+# (--stats) and re-encode them as a trace of their own (--subtrace),
+# e.g. to replay a region of interest with the TraceCPU. The summary
+# holds the instruction mix, histograms of the dependency distances,
+# and an estimate of the critical path length.
+#
+# Elastic traces carry no absolute time. The tick of a record is
+# estimated as the time it completes when every record executes as
+# soon as its dependencies have completed, taking its comp_delay (plus
+# --mem-latency for loads and stores). The critical path length is the
+# difference between the latest completion and the earliest start of
+# the selected records.
 
-import sys
+import argparse
+import collections
+import gzip
+import json
 
 import protolib
 
@@ -116,20 +134,196 @@ except:
         exit(-1)
 
 
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: ", sys.argv[0], " <protobuf input> <ASCII output>")
-        exit(-1)
+class TraceStats:
+    """
+    Statistics of the records of a trace, gathered in a single pass
+    with memory bounded by the dependency window.
+    """
 
-    # Open the file on read mode
-    proto_in = protolib.openFileRd(sys.argv[1])
+    def __init__(self, enumNames, dep_window, mem_latency):
+        self.enumNames = enumNames
+        self.dep_window = dep_window
+        self.mem_latency = mem_latency
+
+        # Estimated completion tick of the recent records, and whether
+        # they were selected
+        self.finish = {}
+        self.selected = set()
+        self.recent = collections.deque()
+
+        self.num_records = 0
+        self.mix = collections.Counter()
+        self.weighted_mix = collections.Counter()
+        self.rob_dep_dist = collections.Counter()
+        self.reg_dep_dist = collections.Counter()
+        self.missing_deps = 0
+        self.first_start = None
+        self.last_finish = 0
+
+    def timing(self, packet):
+        """
+        Estimate when a record starts and completes, and remember the
+        latter for the records depending on it.
+        """
+        start = 0
+        finish = self.finish
+        for dep in packet.rob_dep:
+            start = max(start, finish.get(dep, 0))
+        for dep in packet.reg_dep:
+            start = max(start, finish.get(dep, 0))
+        end = start + packet.comp_delay
+        if packet.type != inst_dep_record_pb2.InstDepRecord.COMP:
+            end += self.mem_latency
+
+        finish[packet.seq_num] = end
+        self.recent.append(packet.seq_num)
+        if len(self.recent) > self.dep_window:
+            old = self.recent.popleft()
+            del finish[old]
+            self.selected.discard(old)
+        return start, end
+
+    def add(self, packet, start, end):
+        """Account for a selected record."""
+        self.num_records += 1
+        self.selected.add(packet.seq_num)
+        name = self.enumNames.get(packet.type, str(packet.type))
+        self.mix[name] += 1
+        weight = packet.weight if packet.HasField("weight") else 1
+        self.weighted_mix[name] += weight
+
+        for dep in packet.rob_dep:
+            self.rob_dep_dist[packet.seq_num - dep] += 1
+            if dep not in self.finish:
+                self.missing_deps += 1
+        for dep in packet.reg_dep:
+            self.reg_dep_dist[packet.seq_num - dep] += 1
+            if dep not in self.finish:
+                self.missing_deps += 1
+
+        if self.first_start is None:
+            self.first_start = start
+        self.first_start = min(self.first_start, start)
+        self.last_finish = max(self.last_finish, end)
 
+    def summary(self):
+        def hist(counter):
+            return {str(d): n for d, n in sorted(counter.items())}
+
+        critical_path = 0
+        if self.first_start is not None:
+            critical_path = self.last_finish - self.first_start
+        return {
+            "records": self.num_records,
+            "mix": dict(self.mix),
+            "weighted_mix": dict(self.weighted_mix),
+            "rob_dep_distance": hist(self.rob_dep_dist),
+            "reg_dep_distance": hist(self.reg_dep_dist),
+            "deps_outside_window": self.missing_deps,
+            "critical_path_ticks": critical_path,
+        }
+
+
+def write_ascii(ascii_out, packet, enumNames):
+    # Write to file the seq num
+    ascii_out.write(f"{packet.seq_num}")
+    # Write to file the pc of the instruction, default is 0
+    if packet.HasField("pc"):
+        ascii_out.write(f",{packet.pc}")
+    else:
+        ascii_out.write(",0")
+    # Write to file the weight, default is 1
+    if packet.HasField("weight"):
+        ascii_out.write(f",{packet.weight}")
+    else:
+        ascii_out.write(",1")
+    # Write to file the type of the record
     try:
-        ascii_out = open(sys.argv[2], "w")
-    except OSError:
-        print("Failed to open ", sys.argv[2], " for writing")
+        ascii_out.write(f",{enumNames[packet.type]}")
+    except KeyError:
+        print("Seq. num", packet.seq_num, "has unsupported type", packet.type)
         exit(-1)
 
+    # Write to file if it has the optional fields physical addr, size,
+    # flags
+    if packet.HasField("p_addr"):
+        ascii_out.write(f",{packet.p_addr}")
+    if packet.HasField("size"):
+        ascii_out.write(f",{packet.size}")
+    if packet.HasField("flags"):
+        ascii_out.write(f",{packet.flags}")
+
+    # Write to file the comp delay
+    ascii_out.write(f",{packet.comp_delay}")
+
+    # Write to file the repeated field order dependency
+    ascii_out.write(":")
+    for dep in packet.rob_dep:
+        ascii_out.write(f",{dep}")
+    # Write to file the repeated field register dependency
+    ascii_out.write(":")
+    for dep in packet.reg_dep:
+        ascii_out.write(f",{dep}")
+    # New line
+    ascii_out.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Dump, filter and summarise instruction dependency "
+        "traces."
+    )
+    parser.add_argument("trace", help="protobuf input")
+    parser.add_argument("ascii", nargs="?", help="ASCII output")
+    parser.add_argument(
+        "--seq-range",
+        nargs=2,
+        type=int,
+        metavar=("FIRST", "END"),
+        help="only select records with a seq num in [FIRST, END)",
+    )
+    parser.add_argument(
+        "--tick-range",
+        nargs=2,
+        type=int,
+        metavar=("FIRST", "END"),
+        help="only select records estimated to complete in [FIRST, END)",
+    )
+    parser.add_argument(
+        "--type",
+        action="append",
+        choices=["LOAD", "STORE", "COMP"],
+        help="only select records of this type (can be repeated)",
+    )
+    parser.add_argument("--stats", help="write a JSON summary to this file")
+    parser.add_argument(
+        "--subtrace", help="re-encode the selected records to this file"
+    )
+    parser.add_argument(
+        "--mem-latency",
+        type=int,
+        default=0,
+        help="ticks added to loads and stores when estimating timing",
+    )
+    parser.add_argument(
+        "--dep-window",
+        type=int,
+        default=1 << 16,
+        help="number of records kept to resolve dependencies",
+    )
+    args = parser.parse_args()
+
+    # Open the file on read mode
+    proto_in = protolib.openMessageReader(args.trace)
+
+    ascii_out = None
+    if args.ascii:
+        try:
+            ascii_out = open(args.ascii, "w")
+        except OSError:
+            print("Failed to open ", args.ascii, " for writing")
+            exit(-1)
+
     # Read the magic number in 4-byte Little Endian
     magic_number = proto_in.read(4).decode()
 
@@ -146,6 +340,19 @@ def main():
     print("Object id:", header.obj_id)
     print("Tick frequency:", header.tick_freq)
 
+    proto_out = None
+    if args.subtrace:
+        try:
+            if args.subtrace.endswith(".gz"):
+                proto_out = gzip.open(args.subtrace, "wb")
+            else:
+                proto_out = open(args.subtrace, "wb")
+        except OSError:
+            print("Failed to open ", args.subtrace, " for writing")
+            exit(-1)
+        proto_out.write(b"gem5")
+        protolib.encodeMessage(proto_out, header)
+
     print("Parsing packets")
 
     print("Creating enum value,name lookup from proto")
@@ -155,71 +362,73 @@ def main():
         print("\t", valdesc.number, namestr)
         enumNames[valdesc.number] = namestr
 
+    types = None
+    if args.type:
+        types = {desc.enum_values_by_name[name].number for name in args.type}
+    stats = TraceStats(enumNames, args.dep_window, args.mem_latency)
+
     num_packets = 0
+    num_selected = 0
     num_regdeps = 0
     num_robdeps = 0
     packet = inst_dep_record_pb2.InstDepRecord()
 
     # Decode the packet messages until we hit the end of the file
-    while protolib.decodeMessage(proto_in, packet):
+    for packet in proto_in.messages(packet):
         num_packets += 1
+        start, end = stats.timing(packet)
 
-        # Write to file the seq num
-        ascii_out.write(f"{packet.seq_num}")
-        # Write to file the pc of the instruction, default is 0
-        if packet.HasField("pc"):
-            ascii_out.write(f",{packet.pc}")
-        else:
-            ascii_out.write(",0")
-        # Write to file the weight, default is 1
-        if packet.HasField("weight"):
-            ascii_out.write(f",{packet.weight}")
-        else:
-            ascii_out.write(",1")
-        # Write to file the type of the record
-        try:
-            ascii_out.write(f",{enumNames[packet.type]}")
-        except KeyError:
-            print(
-                "Seq. num", packet.seq_num, "has unsupported type", packet.type
-            )
-            exit(-1)
-
-        # Write to file if it has the optional fields physical addr, size,
-        # flags
-        if packet.HasField("p_addr"):
-            ascii_out.write(f",{packet.p_addr}")
-        if packet.HasField("size"):
-            ascii_out.write(f",{packet.size}")
-        if packet.HasField("flags"):
-            ascii_out.write(f",{packet.flags}")
-
-        # Write to file the comp delay
-        ascii_out.write(f",{packet.comp_delay}")
+        if args.seq_range:
+            # Sequence numbers are increasing, stop once past the end
+            if packet.seq_num >= args.seq_range[1]:
+                break
+            if packet.seq_num < args.seq_range[0]:
+                continue
+        if args.tick_range and not (
+            args.tick_range[0] <= end < args.tick_range[1]
+        ):
+            continue
+        if types is not None and packet.type not in types:
+            continue
 
-        # Write to file the repeated field order dependency
-        ascii_out.write(":")
+        num_selected += 1
         if packet.rob_dep:
             num_robdeps += 1
-            for dep in packet.rob_dep:
-                ascii_out.write(f",{dep}")
-        # Write to file the repeated field register dependency
-        ascii_out.write(":")
         if packet.reg_dep:
-            num_regdeps += (
-                1  # No. of packets with atleast 1 register dependency
-            )
-            for dep in packet.reg_dep:
-                ascii_out.write(f",{dep}")
-        # New line
-        ascii_out.write("\n")
+            # No. of packets with atleast 1 register dependency
+            num_regdeps += 1
+        stats.add(packet, start, end)
+
+        if ascii_out:
+            write_ascii(ascii_out, packet, enumNames)
+        if proto_out:
+            # Drop the dependencies on records that are not part of the
+            # sub-trace, the TraceCPU treats them as completed anyway
+            rob_deps = [d for d in packet.rob_dep if d in stats.selected]
+            reg_deps = [d for d in packet.reg_dep if d in stats.selected]
+            if len(rob_deps) != len(packet.rob_dep):
+                packet.ClearField("rob_dep")
+                packet.rob_dep.extend(rob_deps)
+            if len(reg_deps) != len(packet.reg_dep):
+                packet.ClearField("reg_dep")
+                packet.reg_dep.extend(reg_deps)
+            protolib.encodeMessage(proto_out, packet)
 
     print("Parsed packets:", num_packets)
+    if num_selected != num_packets:
+        print("Selected packets:", num_selected)
     print("Packets with at least 1 reg dep:", num_regdeps)
     print("Packets with at least 1 rob dep:", num_robdeps)
 
+    if args.stats:
+        with open(args.stats, "w") as f:
+            json.dump(stats.summary(), f, indent=2)
+
     # We're done
-    ascii_out.close()
+    if ascii_out:
+        ascii_out.close()
+    if proto_out:
+        proto_out.close()
     proto_in.close()
 
 
@@ -56,7 +56,7 @@ def main():
         exit(-1)
 
     # Open the file in read mode
-    proto_in = protolib.openFileRd(sys.argv[1])
+    proto_in = protolib.openMessageReader(sys.argv[1])
 
     try:
         ascii_out = open(sys.argv[2], "w")
@@ -89,7 +89,7 @@ def main():
     packet = packet_pb2.Packet()
 
     # Decode the packet messages until we hit the end of the file
-    while protolib.decodeMessage(proto_in, packet):
+    for packet in proto_in.messages(packet):
         num_packets += 1
         # ReadReq is 1 and WriteReq is 4 in src/mem/packet.hh Command enum
         cmd = "r" if packet.cmd == 1 else ("w" if packet.cmd == 4 else "u")
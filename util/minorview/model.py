@@ -35,6 +35,9 @@
 
 import os
 import re
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
 from time import time as wall_time
 
 from . import (
@@ -627,8 +630,33 @@ class BlobEvent:
         return sorted(ret)
 
 
+class EventWindow:
+    """Events, instructions and lines parsed from a range of an event
+    file"""
+
+    def __init__(self):
+        # dict of unit name to a list of events, ordered by time
+        self.unitEvents = {}
+        self.insts = {}
+        self.lines = {}
+
+
 class BlobModel:
-    """Model bringing together blob definitions and parsed events"""
+    """Model bringing together blob definitions and parsed events.
+
+    Events are loaded on demand: load_events only scans the event file to
+    find the event times and to split it into windows of roughly
+    windowBytes bytes.  A window is parsed when an event in it is looked
+    for, and the last few parsed windows are kept around"""
+
+    # Approximate size of a window of the event file parsed at once, and
+    #   the number of parsed windows kept
+    windowBytes = 1 << 20
+    windowCacheSize = 4
+
+    match_line_re = re.compile(
+        r"^\s*(\d+):\s*([\w\.]+):\s*(Minor\w+:)?\s*(.*)$"
+    )
 
     def __init__(self, unitNamePrefix=""):
         self.blobs = []
@@ -642,13 +670,19 @@ class BlobModel:
     def clear_events(self):
         """Drop all events and times"""
         self.lastTime = 0
-        self.times = []
+        self.times = array("q")
         self.insts = {}
         self.lines = {}
         self.numEvents = 0
 
-        for unit, events in self.unitEvents.items():
-            self.unitEvents[unit] = []
+        self.eventFile = None
+        # Windows of the event file as tuples of (file offset, time of
+        #   the first event, dict of unit name to the last event before
+        #   the window) along with the start times of the windows
+        self.windows = []
+        self.windowTimes = []
+        self.endOffset = 0
+        self.parsedWindows = OrderedDict()
 
     def add_blob(self, blob):
         """Add a parsed blob to the model"""
@@ -686,27 +720,6 @@ class BlobModel:
         """Add a MinorLine line to the model"""
         self.lines[line.id.lineSeqNum] = line
 
-    def add_unit_event(self, event):
-        """Add a single event to the model.  This must be an event at a
-        time >= the current maximum time"""
-        if event.unit in self.unitEvents:
-            events = self.unitEvents[event.unit]
-            if len(events) > 0 and events[len(events) - 1].time > event.time:
-                print("Bad event ordering")
-            events.append(event)
-        self.numEvents += 1
-        self.lastTime = max(self.lastTime, event.time)
-
-    def extract_times(self):
-        """Extract a list of all the times from the seen events.  Call after
-        reading events to give a safe index list to use for time indices"""
-        times = {}
-        for unitEvents in self.unitEvents.values():
-            for event in unitEvents:
-                times[event.time] = 1
-        self.times = list(times.keys())
-        self.times.sort()
-
     def find_line(self, id):
         """Find a line by id"""
         key = id.lineSeqNum
@@ -717,7 +730,7 @@ class BlobModel:
     ):
         """Find an event by binary search on time indices"""
         while lower_index <= upper_index:
-            pivot = (upper_index + lower_index) / 2
+            pivot = (upper_index + lower_index) // 2
             pivotEvent = events[pivot]
             event_equal = pivotEvent.time == time or (
                 pivotEvent.time < time
@@ -740,10 +753,34 @@ class BlobModel:
                 return None
         return None
 
+    def find_window(self, time):
+        """Find the parsed window holding the events at time, parsing it
+        if necessary.  This also makes the window's instructions and
+        lines the ones found by find_inst and find_line"""
+        if len(self.windows) == 0:
+            return None
+        index = max(bisect_right(self.windowTimes, time) - 1, 0)
+
+        window = self.parsedWindows.get(index, None)
+        if window is None:
+            window = self.parse_window(index)
+            self.parsedWindows[index] = window
+            if len(self.parsedWindows) > self.windowCacheSize:
+                self.parsedWindows.popitem(last=False)
+        else:
+            self.parsedWindows.move_to_end(index)
+
+        self.insts = window.insts
+        self.lines = window.lines
+        return window
+
     def find_unit_event_by_time(self, unit, time):
         """Find the last event for the given unit at time <= time"""
         if unit in self.unitEvents:
-            events = self.unitEvents[unit]
+            window = self.find_window(time)
+            if window is None:
+                return None
+            events = window.unitEvents.get(unit, [])
             ret = self.find_event_bisection(
                 unit, time, events, 0, len(events) - 1
             )
@@ -755,11 +792,7 @@ class BlobModel:
     def find_time_index(self, time):
         """Find a time index close to the given time (where
         times[return] <= time and times[return+1] > time"""
-        ret = 0
-        lastIndex = len(self.times) - 1
-        while ret < lastIndex and self.times[ret + 1] <= time:
-            ret += 1
-        return ret
+        return max(bisect_right(self.times, time) - 1, 0)
 
     def add_minor_inst(self, rest):
         """Parse and add a MinorInst line to the model"""
@@ -810,40 +843,34 @@ class BlobModel:
 
             self.add_line(LineFault(id, pairs["fault"], vaddr, other_pairs))
 
-    def load_events(self, file, startTime=0, endTime=None):
-        """Load an event file and add everything to this model"""
+    def match_line(self, l):
+        """Match an event file line, returning (time, unit, line type,
+        rest of line) or None"""
+        match = self.match_line_re.match(l)
+        if match is None:
+            return None
+        event_time, unit, line_type, rest = match.groups()
+        unit = re.sub("^" + self.unitNamePrefix + r"\.?(.*)$", "\\1", unit)
+        return int(event_time), unit, line_type, rest
 
-        def update_comments(comments, time):
-            # Add a list of comments to an existing event, if there is one at
-            #   the given time, or create a new, correctly-timed, event from
-            #   the last event and attach the comments to that
-            for commentUnit, commentRest in comments:
-                event = self.find_unit_event_by_time(commentUnit, time)
-                # Find an event to which this comment can be attached
-                if event is None:
-                    # No older event, make a new empty one
-                    event = BlobEvent(commentUnit, time, {})
-                    self.add_unit_event(event)
-                elif event.time != time:
-                    # Copy the old event and make a new one with the right
-                    #   time and comment
-                    newEvent = BlobEvent(commentUnit, time, event.pairs)
-                    newEvent.visuals = dict(event.visuals)
-                    event = newEvent
-                    self.add_unit_event(event)
-                event.comments.append(commentRest)
+    def make_event(self, unit, time, rest):
+        """Make an event for a MinorTrace line and decode its colour data"""
+        event = BlobEvent(unit, time, {})
+        pairs = parse.parse_pairs(rest)
+        event.pairs = pairs
 
-        self.clear_events()
+        # Try to decode the colour data for this event
+        blobs = self.unitNameToBlobs.get(unit, [])
+        for blob in blobs:
+            if blob.visualDecoder is not None:
+                event.visuals[blob.picChar] = blob.visualDecoder(pairs)
+        return event
 
-        # A negative time will *always* be different from an event time
-        time = -1
-        time_events = {}
-        last_time_lines = {}
-        minor_trace_line_count = 0
-        comments = []
+    def load_events(self, file, startTime=0, endTime=None):
+        """Scan an event file to find its event times and windows.  The
+        events themselves are parsed on demand"""
 
-        default_colour = [[colours.unknownColour]]
-        next_progress_print_event_count = 1000
+        self.clear_events()
 
         if not os.access(file, os.R_OK):
             print("Can't open file", file)
@@ -851,85 +878,109 @@ class BlobModel:
         else:
             print("Opening file", file)
 
-        f = open(file)
+        self.eventFile = file
 
         start_wall_time = wall_time()
 
-        # Skip leading events
-        still_skipping = True
-        l = f.readline()
-        while l and still_skipping:
-            match = re.match(r"^\s*(\d+):", l)
-            if match is not None:
-                event_time = match.groups()
-                if int(event_time[0]) >= startTime:
-                    still_skipping = False
-                else:
-                    l = f.readline()
-            else:
-                l = f.readline()
+        # A negative time will *always* be different from an event time
+        time = -1
+        # The rest of the last MinorTrace line of each unit, to spot
+        #   repeated lines
+        last_time_lines = {}
+        # The last event of each unit, as the offset of the MinorTrace line
+        #   it was made from, its time and the offsets of the comments
+        #   attached to it
+        last_events = {}
+        minor_trace_line_count = 0
+        comments = []
+        window_start = None
 
-        match_line_re = re.compile(
-            r"^\s*(\d+):\s*([\w\.]+):\s*(Minor\w+:)?\s*(.*)$"
-        )
+        next_progress_print_event_count = 1000
 
-        # Parse each line of the events file, accumulating comments to be
-        #   attached to MinorTrace events when the time changes
-        reached_end_time = False
-        while not reached_end_time and l:
-            match = match_line_re.match(l)
-            if match is not None:
-                event_time, unit, line_type, rest = match.groups()
-                event_time = int(event_time)
+        def add_event_time(unit, event_time):
+            self.numEvents += 1
+            if unit in self.unitEvents:
+                if len(self.times) == 0 or self.times[-1] != event_time:
+                    self.times.append(event_time)
+                self.lastTime = max(self.lastTime, event_time)
 
-                unit = re.sub(
-                    "^" + self.unitNamePrefix + r"\.?(.*)$", "\\1", unit
+        def update_comments(comments, time):
+            # Attach comments to the unit's event at the given time, making
+            #   one from the last event if there is none at that time
+            for commentUnit, commentOffset in comments:
+                trace_offset, event_time, event_comments = last_events.get(
+                    commentUnit, (None, None, [])
                 )
+                if event_time != time:
+                    event_comments = []
+                    last_events[commentUnit] = (
+                        trace_offset,
+                        time,
+                        event_comments,
+                    )
+                    add_event_time(commentUnit, time)
+                event_comments.append(commentOffset)
+
+        f = open(file, "rb")
+
+        # Skip leading events
+        offset = 0
+        for raw_line in f:
+            match = re.match(r"^\s*(\d+):", raw_line.decode(errors="replace"))
+            if match is not None and int(match.group(1)) >= startTime:
+                break
+            offset += len(raw_line)
+        f.seek(offset)
+
+        # Scan each line of the events file, accumulating comments to be
+        #   attached to MinorTrace events when the time changes
+        for raw_line in f:
+            line_offset = offset
+            offset += len(raw_line)
+            match = self.match_line(raw_line.decode(errors="replace"))
+            if match is not None:
+                event_time, unit, line_type, rest = match
 
                 # When the time changes, resolve comments
                 if event_time != time:
                     if self.numEvents > next_progress_print_event_count:
-                        print("Parsed to time: %d" % event_time)
+                        print("Scanned to time: %d" % event_time)
                         next_progress_print_event_count = self.numEvents + 1000
                     update_comments(comments, time)
                     comments = []
                     time = event_time
 
+                    # Start a new window once the current one is big enough
+                    if (
+                        window_start is None
+                        or line_offset - window_start >= self.windowBytes
+                    ):
+                        window_start = line_offset
+                        seeds = {
+                            unit: (event[0], event[1], list(event[2]))
+                            for unit, event in last_events.items()
+                        }
+                        self.windows.append((line_offset, time, seeds))
+                        self.windowTimes.append(time)
+
                 if line_type is None:
                     # Treat this line as just a 'comment'
-                    comments.append((unit, rest))
+                    comments.append((unit, line_offset))
                 elif line_type == "MinorTrace:":
                     minor_trace_line_count += 1
 
-                    # Only insert this event if it's not the same as
+                    # Only count this event if it's not the same as
                     #   the last event we saw for this unit
                     if last_time_lines.get(unit, None) != rest:
-                        event = BlobEvent(unit, event_time, {})
-                        pairs = parse.parse_pairs(rest)
-                        event.pairs = pairs
-
-                        # Try to decode the colour data for this event
-                        blobs = self.unitNameToBlobs.get(unit, [])
-                        for blob in blobs:
-                            if blob.visualDecoder is not None:
-                                event.visuals[
-                                    blob.picChar
-                                ] = blob.visualDecoder(pairs)
-
-                        self.add_unit_event(event)
+                        last_events[unit] = (line_offset, event_time, [])
+                        add_event_time(unit, event_time)
                         last_time_lines[unit] = rest
-                elif line_type == "MinorInst:":
-                    self.add_minor_inst(rest)
-                elif line_type == "MinorLine:":
-                    self.add_minor_line(rest)
 
             if endTime is not None and time > endTime:
-                reached_end_time = True
-
-            l = f.readline()
+                break
 
         update_comments(comments, time)
-        self.extract_times()
+        self.endOffset = offset
         f.close()
 
         end_wall_time = wall_time()
@@ -940,7 +991,123 @@ class BlobModel:
             "unique events:",
             self.numEvents,
         )
-        print("Time to parse:", end_wall_time - start_wall_time)
+        print("Time to scan:", end_wall_time - start_wall_time)
+
+    def parse_window(self, index):
+        """Parse the events, instructions and lines of a window"""
+        window = EventWindow()
+        start_offset, start_time, seeds = self.windows[index]
+        if index + 1 < len(self.windows):
+            end_offset = self.windows[index + 1][0]
+        else:
+            end_offset = self.endOffset
+
+        # Parse instructions and lines into the window
+        self.insts = window.insts
+        self.lines = window.lines
+
+        f = open(self.eventFile, "rb")
+
+        def read_rest(offset):
+            f.seek(offset)
+            return self.match_line(f.readline().decode(errors="replace"))[3]
+
+        def read_lines(start, end):
+            f.seek(start)
+            offset = start
+            while offset < end:
+                raw_line = f.readline()
+                if not raw_line:
+                    break
+                line_offset = offset
+                offset += len(raw_line)
+                match = self.match_line(raw_line.decode(errors="replace"))
+                if match is not None:
+                    yield line_offset, match
+
+        # Instructions and lines are defined before they flow down the
+        #   pipeline, so also pick up those of the previous window
+        if index > 0:
+            prev_offset = self.windows[index - 1][0]
+            for _, (_, _, line_type, rest) in read_lines(
+                prev_offset, start_offset
+            ):
+                if line_type == "MinorInst:":
+                    self.add_minor_inst(rest)
+                elif line_type == "MinorLine:":
+                    self.add_minor_line(rest)
+
+        # Start off each unit with its last event before the window
+        last_time_lines = {}
+        for unit, (trace_offset, event_time, comments) in seeds.items():
+            if trace_offset is None:
+                event = BlobEvent(unit, event_time, {})
+            else:
+                rest = read_rest(trace_offset)
+                event = self.make_event(unit, event_time, rest)
+                last_time_lines[unit] = rest
+            event.comments = [read_rest(offset) for offset in comments]
+            window.unitEvents[unit] = [event]
+
+        def add_unit_event(event):
+            if event.unit in self.unitEvents:
+                window.unitEvents.setdefault(event.unit, []).append(event)
+
+        def update_comments(comments, time):
+            # Add a list of comments to an existing event, if there is one at
+            #   the given time, or create a new, correctly-timed, event from
+            #   the last event and attach the comments to that
+            for commentUnit, commentRest in comments:
+                events = window.unitEvents.get(commentUnit, [])
+                event = self.find_event_bisection(
+                    commentUnit, time, events, 0, len(events) - 1
+                )
+                # Find an event to which this comment can be attached
+                if event is None:
+                    # No older event, make a new empty one
+                    event = BlobEvent(commentUnit, time, {})
+                    add_unit_event(event)
+                elif event.time != time:
+                    # Copy the old event and make a new one with the right
+                    #   time and comment
+                    newEvent = BlobEvent(commentUnit, time, event.pairs)
+                    newEvent.visuals = dict(event.visuals)
+                    event = newEvent
+                    add_unit_event(event)
+                event.comments.append(commentRest)
+
+        time = start_time
+        comments = []
+
+        # Parse each line of the window, accumulating comments to be
+        #   attached to MinorTrace events when the time changes
+        for _, (event_time, unit, line_type, rest) in read_lines(
+            start_offset, end_offset
+        ):
+            # When the time changes, resolve comments
+            if event_time != time:
+                update_comments(comments, time)
+                comments = []
+                time = event_time
+
+            if line_type is None:
+                # Treat this line as just a 'comment'
+                comments.append((unit, rest))
+            elif line_type == "MinorTrace:":
+                # Only insert this event if it's not the same as
+                #   the last event we saw for this unit
+                if last_time_lines.get(unit, None) != rest:
+                    add_unit_event(self.make_event(unit, event_time, rest))
+                    last_time_lines[unit] = rest
+            elif line_type == "MinorInst:":
+                self.add_minor_inst(rest)
+            elif line_type == "MinorLine:":
+                self.add_minor_line(rest)
+
+        update_comments(comments, time)
+        f.close()
+
+        return window
 
     def add_blob_picture(self, offset, pic, nameDict):
         """Add a parsed ASCII-art pipeline markup to the model"""
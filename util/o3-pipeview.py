@@ -39,7 +39,10 @@
 
 import argparse
 import copy
+import io
+import json
 import os
+import re
 import sys
 
 # Temporary storage for instructions. The queue is filled in out-of-order
@@ -66,6 +69,105 @@ insts = {
 }
 
 
+# The index of a trace holds checkpoints, the offsets of some of the
+# fetch lines, along with the maximum tick and fetch sequence number of
+# all the lines before them. This allows seeking right to where the
+# search for the starting tick or sequence number would end up when
+# reading the trace from its beginning.
+index_version = 1
+index_interval = 1 << 22  # Approximate number of bytes between checkpoints
+
+tick_re = re.compile(rb"^O3PipeView:\w+:(\d+)", re.M)
+sn_re = re.compile(rb"^O3PipeView:fetch:\d+:[^:\n]*:[^:\n]*:(\d+)", re.M)
+
+
+def index_path(tracefile):
+    return tracefile + ".idx"
+
+
+# Scans the whole trace once and writes its index
+def build_index(tracefile):
+    checkpoints = [[0, -1, -1]]
+    max_tick = -1
+    max_sn = -1
+    offset = 0
+    carry = b""
+    with open(tracefile, "rb") as trace:
+        while True:
+            data = trace.read(index_interval)
+            buf = carry + data
+            if data:
+                # Cut at the start of the last fetch line, which becomes
+                # the next checkpoint
+                cut = buf.rfind(b"\nO3PipeView:fetch:") + 1
+                if cut <= 0:
+                    carry = buf
+                    continue
+            else:
+                cut = len(buf)
+
+            segment = buf[:cut]
+            ticks = tick_re.findall(segment)
+            if ticks:
+                max_tick = max(max_tick, max(map(int, ticks)))
+            sns = sn_re.findall(segment)
+            if sns:
+                max_sn = max(max_sn, max(map(int, sns)))
+            offset += cut
+            carry = buf[cut:]
+            if not data:
+                break
+            checkpoints.append([offset, max_tick, max_sn])
+
+    stat = os.stat(tracefile)
+    index = {
+        "version": index_version,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "checkpoints": checkpoints,
+    }
+    try:
+        with open(index_path(tracefile), "w") as f:
+            json.dump(index, f)
+    except OSError:
+        print("Failed to write", index_path(tracefile))
+    return index
+
+
+# Returns the index of a trace, or None if it does not have an up to date
+# one
+def load_index(tracefile):
+    try:
+        with open(index_path(tracefile)) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(tracefile)
+    if (
+        index.get("version") != index_version
+        or index["size"] != stat.st_size
+        or index["mtime"] != stat.st_mtime_ns
+    ):
+        return None
+    return index
+
+
+# Returns the offset of the last checkpoint before any line with a tick
+# not lower than start_tick, or before any fetch line with a sequence
+# number not lower than start_sn
+def find_start(index, start_tick, start_sn):
+    if start_tick != 0:
+        column, start = 1, start_tick
+    else:
+        column, start = 2, start_sn
+    offset = 0
+    for checkpoint in index["checkpoints"]:
+        if checkpoint[column] >= start:
+            break
+        offset = checkpoint[0]
+    return offset
+
+
 def process_trace(
     trace,
     outfile,
@@ -431,6 +533,217 @@ def print_inst(
             outfile.write("...".center(12) + "\n")
 
 
+# Complete record of an instruction, as printed by the O3 DynInst
+record_re = re.compile(
+    rb"^O3PipeView:fetch:(\d+):0x([0-9a-fA-F]+):\d+:(\d+):.*\n"
+    rb"O3PipeView:decode:(\d+)\n"
+    rb"O3PipeView:rename:(\d+)\n"
+    rb"O3PipeView:dispatch:(\d+)\n"
+    rb"O3PipeView:issue:(\d+)\n"
+    rb"O3PipeView:complete:(\d+)\n"
+    rb"O3PipeView:retire:(\d+):store:(\d+)$",
+    re.M,
+)
+
+summary_stages = [
+    "decode", "rename", "dispatch", "issue", "complete", "retire"
+]
+
+
+# Aggregate statistics of the instructions in a trace, accumulated batch
+# by batch with NumPy so that memory use does not depend on the length of
+# the trace. Latencies are in cycles, histograms have one bucket per
+# cycle with the last bucket collecting all larger latencies.
+class PipelineSummary:
+    def __init__(self, np, cycle_time, max_cycles):
+        self.np = np
+        self.cycle_time = cycle_time
+        self.max_cycles = max_cycles
+        self.insts = 0
+        self.squashed = 0
+        # Fetch lines that did not start a complete record, e.g. because
+        # the trace was cut short or its lines were interleaved
+        self.unmatched = 0
+        # Latency from the previous stage to each stage in summary_stages,
+        # and from retiring to completing a store
+        self.hists = np.zeros((len(summary_stages) + 1, max_cycles + 1), int)
+        self.pcs = {}
+        # Cycles between consecutive retirements, attributed to the stage
+        # the retiring instruction spent the most time waiting for
+        self.cpi_stack = np.zeros(len(summary_stages))
+        self.last_retire = None
+
+    def add(self, records):
+        np = self.np
+        pcs = records[:, 1]
+        ticks = records[:, [0, 3, 4, 5, 6, 7, 8, 9]].astype(np.int64)
+        self.insts += len(ticks)
+
+        # Only account for the instructions that were committed
+        retired = ticks[:, 6] != 0
+        self.squashed += int(np.count_nonzero(~retired))
+        ticks = ticks[retired]
+        pcs = pcs[retired]
+        if not len(ticks):
+            return
+
+        # Stages an instruction did not go through (e.g. no issue) take
+        # no time
+        for stage in range(1, 7):
+            missing = ticks[:, stage] == 0
+            ticks[missing, stage] = ticks[missing, stage - 1]
+        lat = np.diff(ticks[:, :7], axis=1) // self.cycle_time
+        lat = np.maximum(lat, 0)
+
+        buckets = np.minimum(lat, self.max_cycles)
+        for stage in range(len(summary_stages)):
+            self.hists[stage] += np.bincount(
+                buckets[:, stage], minlength=self.max_cycles + 1
+            )
+        stores = ticks[:, 7] != 0
+        store_lat = (ticks[stores, 7] - ticks[stores, 6]) // self.cycle_time
+        self.hists[-1] += np.bincount(
+            np.clip(store_lat, 0, self.max_cycles),
+            minlength=self.max_cycles + 1,
+        )
+
+        unique, inverse, counts = np.unique(
+            pcs, return_inverse=True, return_counts=True
+        )
+        sums = np.zeros((len(unique), len(summary_stages)), np.int64)
+        np.add.at(sums, inverse, lat)
+        for pc, count, total in zip(unique.tolist(), counts.tolist(), sums):
+            if pc in self.pcs:
+                self.pcs[pc][0] += count
+                self.pcs[pc][1] += total
+            else:
+                self.pcs[pc] = [count, total]
+
+        order = np.argsort(ticks[:, 6], kind="stable")
+        retire = ticks[order, 6]
+        prev = np.empty_like(retire)
+        prev[1:] = retire[:-1]
+        prev[0] = retire[0] if self.last_retire is None else self.last_retire
+        self.last_retire = max(retire[-1], prev[0])
+        gaps = np.maximum(retire - prev, 0) / self.cycle_time
+        # On ties, blame the latest of the stages
+        last = len(summary_stages) - 1
+        self.cpi_stack += np.bincount(
+            last - np.argmax(lat[order, ::-1], axis=1),
+            weights=gaps,
+            minlength=len(summary_stages),
+        )
+
+    def summary(self, top_pcs):
+        np = self.np
+
+        def trim(hist):
+            used = np.flatnonzero(hist)
+            return hist[: used[-1] + 1].tolist() if len(used) else []
+
+        committed = self.insts - self.squashed
+        names = [
+            prev + "->" + stage
+            for prev, stage in zip(["fetch"] + summary_stages, summary_stages)
+        ]
+        buckets = np.arange(self.max_cycles + 1)
+        latency = {}
+        for name, hist in zip(names + ["retire->store"], self.hists):
+            total = hist.sum()
+            latency[name] = {
+                "mean": float((hist * buckets).sum() / total) if total else 0,
+                "histogram": trim(hist),
+            }
+
+        pcs = sorted(
+            self.pcs.items(), key=lambda item: item[1][1].sum(), reverse=True
+        )
+        per_pc = []
+        for pc, (count, total) in pcs[:top_pcs]:
+            avg = total / count
+            per_pc.append(
+                {
+                    "pc": "0x" + pc.decode(),
+                    "count": count,
+                    "mean_cycles": dict(zip(names, avg.round(2).tolist())),
+                    "stall_stage": summary_stages[int(np.argmax(avg))],
+                }
+            )
+
+        cycles = self.cpi_stack.sum()
+        return {
+            "instructions": self.insts,
+            "committed": committed,
+            "squashed": self.squashed,
+            "unmatched_fetches": self.unmatched,
+            "cycles": float(cycles),
+            "cpi": float(cycles / committed) if committed else 0,
+            "cpi_stack": {
+                stage: float(c / committed) if committed else 0
+                for stage, c in zip(summary_stages, self.cpi_stack)
+            },
+            "latency_cycles": latency,
+            "pcs": per_pc,
+        }
+
+
+# Summarizes the instructions in the trace with a fetch tick and sequence
+# number in the given ranges
+def summarize_trace(
+    trace,
+    outfile,
+    cycle_time,
+    max_cycles,
+    top_pcs,
+    start_tick,
+    stop_tick,
+    start_sn,
+    stop_sn,
+):
+    # Only the summary needs NumPy
+    import numpy as np
+
+    summary = PipelineSummary(np, cycle_time, max_cycles)
+    carry = b""
+    while True:
+        data = trace.read(index_interval)
+        buf = carry + data
+        if data:
+            # Leave the last, possibly incomplete, record for later
+            cut = buf.rfind(b"\nO3PipeView:fetch:") + 1
+            if cut <= 0:
+                carry = buf
+                continue
+        else:
+            cut = len(buf)
+        carry = buf[cut:]
+
+        found = record_re.findall(buf, 0, cut)
+        fetches = buf.count(b"O3PipeView:fetch:", 0, cut)
+        summary.unmatched += fetches - len(found)
+        if found:
+            records = np.array(found)
+            fetch = records[:, 0].astype(np.int64)
+            sn = records[:, 2].astype(np.int64)
+            keep = (fetch >= start_tick) & (sn >= start_sn)
+            if stop_tick > 0:
+                keep &= fetch <= stop_tick
+            if stop_sn > 0:
+                keep &= sn <= stop_sn
+            summary.add(records[keep])
+            # Records are only out of order by a limited amount
+            if (
+                stop_tick > 0
+                and fetch.min() > stop_tick + insts["tick_drift"] * cycle_time
+            ) or (stop_sn > 0 and sn.min() > stop_sn + insts["max_threshold"]):
+                break
+        if not data:
+            break
+
+    json.dump(summary.summary(top_pcs), outfile, indent=2)
+    outfile.write("\n")
+
+
 def validate_range(my_range):
     my_range = [int(i) for i in my_range.split(":")]
     if (
@@ -498,9 +811,45 @@ def main():
         default=False,
         help="additionally display store completion ticks",
     )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        default=False,
+        help="write aggregate pipeline statistics as JSON instead of "
+        "drawing the timeline",
+    )
+    parser.add_argument(
+        "--max-cycles",
+        type=int,
+        default=1000,
+        help="largest latency in the --summary histograms",
+    )
+    parser.add_argument(
+        "--top-pcs",
+        type=int,
+        default=50,
+        help="number of PCs reported by --summary",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        default=False,
+        help="do not use or build an index of the trace to find the "
+        "start of the tick or instruction range",
+    )
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        default=False,
+        help="(re)build the index of the trace and exit",
+    )
     parser.add_argument("tracefile")
 
     args = parser.parse_args()
+    if args.build_index:
+        index = build_index(args.tracefile)
+        print("Indexed checkpoints:", len(index["checkpoints"]))
+        return
     tick_range = validate_range(args.tick_range)
     if not tick_range:
         parser.error("invalid range")
@@ -509,9 +858,32 @@ def main():
     if not inst_range:
         parser.error("invalid range")
         sys.exit(1)
+    # Seek close to the start of the range using the index of the trace,
+    # building it if necessary
+    offset = 0
+    if (tick_range[0] != 0 or inst_range[0] != 0) and not args.no_index:
+        index = load_index(args.tracefile)
+        if index is None:
+            print("Indexing trace... ", end=" ")
+            index = build_index(args.tracefile)
+        offset = find_start(index, tick_range[0], inst_range[0])
     # Process trace
     print("Processing trace... ", end=" ")
-    with open(args.tracefile) as trace:
+    with open(args.tracefile, "rb") as raw_trace:
+        raw_trace.seek(offset)
+        if args.summary:
+            with open(args.outfile, "w") as out:
+                summarize_trace(
+                    raw_trace,
+                    out,
+                    args.cycle_time,
+                    args.max_cycles,
+                    args.top_pcs,
+                    *(tick_range + inst_range),
+                )
+            print("done!")
+            return
+        trace = io.TextIOWrapper(raw_trace)
         with open(args.outfile, "w") as out:
             process_trace(
                 trace,
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# This script characterises the memory accesses in a packet trace, as
+# captured by a CommMonitor or the TraceCPU, before choosing a cache
+# configuration. The trace is streamed in batches of packets (see
+# packet_trace_numpy.py) so that memory use does not depend on the
+# length of the trace. It computes:
+#
+#  * A histogram of the LRU stack (reuse) distances in cache lines,
+#    and the resulting miss ratio of fully associative LRU caches of
+#    every power-of-two size (element i being for a cache of 2^i
+#    lines). The distances are computed exactly, a batch at a time
+#    with offline counting in NumPy, or, for very large traces, on a
+#    spatially hashed sample of the lines as done by SHARDS (Waldspurger
+#    et al., FAST 2015) using --sample-rate.
+#  * Histograms of the strides between consecutive accesses by the
+#    same PC.
+#  * The read/write mix.
+#  * The number of packets, reads and writes and the working set size
+#    for every window of --window ticks.
+#
+# Usage:
+#   packet_trace_analysis.py <protobuf input> [--json <summary.json>]
+#                            [--npz <arrays.npz>] [options]
+
+import argparse
+import collections
+import json
+import sys
+
+import numpy as np
+import packet_trace_numpy
+import protolib
+from packet_trace_numpy import packet_pb2
+
+# ReadReq is 1 and WriteReq is 4 in src/mem/packet.hh Command enum
+CMD_READ = 1
+CMD_WRITE = 4
+
+
+def _count_below(points, x, y):
+    """
+    For each query i, count the k < x[i] with points[k] < y[i].
+
+    The prefix [0, x) is split into the aligned blocks of size 2^l for
+    the bits l set in x, like the ranges a Fenwick tree sums over. At
+    every level the points are sorted by block and then by value, so
+    that the count for a block is found with a binary search. The order
+    for a level is a merge of the sorted runs of the level below. This
+    takes O(n log^2 n) time for n points, all in NumPy.
+    """
+    # Work with the (unique) ranks of the values, so that the block and
+    # the rank fit in a single sort key
+    n = len(points)
+    order = np.argsort(points, kind="stable")
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[order] = np.arange(n)
+    y = np.searchsorted(points[order], y)
+    width = n + 1
+
+    counts = np.zeros(len(x), dtype=np.int64)
+    keys = np.arange(n) * width + ranks
+    level = 0
+    while (1 << level) <= n:
+        if level:
+            keys = (keys // width >> 1) * width + keys % width
+            keys.sort(kind="stable")
+        sel = np.flatnonzero((x >> level) & 1)
+        if len(sel):
+            block = (x[sel] >> (level + 1)) << 1
+            queries = block * width + y[sel]
+            # Binary searches are much faster in sorted order
+            sorted_queries = np.argsort(queries)
+            found = np.empty(len(sel), dtype=np.int64)
+            found[sorted_queries] = np.searchsorted(
+                keys, queries[sorted_queries]
+            )
+            # Less the points in the blocks before, which are all full
+            counts[sel] += found - np.minimum(block << level, n)
+        level += 1
+    return counts
+
+
+class ReuseDistance:
+    """
+    LRU stack distances, computed a batch of accesses at a time. The
+    distance of an access is the number of distinct lines accessed since
+    the previous access to the same line. For an access at time t whose
+    line was previously accessed at time p, these are:
+
+     * the lines last accessed before the batch, at a time in (p, T)
+       where T is the time of the first access of the batch, and
+     * the accesses k of the batch in (p, t) to a line with no access in
+       (p, k), i.e. whose own previous access is before p.
+
+    The first are counted with a binary search in the sorted times of the
+    last accesses, the second offline for the whole batch (see
+    _count_below). The last access time of each line is kept in arrays
+    sorted by line, which are updated at the end of every batch, in time
+    linear in the number of distinct lines seen so far.
+    """
+
+    def __init__(self):
+        self.lines = np.zeros(0, dtype=np.uint64)
+        self.last = np.zeros(0, dtype=np.int64)
+        # The values of last, sorted
+        self.times = np.zeros(0, dtype=np.int64)
+        self.time = 0
+
+    def access(self, lines):
+        """
+        Return the distances of the accesses to lines, an array of line
+        numbers, with -1 for the first access to a line.
+        """
+        lines = np.asarray(lines, dtype=np.uint64)
+        n = len(lines)
+        start = self.time
+        if not n:
+            return np.zeros(0, dtype=np.int64)
+
+        # The previous access to the line of every access, from within
+        # the batch if there is one
+        order = np.argsort(lines, kind="stable")
+        sorted_lines = lines[order]
+        repeat = sorted_lines[1:] == sorted_lines[:-1]
+        prev = np.full(n, -1, dtype=np.int64)
+        prev[order[1:][repeat]] = start + order[:-1][repeat]
+
+        # ... or from before it
+        first = order[np.r_[True, ~repeat]]
+        first_lines = lines[first]
+        pos = np.searchsorted(self.lines, first_lines)
+        found = np.zeros(len(first), dtype=bool)
+        if len(self.lines):
+            idx = np.minimum(pos, len(self.lines) - 1)
+            found = self.lines[idx] == first_lines
+        prev[first[found]] = self.last[pos[found]]
+
+        reused = np.flatnonzero(prev >= 0)
+        p = prev[reused]
+        before = len(self.times) - np.searchsorted(
+            self.times, p, side="right"
+        )
+        # All accesses of the batch before lo, the first one after p, had
+        # their previous access before p
+        lo = np.maximum(p - start + 1, 0)
+        within = _count_below(prev, reused, p) - lo
+        distances = np.full(n, -1, dtype=np.int64)
+        distances[reused] = before + within
+
+        # Record the last access to each line in the batch
+        last = start + order[np.r_[~repeat, True]]
+        old = self.last[pos[found]]
+        self.last[pos[found]] = last[found]
+        self.times = np.r_[
+            np.delete(self.times, np.searchsorted(self.times, old)),
+            np.sort(last),
+        ]
+        self.lines = np.insert(self.lines, pos[~found], first_lines[~found])
+        self.last = np.insert(self.last, pos[~found], last[~found])
+        self.time += n
+        return distances
+
+
+class TraceAnalysis:
+    def __init__(
+        self, line_size=64, window=None, sample_rate=1.0, top_strides=8
+    ):
+        self.line_size = line_size
+        self.window = window
+        self.sample_rate = sample_rate
+        self.top_strides = top_strides
+
+        self.num_packets = 0
+        self.commands = collections.Counter()
+
+        # Histogram of the reuse distances in powers of two, bucket 0
+        # holding distance 0 and bucket i distances in [2^(i-1), 2^i)
+        self.reuse = ReuseDistance()
+        self.reuse_hist = np.zeros(65, dtype=np.int64)
+        self.cold = 0
+        self.sampled = 0
+        # Lines are sampled if their hash is below this threshold
+        self.threshold = np.uint64(int(sample_rate * (1 << 24)))
+
+        self.last_addr = {}
+        self.strides = {}
+
+        self.windows = []
+        self.cur_window = None
+        self.cur_lines = np.zeros(0, dtype=np.uint64)
+        self.cur_counts = np.zeros(3, dtype=np.int64)
+
+    def add(self, packets):
+        """
+        Account for a batch of packets, an array of
+        packet_trace_numpy.PACKET_DTYPE.
+        """
+        self.num_packets += len(packets)
+        cmds, counts = np.unique(packets["cmd"], return_counts=True)
+        self.commands.update(dict(zip(cmds.tolist(), counts.tolist())))
+
+        lines = packets["addr"] // np.uint64(self.line_size)
+        self._add_reuse(lines)
+        self._add_strides(packets)
+        if self.window:
+            self._add_windows(packets, lines)
+
+    def _add_reuse(self, lines):
+        if self.sample_rate < 1.0:
+            # Multiplicative hash of the line, keeping the top 24 bits
+            hashes = lines * np.uint64(0x9E3779B97F4A7C15) >> np.uint64(40)
+            lines = lines[hashes < self.threshold]
+        self.sampled += len(lines)
+
+        distances = self.reuse.access(lines)
+        self.cold += np.count_nonzero(distances < 0)
+        distances = distances[distances >= 0]
+        if self.sample_rate < 1.0:
+            distances = (distances / self.sample_rate).astype(np.int64)
+        buckets = np.zeros(len(distances), dtype=np.int64)
+        nonzero = distances > 0
+        buckets[nonzero] = np.floor(np.log2(distances[nonzero])) + 1
+        self.reuse_hist += np.bincount(buckets, minlength=65)
+
+    def _add_strides(self, packets):
+        sel = (packets["present"] & packet_trace_numpy.PRESENT_PC) != 0
+        pcs = packets["pc"][sel]
+        if not len(pcs):
+            return
+        order = np.argsort(pcs, kind="stable")
+        pcs = pcs[order]
+        addrs = packets["addr"][sel][order]
+
+        # Group the accesses by PC, taking the previous address of the
+        # first access in a group from the previous batch
+        first = np.flatnonzero(np.r_[True, pcs[1:] != pcs[:-1]])
+        last = np.r_[first[1:] - 1, len(pcs) - 1]
+        prev = np.empty_like(addrs)
+        prev[1:] = addrs[:-1]
+        valid = np.ones(len(pcs), dtype=bool)
+        for f, l, pc in zip(first, last, pcs[first].tolist()):
+            if pc in self.last_addr:
+                prev[f] = self.last_addr[pc]
+            else:
+                valid[f] = False
+            self.last_addr[pc] = int(addrs[l])
+
+        strides = (addrs - prev).view(np.int64)
+        pairs = np.stack([pcs[valid].view(np.int64), strides[valid]], axis=1)
+        pairs, counts = np.unique(pairs, axis=0, return_counts=True)
+        for (pc, stride), count in zip(pairs.tolist(), counts.tolist()):
+            hist = self.strides.setdefault(pc, collections.Counter())
+            hist[stride] += count
+            if len(hist) > 4 * self.top_strides:
+                self._trim(hist)
+
+    def _trim(self, hist):
+        # Keep memory bounded by folding the least common strides into
+        # a catch-all bucket
+        keep = hist.most_common(2 * self.top_strides)
+        other = sum(hist.values()) - sum(c for _, c in keep)
+        hist.clear()
+        hist.update(dict(keep))
+        hist["other"] += other
+
+    def _add_windows(self, packets, lines):
+        windows = packets["tick"] // np.uint64(self.window)
+        cmds = packets["cmd"]
+        bounds = np.flatnonzero(np.r_[True, windows[1:] != windows[:-1]])
+        bounds = np.r_[bounds, len(windows)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            window = int(windows[start])
+            if self.cur_window is None:
+                self.cur_window = window
+            elif window > self.cur_window:
+                self._end_window()
+                self.cur_window = window
+            # Packets out of order in time end up in the current window
+            self.cur_lines = np.union1d(self.cur_lines, lines[start:end])
+            self.cur_counts += (
+                end - start,
+                np.count_nonzero(cmds[start:end] == CMD_READ),
+                np.count_nonzero(cmds[start:end] == CMD_WRITE),
+            )
+
+    def _end_window(self):
+        counts = self.cur_counts.tolist()
+        self.windows.append(
+            (self.cur_window * self.window, *counts, len(self.cur_lines))
+        )
+        self.cur_lines = np.zeros(0, dtype=np.uint64)
+        self.cur_counts[:] = 0
+
+    def finish(self):
+        if self.cur_window is not None:
+            self._end_window()
+            self.cur_window = None
+
+    def miss_ratios(self):
+        """
+        Miss ratio of fully associative LRU caches of 2^i lines.
+        """
+        total = self.reuse_hist.sum() + self.cold
+        if not total:
+            return []
+        # An access hits in a cache of 2^i lines if its distance is
+        # below 2^i, i.e. if it falls in one of the buckets 0 to i
+        hits = np.cumsum(self.reuse_hist)[:64]
+        return (1.0 - hits / total).tolist()
+
+    def summary(self):
+        commands = dict(self.commands)
+        reads = commands.pop(CMD_READ, 0)
+        writes = commands.pop(CMD_WRITE, 0)
+        used = int(np.max(np.flatnonzero(self.reuse_hist), initial=0)) + 1
+        strides = {}
+        for pc, hist in self.strides.items():
+            top = hist.most_common(self.top_strides)
+            strides[hex(pc & (2**64 - 1))] = [[s, c] for s, c in top]
+        return {
+            "packets": self.num_packets,
+            "reads": reads,
+            "writes": writes,
+            "other_commands": {str(cmd): n for cmd, n in commands.items()},
+            "line_size": self.line_size,
+            "reuse": {
+                "sample_rate": self.sample_rate,
+                "sampled_accesses": self.sampled,
+                "cold": int(self.cold),
+                "log2_histogram": self.reuse_hist[:used].tolist(),
+                "miss_ratio": self.miss_ratios()[:used],
+            },
+            "strides": strides,
+            "window": self.window,
+            "windows": len(self.windows),
+        }
+
+    def arrays(self):
+        windows = np.array(self.windows, dtype=np.int64).reshape(-1, 5)
+        return {
+            "reuse_log2_histogram": self.reuse_hist,
+            "reuse_cold": np.array(self.cold),
+            "miss_ratio": np.array(self.miss_ratios()),
+            "window_tick": windows[:, 0],
+            "window_packets": windows[:, 1],
+            "window_reads": windows[:, 2],
+            "window_writes": windows[:, 3],
+            "window_lines": windows[:, 4],
+        }
+
+
+def analyze(trace, **kwargs):
+    """
+    Stream a packet trace through a TraceAnalysis and return it.
+    """
+    proto_in = protolib.openMessageReader(trace)
+    if proto_in.read(4).decode() != "gem5":
+        print("Unrecognized file", trace)
+        exit(-1)
+    header = packet_pb2.PacketHeader()
+    protolib.decodeMessage(proto_in, header)
+
+    analysis = TraceAnalysis(**kwargs)
+    for packets in packet_trace_numpy.decode_packets(proto_in):
+        analysis.add(packets)
+    analysis.finish()
+    proto_in.close()
+    return analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Characterise the memory accesses in a packet trace."
+    )
+    parser.add_argument("trace", help="protobuf packet trace to read")
+    parser.add_argument(
+        "--line-size", type=int, default=64, help="cache line size in bytes"
+    )
+    parser.add_argument(
+        "--window", type=int, help="window size in ticks for the working set"
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=float,
+        default=1.0,
+        help="fraction of the lines to compute reuse distances for",
+    )
+    parser.add_argument(
+        "--top-strides",
+        type=int,
+        default=8,
+        help="number of strides reported per PC",
+    )
+    parser.add_argument("--json", help="file to write the summary to")
+    parser.add_argument("--npz", help="file to write the histograms to")
+    args = parser.parse_args()
+
+    if not 0.0 < args.sample_rate <= 1.0:
+        parser.error("the sample rate has to be in (0, 1]")
+
+    analysis = analyze(
+        args.trace,
+        line_size=args.line_size,
+        window=args.window,
+        sample_rate=args.sample_rate,
+        top_strides=args.top_strides,
+    )
+
+    summary = analysis.summary()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    if args.npz:
+        np.savez(args.npz, **analysis.arrays())
+
+
+if __name__ == "__main__":
+    main()
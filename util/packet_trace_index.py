@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# This script makes packet traces seekable. A trace is split into
+# blocks of packets that can be decoded independently, and an index
+# sidecar (<trace>.idx) records where every block starts along with
+# the range of ticks and packets it covers. For gzipped traces, every
+# block is a gzip member of its own. The members are read as a single
+# stream by regular gzip readers, including the one used by gem5, so
+# the traces remain usable as they are.
+#
+# Usage:
+#   packet_trace_index.py index <trace>
+#   packet_trace_index.py rewrite <trace> <output>
+#   packet_trace_index.py slice <trace> <output> [--start T0] [--end T1]
+#                                                [--every N]
+#
+# "index" builds the index of an existing trace with a single scan. As
+# a trace written by gem5 is compressed as a single gzip member,
+# "rewrite" converts it to a trace made of blocks. "slice" extracts the
+# packets with a tick in [T0, T1) and/or every Nth packet, only reading
+# the blocks that contain any of them.
+
+import argparse
+import base64
+import gzip
+import io
+import json
+import os
+import zlib
+
+import numpy as np
+import packet_trace_numpy
+import protolib
+from packet_trace_numpy import packet_pb2
+
+INDEX_VERSION = 1
+
+# Number of packets per block when writing a trace, and number of
+# bytes read at a time when scanning one
+_BLOCK_PACKETS = 1 << 16
+_CHUNK_SIZE = 1 << 22
+
+
+def index_path(trace):
+    return trace + ".idx"
+
+
+def _encode_header(header):
+    out = io.BytesIO()
+    protolib.encodeMessage(out, header)
+    return out.getvalue()
+
+
+def _decode_header(data):
+    header = packet_pb2.PacketHeader()
+    protolib.decodeMessage(protolib.MessageReader(data), header)
+    return header
+
+
+def _block(offset, length, skip, first, packets):
+    """
+    Index entry of a block, which holds packets from decompressed
+    offset skip onwards.
+    """
+    ticks = packets["tick"]
+    return [
+        offset,
+        length,
+        skip,
+        first,
+        len(packets),
+        int(ticks.min()),
+        int(ticks.max()),
+    ]
+
+
+def write_index(trace, compressed, header, blocks):
+    index = {
+        "version": INDEX_VERSION,
+        "trace_size": os.path.getsize(trace),
+        "compressed": compressed,
+        "header": base64.b64encode(_encode_header(header)).decode(),
+        "blocks": blocks,
+    }
+    with open(index_path(trace), "w") as f:
+        json.dump(index, f)
+
+
+def load_index(trace):
+    """
+    Load the index of a trace, or return None if the trace has no
+    (up-to-date) index.
+    """
+    try:
+        with open(index_path(trace)) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        index.get("version") != INDEX_VERSION
+        or index["trace_size"] != os.path.getsize(trace)
+    ):
+        return None
+    index["header"] = _decode_header(base64.b64decode(index["header"]))
+    return index
+
+
+class BlockedTraceWriter:
+    """
+    Write a packet trace in blocks of packets, and its index once it
+    is closed. The trace is compressed if its name ends in .gz.
+    """
+
+    def __init__(self, trace, header, block_packets=_BLOCK_PACKETS):
+        self.trace = trace
+        self.header = header
+        self.compressed = trace.endswith(".gz")
+        self.block_packets = block_packets
+        try:
+            self.out = open(trace, "wb")
+        except OSError:
+            print("Failed to open ", trace, " for writing")
+            exit(-1)
+
+        self.blocks = []
+        self.pending = []
+        self.num_pending = 0
+        self.num_packets = 0
+
+        # Write the magic number in 4-byte Little Endian, similar to
+        # what is done in src/proto/protoio.cc
+        self._write_block(b"gem5" + _encode_header(header))
+
+    def _write_block(self, data):
+        if self.compressed:
+            data = gzip.compress(data, compresslevel=6)
+        offset = self.out.tell()
+        self.out.write(data)
+        return offset, len(data)
+
+    def _flush(self, count):
+        pending = np.concatenate(self.pending)
+        block = pending[:count]
+        self.pending = [pending[count:]]
+        self.num_pending -= count
+
+        data = packet_trace_numpy.encode_packets(block)
+        offset, length = self._write_block(data.data)
+        self.blocks.append(_block(offset, length, 0, self.num_packets, block))
+        self.num_packets += count
+
+    def write(self, packets):
+        """Append an array of packet_trace_numpy.PACKET_DTYPE."""
+        if not len(packets):
+            return
+        self.pending.append(packets)
+        self.num_pending += len(packets)
+        while self.num_pending >= self.block_packets:
+            self._flush(self.block_packets)
+
+    def close(self):
+        if self.num_pending:
+            self._flush(self.num_pending)
+        self.out.close()
+        write_index(self.trace, self.compressed, self.header, self.blocks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _PacketScanner:
+    """
+    Decode a stream of packet messages fed to it piece by piece,
+    keeping hold of the decoded packets.
+    """
+
+    def __init__(self):
+        self.carry = b""
+        self.packets = []
+
+    def feed(self, data):
+        if self.carry:
+            data = self.carry + data
+        packets, consumed = packet_trace_numpy.decode_chunk(data)
+        if len(packets):
+            self.packets.append(packets)
+        self.carry = data[consumed:]
+        return consumed
+
+    def take(self):
+        packets = self.packets
+        self.packets = []
+        if not packets:
+            return None
+        return np.concatenate(packets)
+
+
+def _split_header(data):
+    """
+    Decode the magic number and the header at the start of data.
+    Return the header and its size, or None if data is too short.
+    """
+    if len(data) < 4:
+        return None
+    reader = protolib.MessageReader(data)
+    if reader.read(4) != b"gem5":
+        raise ValueError("Unrecognized file")
+    header = packet_pb2.PacketHeader()
+    if not reader.decode(header):
+        return None
+    return header, reader.tell()
+
+
+def _scan_plain(trace):
+    proto_in = protolib.openMessageReader(trace)
+    if proto_in.read(4) != b"gem5":
+        raise ValueError("Unrecognized file")
+    header = packet_pb2.PacketHeader()
+    protolib.decodeMessage(proto_in, header)
+
+    # Every chunk of packets becomes a block
+    scanner = _PacketScanner()
+    blocks = []
+    offset = proto_in.tell()
+    first = 0
+    while True:
+        data = proto_in.read(_CHUNK_SIZE)
+        if not data:
+            break
+        consumed = scanner.feed(data)
+        packets = scanner.take()
+        if packets is not None:
+            blocks.append(_block(offset, consumed, 0, first, packets))
+            offset += consumed
+            first += len(packets)
+    proto_in.close()
+    return header, blocks
+
+
+def _scan_members(trace):
+    header = None
+    blocks = []
+    first = 0
+
+    def end_member(offset, length, skip, scanner):
+        nonlocal first
+        if scanner.carry:
+            raise ValueError(
+                "Packet split between gzip members, the trace has to be "
+                "rewritten to be indexed"
+            )
+        packets = scanner.take()
+        if packets is not None:
+            blocks.append(_block(offset, length, skip, first, packets))
+            first += len(packets)
+
+    with open(trace, "rb") as trace_in:
+        offset = 0
+        member = 0
+        head = b""
+        skip = 0
+        scanner = _PacketScanner()
+        inflate = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        while True:
+            raw = trace_in.read(_CHUNK_SIZE)
+            if not raw:
+                break
+            while raw:
+                data = inflate.decompress(raw)
+                if header is None:
+                    # Hold back the data until the header is complete
+                    head += data
+                    split = _split_header(head)
+                    if split is None and not inflate.eof:
+                        data = b""
+                    elif split is None:
+                        raise ValueError("Truncated trace header")
+                    else:
+                        header, skip = split
+                        data = head[skip:]
+                        head = b""
+                scanner.feed(data)
+
+                if not inflate.eof:
+                    break
+                raw = inflate.unused_data
+                end = trace_in.tell() - len(raw)
+                end_member(member, end - member, skip, scanner)
+                member = end
+                skip = 0
+                inflate = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    return header, blocks
+
+
+def build_index(trace):
+    """
+    Scan a trace and write its index. Return the index.
+    """
+    with open(trace, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    if compressed:
+        header, blocks = _scan_members(trace)
+    else:
+        header, blocks = _scan_plain(trace)
+    if header is None:
+        raise ValueError("Truncated trace header")
+    write_index(trace, compressed, header, blocks)
+    return load_index(trace)
+
+
+def slice_trace(trace, output, start=None, end=None, every=1):
+    """
+    Write the packets of trace with a tick in [start, end), keeping
+    only every Nth packet if every is larger than 1.
+    """
+    index = load_index(trace)
+    if index is None:
+        print("Building index for", trace)
+        index = build_index(trace)
+
+    writer = BlockedTraceWriter(output, index["header"])
+    with open(trace, "rb") as trace_in:
+        for block in index["blocks"]:
+            offset, length, skip, first, count, min_tick, max_tick = block
+            if start is not None and max_tick < start:
+                continue
+            if end is not None and min_tick >= end:
+                continue
+            # First packet in the block to sample
+            sample = -(-first // every) * every
+            if sample >= first + count:
+                continue
+
+            trace_in.seek(offset)
+            data = trace_in.read(length)
+            if index["compressed"]:
+                data = gzip.decompress(data)
+            packets, _ = packet_trace_numpy.decode_chunk(data[skip:])
+
+            keep = np.ones(len(packets), dtype=bool)
+            if start is not None:
+                keep &= packets["tick"] >= start
+            if end is not None:
+                keep &= packets["tick"] < end
+            if every > 1:
+                keep &= (np.arange(first, first + count) % every) == 0
+            writer.write(packets[keep])
+    writer.close()
+
+    print("Sliced packets:", writer.num_packets)
+
+
+def rewrite(trace, output, block_packets=_BLOCK_PACKETS):
+    proto_in = protolib.openMessageReader(trace)
+    if proto_in.read(4).decode() != "gem5":
+        print("Unrecognized file", trace)
+        exit(-1)
+    header = packet_pb2.PacketHeader()
+    protolib.decodeMessage(proto_in, header)
+
+    with BlockedTraceWriter(output, header, block_packets) as writer:
+        for packets in packet_trace_numpy.decode_packets(proto_in):
+            writer.write(packets)
+    proto_in.close()
+
+    print("Rewritten packets:", writer.num_packets)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index and slice packet traces."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    idx = subparsers.add_parser("index", help="index an existing trace")
+    idx.add_argument("trace")
+    rew = subparsers.add_parser(
+        "rewrite", help="rewrite a trace in indexed blocks"
+    )
+    rew.add_argument("trace")
+    rew.add_argument("output")
+    rew.add_argument(
+        "--block-packets",
+        type=int,
+        default=_BLOCK_PACKETS,
+        help="number of packets per block",
+    )
+    sli = subparsers.add_parser("slice", help="extract part of a trace")
+    sli.add_argument("trace")
+    sli.add_argument("output")
+    sli.add_argument("--start", type=int, help="first tick to extract")
+    sli.add_argument("--end", type=int, help="tick to stop extracting at")
+    sli.add_argument(
+        "--every", type=int, default=1, help="only extract every Nth packet"
+    )
+    args = parser.parse_args()
+
+    if args.command == "index":
+        index = build_index(args.trace)
+        print("Indexed blocks:", len(index["blocks"]))
+        if index["compressed"] and len(index["blocks"]) <= 1:
+            print(
+                "The trace is a single gzip member, use 'rewrite' to "
+                "make it seekable"
+            )
+    elif args.command == "rewrite":
+        rewrite(args.trace, args.output, args.block_packets)
+    else:
+        slice_trace(args.trace, args.output, args.start, args.end, args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026 The gem5 Authors
+# All Rights Reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# This script converts protobuf packet traces to and from columnar
+# NumPy arrays. Rather than creating a packet_pb2.Packet per record,
+# the packet messages are decoded and encoded directly from their wire
+# format in large batches, so that converting even very large traces
+# is a bulk operation.
+#
+# Usage:
+#   packet_trace_numpy.py decode <protobuf input> <.npz or .npy output>
+#   packet_trace_numpy.py encode <.npz or .npy input> <protobuf output>
+#
+# Encoded traces are written in blocks and come with an index, see
+# packet_trace_index.py.
+#
+# The packets are stored as a structured array with the fields listed
+# in PACKET_DTYPE. The optional flags, pkt_id and pc fields of a
+# packet are only valid if the corresponding bit is set in its
+# "present" field. A .npz file holds both the packets and the trace
+# header, whereas a .npy file can be memory mapped, e.g. using
+# load_trace(), and keeps the header in a .json file next to it.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import protolib
+
+util_dir = os.path.dirname(os.path.realpath(__file__))
+# Make sure the proto definitions are up to date.
+subprocess.check_call(["make", "--quiet", "-C", util_dir, "packet_pb2.py"])
+import packet_pb2
+
+PACKET_DTYPE = np.dtype(
+    [
+        ("tick", np.uint64),
+        ("cmd", np.uint32),
+        ("addr", np.uint64),
+        ("size", np.uint32),
+        ("flags", np.uint32),
+        ("pkt_id", np.uint64),
+        ("pc", np.uint64),
+        ("present", np.uint8),
+    ]
+)
+
+# Bits in the "present" field for the optional packet fields
+PRESENT_FLAGS = 1 << 0
+PRESENT_PKT_ID = 1 << 1
+PRESENT_PC = 1 << 2
+
+# Field number, name and presence bit (0 if required) of the fields of
+# the Packet message in src/proto/packet.proto
+_FIELDS = (
+    (1, "tick", 0),
+    (2, "cmd", 0),
+    (3, "addr", 0),
+    (4, "size", 0),
+    (5, "flags", PRESENT_FLAGS),
+    (6, "pkt_id", PRESENT_PKT_ID),
+    (7, "pc", PRESENT_PC),
+)
+
+# Number of bytes decoded, and number of packets encoded, per batch
+_CHUNK_SIZE = 1 << 24
+_BATCH_SIZE = 1 << 20
+
+
+def _decode_varints(buf):
+    """
+    Decode all the complete varints in the byte array buf. Return
+    their values, start offsets and sizes in bytes.
+    """
+    ends = np.flatnonzero(buf < 0x80)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    sizes = ends - starts + 1
+    if len(sizes) and sizes.max() > 10:
+        raise ValueError("Too many bytes when decoding varint.")
+
+    # Shift the payload of every byte into place and combine the
+    # bytes belonging to the same varint
+    end = ends[-1] + 1 if len(ends) else 0
+    shifts = np.arange(end) - np.repeat(starts, sizes)
+    payload = (buf[:end] & 0x7F).astype(np.uint64)
+    payload <<= (shifts * 7).astype(np.uint64)
+    if len(starts):
+        values = np.bitwise_or.reduceat(payload, starts)
+    else:
+        values = payload
+    return values, starts, sizes
+
+
+def decode_chunk(data):
+    """
+    Decode the complete packet messages at the start of data. Return
+    them as an array of PACKET_DTYPE along with the number of bytes
+    consumed.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    values, starts, sizes = _decode_varints(buf)
+    ntok = len(values)
+    if not ntok:
+        return np.zeros(0, dtype=PACKET_DTYPE), 0
+    complete = int(starts[-1] + sizes[-1])
+
+    # Assuming every varint is the length of a message, work out where
+    # the next message would start. Only the messages reachable from
+    # the first one are actually lengths, but this is cheap to compute
+    # for everything in one go.
+    lengths = np.minimum(values, complete).astype(np.int64)
+    targets = starts + sizes + lengths
+    chain = np.searchsorted(starts, targets)
+    valid = chain < ntok
+    valid[valid] = starts[chain[valid]] == targets[valid]
+    chain[~valid] = -2
+    chain[targets == complete] = ntok
+    chain[targets > complete] = -1
+
+    # Follow the chain of message lengths, which is the only part that
+    # is inherently sequential
+    chain = chain.tolist()
+    records = []
+    append = records.append
+    tok = 0
+    while tok < ntok:
+        next_tok = chain[tok]
+        if next_tok < 0:
+            break
+        append(tok)
+        tok = next_tok
+    if tok < ntok and chain[tok] == -2:
+        raise ValueError("Malformed packet message.")
+    consumed = complete if tok == ntok else int(starts[tok])
+
+    nrec = len(records)
+    packets = np.zeros(nrec, dtype=PACKET_DTYPE)
+    if not nrec:
+        return packets, consumed
+
+    # Within a message, the varints alternate between field tags and
+    # field values
+    records = np.array(records, dtype=np.int64)
+    counts = np.diff(records, append=tok)
+    if np.any(counts % 2 == 0):
+        raise ValueError("Malformed packet message.")
+    rec_of = np.repeat(np.arange(nrec), counts)
+    rel = np.arange(tok) - np.repeat(records, counts)
+    tag_toks = np.flatnonzero(rel & 1)
+    tags = values[tag_toks]
+    if np.any(tags & 7):
+        raise ValueError("Unsupported wire type in packet message.")
+    field_nums = tags >> 3
+
+    for num, name, bit in _FIELDS:
+        toks = tag_toks[field_nums == num]
+        recs = rec_of[toks]
+        packets[name][recs] = values[toks + 1]
+        if bit:
+            packets["present"][recs] |= bit
+    return packets, consumed
+
+
+def decode_packets(proto_in, chunk_size=_CHUNK_SIZE):
+    """
+    Generator decoding the packet messages from proto_in, which is a
+    protolib.MessageReader positioned after the trace header. Every
+    step yields an array of PACKET_DTYPE holding a batch of packets.
+    """
+    carry = b""
+    while True:
+        data = proto_in.read(chunk_size)
+        if not data:
+            break
+        if carry:
+            data = carry + data
+        packets, consumed = decode_chunk(data)
+        if len(packets):
+            yield packets
+        carry = data[consumed:]
+    if carry:
+        print("Ignoring truncated packet at the end of the trace")
+
+
+def _varint_sizes(values):
+    sizes = np.ones(len(values), dtype=np.int64)
+    for i in range(1, 10):
+        sizes += values >= np.uint64(1 << (7 * i))
+    return sizes
+
+
+def _put_varints(out, offsets, values, sizes):
+    for i in range(int(sizes.max(initial=0))):
+        sel = sizes > i
+        byte = (values[sel] >> np.uint64(7 * i)) & np.uint64(0x7F)
+        byte |= np.where(sizes[sel] > i + 1, 0x80, 0).astype(np.uint64)
+        out[offsets[sel] + i] = byte
+
+
+def encode_packets(packets):
+    """
+    Encode an array of PACKET_DTYPE as a sequence of length-delimited
+    packet messages and return it as a byte array.
+    """
+    fields = []
+    lengths = np.zeros(len(packets), dtype=np.int64)
+    for num, name, bit in _FIELDS:
+        values = packets[name].astype(np.uint64)
+        sizes = _varint_sizes(values)
+        if bit:
+            sizes[(packets["present"] & bit) == 0] = 0
+        fields.append((num, values, sizes))
+        lengths += np.where(sizes > 0, sizes + 1, 0)
+
+    length_sizes = _varint_sizes(lengths.astype(np.uint64))
+    ends = np.cumsum(length_sizes + lengths)
+    out = np.zeros(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    offsets = ends - length_sizes - lengths
+    _put_varints(out, offsets, lengths.astype(np.uint64), length_sizes)
+    offsets += length_sizes
+    for num, values, sizes in fields:
+        sel = sizes > 0
+        out[offsets[sel]] = num << 3
+        _put_varints(out, offsets + 1, values, sizes)
+        offsets += np.where(sel, sizes + 1, 0)
+    return out
+
+
+def header_to_dict(header):
+    desc = {
+        "obj_id": header.obj_id,
+        "tick_freq": header.tick_freq,
+        "id_strings": [[e.key, e.value] for e in header.id_strings],
+    }
+    if header.HasField("ver"):
+        desc["ver"] = header.ver
+    return desc
+
+
+def dict_to_header(desc):
+    header = packet_pb2.PacketHeader()
+    header.obj_id = desc["obj_id"]
+    if "ver" in desc:
+        header.ver = desc["ver"]
+    header.tick_freq = desc["tick_freq"]
+    for key, value in desc["id_strings"]:
+        entry = header.id_strings.add()
+        entry.key = key
+        entry.value = value
+    return header
+
+
+def load_trace(path):
+    """
+    Load the header and the packets of a trace converted by this
+    script. Packets stored in a .npy file are memory mapped rather
+    than read.
+    """
+    if path.endswith(".npy"):
+        with open(path + ".json") as f:
+            header = json.load(f)
+        return header, np.load(path, mmap_mode="r")
+    with np.load(path) as npz:
+        return json.loads(str(npz["header"])), npz["packets"]
+
+
+def decode(trace, out_path):
+    proto_in = protolib.openMessageReader(trace)
+
+    # Read the magic number in 4-byte Little Endian
+    magic_number = proto_in.read(4).decode()
+    if magic_number != "gem5":
+        print("Unrecognized file", trace)
+        exit(-1)
+
+    header = packet_pb2.PacketHeader()
+    protolib.decodeMessage(proto_in, header)
+    print("Object id:", header.obj_id)
+    print("Tick frequency:", header.tick_freq)
+
+    # Stream the packets to a raw file first, as the number of packets
+    # is not known up front
+    raw_path = out_path + ".tmp"
+    num_packets = 0
+    with open(raw_path, "wb") as raw:
+        for packets in decode_packets(proto_in):
+            raw.write(packets.tobytes())
+            num_packets += len(packets)
+    proto_in.close()
+
+    if num_packets:
+        packets = np.memmap(
+            raw_path, dtype=PACKET_DTYPE, mode="r", shape=(num_packets,)
+        )
+    else:
+        packets = np.zeros(0, dtype=PACKET_DTYPE)
+    desc = header_to_dict(header)
+    if out_path.endswith(".npy"):
+        out = np.lib.format.open_memmap(
+            out_path, mode="w+", dtype=PACKET_DTYPE, shape=(num_packets,)
+        )
+        out[:] = packets
+        out.flush()
+        del out
+        with open(out_path + ".json", "w") as f:
+            json.dump(desc, f)
+    else:
+        np.savez(out_path, packets=packets, header=np.array(json.dumps(desc)))
+    del packets
+    os.remove(raw_path)
+
+    print("Parsed packets:", num_packets)
+
+
+def encode(in_path, trace):
+    header, packets = load_trace(in_path)
+
+    # Write the trace in blocks, along with an index making it seekable
+    import packet_trace_index
+
+    writer = packet_trace_index.BlockedTraceWriter(
+        trace, dict_to_header(header)
+    )
+    for start in range(0, len(packets), _BATCH_SIZE):
+        writer.write(np.asarray(packets[start : start + _BATCH_SIZE]))
+    writer.close()
+
+    print("Encoded packets:", len(packets))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert packet traces to and from NumPy arrays."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    dec = subparsers.add_parser("decode", help="protobuf trace to NumPy")
+    dec.add_argument("trace", help="protobuf packet trace to read")
+    dec.add_argument("output", help=".npz or .npy file to write")
+    enc = subparsers.add_parser("encode", help="NumPy to protobuf trace")
+    enc.add_argument("input", help=".npz or .npy file to read")
+    enc.add_argument("trace", help="protobuf packet trace to write")
+    args = parser.parse_args()
+
+    if args.command == "decode":
+        decode(args.trace, args.output)
+    else:
+        encode(args.input, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -69,8 +69,14 @@
 # types of proto objects can use the same function to decode a single message
 
 import gzip
+import mmap
 import struct
 
+# Number of bytes pulled from a (compressed) file in one go by the
+# MessageReader. Large reads amortise the cost of decompression and of
+# the Python call overhead over many messages.
+_CHUNK_SIZE = 1 << 20
+
 
 def openFileRd(in_file):
     """
@@ -133,6 +139,8 @@ def decodeMessage(in_file, message):
     Attempt to read a message from the file and decode it. Return
     False if no message could be read.
     """
+    if isinstance(in_file, MessageReader):
+        return in_file.decode(message)
     try:
         size, pos = _DecodeVarint32(in_file)
         if size == 0:
@@ -144,6 +152,168 @@ def decodeMessage(in_file, message):
         return False
 
 
+class MessageReader:
+    """
+    Buffered reader for a stream of length-delimited messages. Rather
+    than reading a byte at a time, it pulls large chunks from the file
+    and decodes the varints from a memoryview over the buffered
+    data. The source is either a file object or any object supporting
+    the buffer protocol, such as an mmap, in which case the messages
+    are decoded straight out of it without any copying.
+    """
+
+    def __init__(self, source, chunk_size=_CHUNK_SIZE):
+        self._source = source
+        self._chunk_size = chunk_size
+        # Offset in the input of the start of the buffer
+        self._base = 0
+        self._pos = 0
+        try:
+            self._buf = memoryview(source)
+            self._file = None
+        except TypeError:
+            self._buf = memoryview(b"")
+            self._file = source
+
+    def _fill(self, needed):
+        """
+        Make sure at least needed bytes are buffered past the current
+        position. Return False if the input ends before that.
+        """
+        avail = len(self._buf) - self._pos
+        if avail >= needed:
+            return True
+        if self._file is None:
+            return False
+
+        chunks = [self._buf[self._pos :].tobytes()]
+        while avail < needed:
+            data = self._file.read(max(self._chunk_size, needed - avail))
+            if not data:
+                break
+            chunks.append(data)
+            avail += len(data)
+        self._buf = memoryview(b"".join(chunks))
+        self._base += self._pos
+        self._pos = 0
+        return avail >= needed
+
+    def _decodeVarint32(self):
+        """
+        Decode a varint from the buffer, using the same 32-bit
+        semantics as _DecodeVarint32. Return 0 at the end of the
+        input.
+        """
+        if not self._fill(1):
+            return 0
+        buf = self._buf
+        pos = self._pos
+        b = buf[pos]
+        # Fast path, most messages are shorter than 128 bytes
+        if b < 0x80:
+            self._pos = pos + 1
+            return b
+
+        # A varint is never longer than 10 bytes
+        self._fill(10)
+        buf = self._buf
+        pos = self._pos
+        end = len(buf)
+        result = 0
+        shift = 0
+        mask = 0xFFFFFFFF
+        while True:
+            if pos == end:
+                return 0
+            b = buf[pos]
+            result |= (b & 0x7F) << shift
+            pos += 1
+            if not (b & 0x80):
+                break
+            shift += 7
+            if shift >= 64:
+                raise OSError("Too many bytes when decoding varint.")
+        self._pos = pos
+        if result > 0x7FFFFFFFFFFFFFFF:
+            result -= 1 << 64
+            result |= ~mask
+        else:
+            result &= mask
+        return result
+
+    def tell(self):
+        """
+        Return the (uncompressed) offset in the input of the next byte.
+        """
+        return self._base + self._pos
+
+    def read(self, size):
+        """
+        Read up to size raw bytes, e.g. the magic number at the start
+        of a trace.
+        """
+        self._fill(size)
+        data = self._buf[self._pos : self._pos + size].tobytes()
+        self._pos += len(data)
+        return data
+
+    def decode(self, message):
+        """
+        Decode the next message into message. Return False if no
+        message could be read.
+        """
+        try:
+            size = self._decodeVarint32()
+            if size <= 0 or not self._fill(size):
+                return False
+            pos = self._pos
+            self._pos = pos + size
+            message.ParseFromString(self._buf[pos : pos + size].tobytes())
+            return True
+        except OSError:
+            return False
+
+    def messages(self, message):
+        """
+        Generator decoding the remaining messages. The same message
+        object is reused and yielded for every message, so copy it if
+        it has to outlive the iteration step.
+        """
+        while self.decode(message):
+            yield message
+
+    def close(self):
+        self._buf.release()
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def openMessageReader(in_file):
+    """
+    Open the file passed as argument and return a MessageReader for
+    it. Gzipped files are decompressed in large chunks, while
+    uncompressed files are mapped into memory and decoded without
+    copying.
+    """
+    proto_in = openFileRd(in_file)
+    if isinstance(proto_in, gzip.GzipFile):
+        return MessageReader(proto_in)
+    try:
+        mapped = mmap.mmap(proto_in.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Empty files cannot be mapped, and some files (e.g. pipes)
+        # cannot be mapped at all
+        return MessageReader(proto_in)
+    # The mapping stays valid after the file is closed
+    proto_in.close()
+    return MessageReader(mapped)
+
+
 def _EncodeVarint32(out_file, value):
     """
     The encoding of the Varint32 is copied from